@@ -38,6 +38,9 @@ setup(
     package_dir={'filesplit': 'src'},
     packages=['filesplit', 'filesplit.common'],
     python_requires='>=3, <4',
+    entry_points={
+        'console_scripts': ['filesplit=filesplit.cli:main'],
+    },
     project_urls={
         'Bug Reports': 'https://github.com/ram-jayapalan/filesplit/issues',
         'Source': 'https://github.com/ram-jayapalan/filesplit',
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+import csv
+import ntpath
+import os
+import time
+import logging
+
+from .common import constant
+from .common.manifest import Manifest
+from .merge import Merge
+from .split import Split
+
+log = logging.getLogger(__name__)
+
+# Split mode and the split method it runs
+_SPLIT_METHODS = {
+    'size': 'bysize',
+    'linecount': 'bylinecount',
+    'parts': 'intoparts',
+    'key': 'bykey',
+}
+
+
+class BatchResult(NamedTuple):
+    source: str
+    target: str
+    splits: int
+    size: int
+    seconds: float
+    error: Optional[str]
+
+    @property
+    def rate(self) -> float:
+        """Returns throughput
+
+        Returns:
+            float: Bytes processed per second
+        """
+        return self.size / self.seconds if self.seconds > 0 else 0.0
+
+
+def _countsplits(manifestfile: str) -> Tuple[int, int]:
+    """Returns the number of splits and their total size recorded in a manifest
+
+    Args:
+        manifestfile (str): Manifest file path
+
+    Returns:
+        Tuple[int, int]: Number of splits and total size
+    """
+    sizes = [int(row['filesize']) for row in Manifest.load(manifestfile)]
+    return len(sizes), sum(sizes)
+
+
+def _getnames(paths: List[str]) -> List[str]:
+    """Returns a distinct name for each path derived from its basename
+
+    Args:
+        paths (List[str]): File or directory paths
+
+    Returns:
+        List[str]: Names in path order
+    """
+    names, used = [], set()
+    for path in paths:
+        name = ntpath.basename(path.rstrip('/\\'))
+        fname, ext = ntpath.splitext(name)
+        num = 1
+        while name in used:
+            num += 1
+            name = f'{fname}_{num}{ext}'
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def _setoptions(instance, options: Optional[dict]) -> None:
+    """Sets the given properties on a split or merge instance
+
+    Args:
+        instance (Union[Split, Merge]): Split or merge instance
+        options (Optional[dict]): Property names and values
+    """
+    for name, value in (options or {}).items():
+        setattr(instance, name, value)
+
+
+def _splitfile(inputfile: str, outputdir: str, mode: str, limit: int,
+               options: Optional[dict], kwargs: dict) -> BatchResult:
+    """Splits one file of the batch. Errors are reported in the result.
+
+    Args:
+        inputfile (str): Input file path
+        outputdir (str): Output directory of the splits of the file
+        mode (str): "size", "linecount", "parts" or "key"
+        limit (int): Size, number of lines, number of parts or number of partitions
+        options (Optional[dict]): Split properties to set
+        kwargs (dict): Args passed to the split method
+
+    Returns:
+        BatchResult: Result of the split
+    """
+    starttime = time.perf_counter()
+    splits, size, failure = 0, 0, None
+    try:
+        size = os.path.getsize(inputfile)
+        os.makedirs(outputdir, exist_ok=True)
+        split = Split(inputfile, outputdir)
+        _setoptions(split, options)
+        if mode == 'key':
+            split.bykey(partitions=limit, **kwargs)
+        else:
+            getattr(split, _SPLIT_METHODS[mode])(limit, **kwargs)
+        splits, _ = _countsplits(os.path.join(outputdir, split.manfilename))
+    except Exception as e:
+        log.error(f'Failed to split "{inputfile}": {e}')
+        failure = f'{type(e).__name__}: {e}'
+    return BatchResult(inputfile, outputdir, splits, size,
+                       time.perf_counter() - starttime, failure)
+
+
+def _mergedir(inputdir: str, outputdir: str, outputfilename: str,
+              options: Optional[dict], kwargs: dict) -> BatchResult:
+    """Merges the splits of one directory of the batch. Errors are reported in the result.
+
+    Args:
+        inputdir (str): Directory of the splits
+        outputdir (str): Output directory of the merged file
+        outputfilename (str): Merged filename
+        options (Optional[dict]): Merge properties to set
+        kwargs (dict): Args passed to the merge method
+
+    Returns:
+        BatchResult: Result of the merge
+    """
+    starttime = time.perf_counter()
+    outputfile = os.path.join(outputdir, outputfilename)
+    splits, size, failure = 0, 0, None
+    try:
+        merge = Merge(inputdir, outputdir, outputfilename)
+        _setoptions(merge, options)
+        splits, _ = _countsplits(os.path.join(inputdir, merge.manfilename))
+        merge.merge(**kwargs)
+        size = os.path.getsize(outputfile)
+    except Exception as e:
+        log.error(f'Failed to merge "{inputdir}": {e}')
+        failure = f'{type(e).__name__}: {e}'
+    return BatchResult(inputdir, outputfile, splits, size,
+                       time.perf_counter() - starttime, failure)
+
+
+def _getdevice(path: str) -> int:
+    """Returns the device a file or directory is stored on
+
+    Args:
+        path (str): File or directory path
+
+    Returns:
+        int: Device id or -1 if the path does not exist
+    """
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return -1
+
+
+def _run(jobs: List[Tuple[int, int, Callable, tuple]], indexfile: str,
+         workers: int, maxperdevice: Optional[int], executor: Optional[Executor],
+         callback: Optional[Callable]) -> List[BatchResult]:
+    """Runs the jobs of a batch. The largest job whose device is below the
+    concurrency cap is started whenever a worker is free. Each result is
+    recorded in the batch manifest as soon as the job is done.
+
+    Args:
+        jobs (List[Tuple[int, int, Callable, tuple]]): Size, device, function and args of each job
+        indexfile (str): Batch manifest file path
+        workers (int): Max number of jobs running at once
+        maxperdevice (Optional[int]): Max number of jobs running at once on a device
+        executor (Optional[Executor]): Executor to run the jobs in
+        callback (Optional[Callable]): Callback function to invoke with the result of each job
+
+    Returns:
+        List[BatchResult]: Results in job order
+    """
+    maxperdevice = maxperdevice or workers
+    # Stable sort keeps the given order among jobs of the same size
+    queued = sorted(range(len(jobs)), key=lambda num: jobs[num][0], reverse=True)
+    results: List[Optional[BatchResult]] = [None] * len(jobs)
+    running: Dict = {}
+    perdevice: Dict[int, int] = {}
+    starttime = time.perf_counter()
+    pool = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix='filesplit')
+    try:
+        with open(indexfile, mode='w+', encoding='utf8', newline='') as writer:
+            index = csv.DictWriter(writer, fieldnames=list(BatchResult._fields) + ['rate'],
+                                   quoting=csv.QUOTE_MINIMAL)
+            index.writeheader()
+            while queued or running:
+                pos = 0
+                while len(running) < workers and pos < len(queued):
+                    _, device, func, args = jobs[queued[pos]]
+                    if perdevice.get(device, 0) >= maxperdevice:
+                        pos += 1
+                        continue
+                    num = queued.pop(pos)
+                    running[pool.submit(func, *args)] = (num, device)
+                    perdevice[device] = perdevice.get(device, 0) + 1
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    num, device = running.pop(future)
+                    perdevice[device] -= 1
+                    result = future.result()
+                    results[num] = result
+                    index.writerow(dict(result._asdict(), seconds=round(result.seconds, 3),
+                                        rate=round(result.rate)))
+                    writer.flush()
+                    if result.error is None:
+                        log.info(f'Processed "{result.source}" ({result.splits} splits, '
+                                 f'{result.size} bytes) in {result.seconds:.2f} seconds')
+                    if callback:
+                        callback(result)
+    finally:
+        if executor is None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - starttime
+    total = sum(result.size for result in results if result is not None)
+    failed = sum(1 for result in results if result is not None and result.error is not None)
+    log.info(f'Processed {len(jobs)} inputs ({failed} failed, {total} bytes) in '
+             f'{elapsed:.2f} seconds at {total / elapsed if elapsed > 0 else 0:.0f} bytes/s')
+    return results
+
+
+def splitmany(inputfiles: Iterable[str], outputdir: str, mode: str, limit: int,
+              workers: int = constant.BATCH_WORKERS, maxperdevice: Optional[int] = None,
+              executor: Optional[Executor] = None, callback: Optional[Callable] = None,
+              options: Optional[dict] = None, **kwargs) -> List[BatchResult]:
+    """Splits many files concurrently. The splits and the manifest of each
+    file are written to a directory of its own named after the file.
+
+    Args:
+        inputfiles (Iterable[str]): Input file paths
+        outputdir (str): Output directory path
+        mode (str): "size", "linecount", "parts" or "key"
+        limit (int): Size, number of lines, number of parts or number of partitions
+            passed to the split method
+        workers (int, optional): Max number of files split at once. Defaults to 4.
+        maxperdevice (Optional[int], optional): Max number of files split at once
+            from the same device. Defaults to None for no limit other than workers.
+        executor (Optional[Executor], optional): Executor to run the splits in, e.g. a
+            shared ProcessPoolExecutor. Defaults to a thread pool of workers threads.
+        callback (Optional[Callable], optional): Callback function to invoke with
+            the BatchResult of each file once it is split. Defaults to None.
+        options (Optional[dict], optional): Split properties to set on each
+            split such as {"pipeline": True}. Defaults to None.
+        kwargs: Args passed to the split method such as newline or compression.
+            The key function or column is passed as key for the "key" mode.
+
+    Raises:
+        ValueError: Unsupported split mode
+        NotADirectoryError: Output directory does not exist
+
+    Returns:
+        List[BatchResult]: Result of each file in input order
+    """
+    if mode not in _SPLIT_METHODS:
+        raise ValueError(f'Split mode must be one of {", ".join(_SPLIT_METHODS)}.')
+    if not os.path.isdir(outputdir):
+        raise NotADirectoryError(
+            f'Given output directory path "{outputdir}" is not a valid directory.')
+    inputfiles = list(inputfiles)
+    jobs = []
+    for inputfile, name in zip(inputfiles, _getnames(inputfiles)):
+        size = os.path.getsize(inputfile) if os.path.isfile(inputfile) else 0
+        args = (inputfile, os.path.join(outputdir, name), mode, limit, options, kwargs)
+        jobs.append((size, _getdevice(inputfile), _splitfile, args))
+    return _run(jobs, os.path.join(outputdir, constant.BATCH_MANIFEST_FILE_NAME),
+                workers, maxperdevice, executor, callback)
+
+
+def mergemany(inputdirs: Iterable[str], outputdir: str,
+              workers: int = constant.BATCH_WORKERS, maxperdevice: Optional[int] = None,
+              executor: Optional[Executor] = None, callback: Optional[Callable] = None,
+              options: Optional[dict] = None, **kwargs) -> List[BatchResult]:
+    """Merges the splits of many directories concurrently. Each directory is
+    merged into a file named after the directory, so the directories
+    written by splitmany are merged back into files of the original names.
+
+    Args:
+        inputdirs (Iterable[str]): Directories of the splits
+        outputdir (str): Output directory path
+        workers (int, optional): Max number of directories merged at once. Defaults to 4.
+        maxperdevice (Optional[int], optional): Max number of directories merged at once
+            from the same device. Defaults to None for no limit other than workers.
+        executor (Optional[Executor], optional): Executor to run the merges in, e.g. a
+            shared ProcessPoolExecutor. Defaults to a thread pool of workers threads.
+        callback (Optional[Callable], optional): Callback function to invoke with
+            the BatchResult of each directory once it is merged. Defaults to None.
+        options (Optional[dict], optional): Merge properties to set on each
+            merge such as {"copybackend": "sendfile"}. Defaults to None.
+        kwargs: Args passed to the merge method such as cleanup or verify.
+
+    Raises:
+        NotADirectoryError: Output directory does not exist
+
+    Returns:
+        List[BatchResult]: Result of each directory in input order
+    """
+    if not os.path.isdir(outputdir):
+        raise NotADirectoryError(
+            f'Given output directory path "{outputdir}" is not a valid directory.')
+    manfilename = (options or {}).get('manfilename', constant.MANIFEST_FILE_NAME)
+    inputdirs = list(inputdirs)
+    jobs = []
+    for inputdir, name in zip(inputdirs, _getnames(inputdirs)):
+        manifestfile = os.path.join(inputdir, manfilename)
+        size = _countsplits(manifestfile)[1] if os.path.isfile(manifestfile) else 0
+        args = (inputdir, outputdir, name, options, kwargs)
+        jobs.append((size, _getdevice(inputdir), _mergedir, args))
+    return _run(jobs, os.path.join(outputdir, constant.BATCH_MANIFEST_FILE_NAME),
+                workers, maxperdevice, executor, callback)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import logging
+
+from .common import constant
+from .merge import Merge
+from .split import Split
+
+log = logging.getLogger(__name__)
+
+SHAPES = ('longlines', 'shortlines', 'csv', 'binary')
+
+MODES = ('bysize', 'bysize_newline', 'bysize_header', 'bylinecount', 'merge')
+
+# Size of the pattern repeated to generate the synthetic inputs
+_PATTERN_SIZE = 8000000  # 8 MB
+
+
+def _getpattern(shape: str, rng: random.Random) -> bytes:
+    """Returns the block of data repeated to generate an input of the given shape
+
+    Args:
+        shape (str): One of SHAPES
+        rng (random.Random): Seeded random generator
+
+    Returns:
+        bytes: Pattern
+    """
+    if shape == 'binary':
+        return rng.getrandbits(_PATTERN_SIZE * 8).to_bytes(_PATTERN_SIZE, 'little')
+    lines = []
+    size = 0
+    while size < _PATTERN_SIZE:
+        if shape == 'longlines':
+            line = b'x' * rng.randint(1000000, 4000000) + b'\n'
+        elif shape == 'shortlines':
+            line = b'y' * rng.randint(0, 20) + b'\n'
+        else:
+            line = (f'{rng.randint(0, 10 ** 9)},name{rng.randint(0, 9999)},'
+                    f'{rng.random():.6f},{rng.choice(("true", "false"))}\n').encode()
+        lines.append(line)
+        size += len(line)
+    return b''.join(lines)
+
+
+def generate(shape: str, path: str, size: int, seed: int = 0) -> int:
+    """Generates a synthetic input file
+
+    Args:
+        shape (str): "longlines" for few huge lines, "shortlines" for many tiny lines,
+            "csv" for CSV rows with a header or "binary" for random bytes
+        path (str): Input file path
+        size (int): Approx size in bytes of the input file
+        seed (int, optional): Seed of the random data. Defaults to 0.
+
+    Returns:
+        int: Number of lines in the file
+    """
+    pattern = _getpattern(shape, random.Random(seed))
+    written = 0
+    lines = 0
+    with open(path, mode='wb') as writer:
+        if shape == 'csv':
+            header = b'id,name,value,flag\n'
+            writer.write(header)
+            written += len(header)
+            lines += 1
+        while written < size:
+            block = pattern[:size - written]
+            if shape != 'binary' and len(block) < len(pattern):
+                # Keeps the last line complete
+                block = block[:block.rfind(b'\n') + 1] or pattern[:pattern.find(b'\n') + 1]
+            writer.write(block)
+            written += len(block)
+            lines += block.count(b'\n')
+    return lines
+
+
+def _getiostats() -> Dict[str, int]:
+    """Returns I/O counters of the current process. Only available on Linux.
+
+    Returns:
+        Dict[str, int]: Read and write syscall counts
+    """
+    try:
+        with open('/proc/self/io', mode='r', encoding='utf8') as reader:
+            stats = dict(line.split(': ') for line in reader.read().splitlines())
+    except OSError:
+        return {}
+    return {'read': int(stats['syscr']), 'write': int(stats['syscw'])}
+
+
+def _getpeakrss() -> Optional[int]:
+    """Returns peak resident set size of the current process
+
+    Returns:
+        Optional[int]: Peak RSS in bytes or None if not available on the platform
+    """
+    try:
+        # Unlike ru_maxrss the high water mark is not carried over
+        # from the parent process that spawned this one
+        with open('/proc/self/status', mode='r', encoding='utf8') as reader:
+            for line in reader:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peakrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes except on macOS
+    return peakrss if sys.platform == 'darwin' else peakrss * 1024
+
+
+def _runcase(case: dict) -> dict:
+    """Runs a benchmark case. Runs in its own process so that
+    the peak RSS is not inflated by the other cases.
+
+    Args:
+        case (dict): Benchmark case
+
+    Returns:
+        dict: Measurements
+    """
+    constant.DEFAULT_BLOCK_SIZE = case['blocksize']
+    outputdir = case['outputdir']
+    iostats = _getiostats()
+    starttime = time.perf_counter()
+    if case['mode'] == 'merge':
+        Merge(outputdir, outputdir, 'merged').merge(workers=case['workers'])
+    else:
+        split = Split(case['inputfile'], outputdir)
+        if case['mode'] == 'bylinecount':
+            split.bylinecount(case['limit'], workers=case['workers'])
+        else:
+            split.bysize(case['limit'], newline=case['mode'] == 'bysize_newline',
+                         includeheader=case['mode'] == 'bysize_header',
+                         workers=case['workers'])
+    seconds = time.perf_counter() - starttime
+    syscalls = None
+    if iostats:
+        syscalls = {key: value - iostats[key] for key, value in _getiostats().items()}
+    return {'seconds': seconds, 'peakrss': _getpeakrss(), 'syscalls': syscalls}
+
+
+def _getcaseid(shape: str, mode: str, splits: int, blocksize: int, workers: int) -> str:
+    """Returns id used to match the cases of two runs
+
+    Args:
+        shape (str): Input shape
+        mode (str): Split or merge mode
+        splits (int): Number of splits
+        blocksize (int): Block size
+        workers (int): Number of workers
+
+    Returns:
+        str: Case id
+    """
+    return f'{shape}/{mode}/splits={splits}/blocksize={blocksize}/workers={workers}'
+
+
+def run(shapes: List[str], modes: List[str], size: int, splits: List[int],
+        blocksizes: List[int], workers: int = 1, repeat: int = 1,
+        workdir: Optional[str] = None, seed: int = 0) -> dict:
+    """Runs the benchmark
+
+    Args:
+        shapes (List[str]): Input shapes to generate
+        modes (List[str]): Split and merge modes to time
+        size (int): Approx size in bytes of each input file
+        splits (List[int]): Number of splits to aim for
+        blocksizes (List[int]): Block sizes to read the input with
+        workers (int, optional): Number of workers. Defaults to 1.
+        repeat (int, optional): Number of times each case is timed. Defaults to 1.
+        workdir (Optional[str], optional): Dir for the inputs and splits.
+            Defaults to a temporary dir.
+        seed (int, optional): Seed of the generated inputs. Defaults to 0.
+
+    Returns:
+        dict: Environment and measurements of each case
+    """
+    results = []
+    tmpdir = tempfile.mkdtemp(prefix='filesplit-bench-', dir=workdir)
+    # A new process for each case keeps the peak RSS of the cases apart
+    context = multiprocessing.get_context('spawn')
+    try:
+        for shape in shapes:
+            inputfile = os.path.join(tmpdir, f'{shape}.dat')
+            lines = generate(shape, inputfile, size, seed)
+            filesize = os.path.getsize(inputfile)
+            for mode, numsplits, blocksize in (
+                    (mode, numsplits, blocksize) for mode in modes
+                    for numsplits in splits for blocksize in blocksizes):
+                if mode == 'bylinecount':
+                    limit = max(-(-lines // numsplits), 1)
+                else:
+                    limit = max(-(-filesize // numsplits), 1)
+                case = {'mode': mode, 'inputfile': inputfile, 'limit': limit,
+                        'blocksize': blocksize, 'workers': workers,
+                        'outputdir': os.path.join(tmpdir, 'splits')}
+                runs = []
+                for _ in range(repeat):
+                    shutil.rmtree(case['outputdir'], ignore_errors=True)
+                    os.makedirs(case['outputdir'])
+                    if mode == 'merge':
+                        Split(inputfile, case['outputdir']).bysize(limit)
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        runs.append(executor.submit(_runcase, case).result())
+                best = min(runs, key=lambda measured: measured['seconds'])
+                seconds = best['seconds']
+                results.append({
+                    'id': _getcaseid(shape, mode, numsplits, blocksize, workers),
+                    'shape': shape, 'mode': mode, 'splits': numsplits,
+                    'blocksize': blocksize, 'workers': workers, 'filesize': filesize,
+                    'lines': lines, 'seconds': seconds,
+                    'mbps': filesize / 1000000 / seconds if seconds else None,
+                    'linesps': lines / seconds if seconds else None,
+                    'peakrss': best['peakrss'], 'syscalls': best['syscalls'],
+                    'runs': [measured['seconds'] for measured in runs]})
+                log.info(f'{results[-1]["id"]}: {seconds:.3f}s')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'results': results}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Compares the throughput of the cases found in both runs. The change of
+    each case is printed to stderr so it never mixes with the JSON results.
+
+    Args:
+        current (dict): Benchmark run
+        baseline (dict): Benchmark run to compare with
+        threshold (float): Slowdown ratio reported as a regression
+
+    Returns:
+        List[str]: Cases that regressed
+    """
+    baselines = {result['id']: result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        previous = baselines.get(result['id'])
+        if not previous or not previous['mbps'] or not result['mbps']:
+            continue
+        change = result['mbps'] / previous['mbps'] - 1
+        print(f'{result["id"]}: {previous["mbps"]:.1f} -> {result["mbps"]:.1f} MB/s '
+              f'({change:+.1%})', file=sys.stderr)
+        if change < -threshold:
+            regressions.append(result['id'])
+    return regressions
+
+
+def _parselist(value: str, cast=str) -> list:
+    """Parses a comma separated CLI value
+
+    Args:
+        value (str): CLI value
+        cast (optional): Type of the values. Defaults to str.
+
+    Returns:
+        list: Values
+    """
+    return [cast(item) for item in value.split(',') if item]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Runs the benchmark from the command line
+
+    Args:
+        argv (Optional[List[str]], optional): Command line args. Defaults to sys.argv.
+
+    Returns:
+        int: Exit code. 1 if a regression is found when comparing with a baseline.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m filesplit.bench',
+        description='Times Split and Merge across synthetic file shapes and modes.')
+    parser.add_argument('--shapes', default=','.join(SHAPES),
+                        help=f'Comma separated input shapes. Default: {",".join(SHAPES)}')
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help=f'Comma separated modes. Default: {",".join(MODES)}')
+    parser.add_argument('--size', type=int, default=64,
+                        help='Size in MB of each input file. Default: 64')
+    parser.add_argument('--splits', default='4,64',
+                        help='Comma separated number of splits. Default: 4,64')
+    parser.add_argument('--blocksizes', default=str(constant.DEFAULT_BLOCK_SIZE),
+                        help='Comma separated block sizes in bytes to read the input with. '
+                             f'Default: {constant.DEFAULT_BLOCK_SIZE}')
+    parser.add_argument('--workers', type=int, default=1, help='Number of workers. Default: 1')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of times each case is timed, the fastest is reported. Default: 3')
+    parser.add_argument('--workdir', default=None, help='Dir for the inputs and splits')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated inputs')
+    parser.add_argument('--output', default=None, help='File to write the JSON results to')
+    parser.add_argument('--compare', default=None, help='JSON results of a baseline run')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Slowdown ratio reported as a regression. Default: 0.1')
+    args = parser.parse_args(argv)
+    for value, allowed in ((args.shapes, SHAPES), (args.modes, MODES)):
+        unknown = set(_parselist(value)) - set(allowed)
+        if unknown:
+            parser.error(f'Unknown value(s) {", ".join(sorted(unknown))}')
+    report = run(_parselist(args.shapes), _parselist(args.modes), args.size * 1000000,
+                 _parselist(args.splits, int), _parselist(args.blocksizes, int),
+                 args.workers, args.repeat, args.workdir, args.seed)
+    if args.output:
+        with open(args.output, mode='w', encoding='utf8') as writer:
+            json.dump(report, writer, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, mode='r', encoding='utf8') as reader:
+            regressions = compare(report, json.load(reader), args.threshold)
+        if regressions:
+            print(f'Regressed: {", ".join(regressions)}', file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
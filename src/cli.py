@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import List, Optional
+import argparse
+import os
+import sys
+import logging
+
+log = logging.getLogger(__name__)
+
+# Split and Merge are imported by the command that runs them, so the
+# startup of a command only pays for the modules it uses
+
+
+def _addsplitargs(parser: argparse.ArgumentParser) -> None:
+    """Adds the args shared by the split commands
+
+    Args:
+        parser (argparse.ArgumentParser): Split command parser
+    """
+    parser.add_argument('inputfile',
+                        help='File to split, or the name to give the splits with --stdin')
+    parser.add_argument('outputdir', help='Dir to write the splits and the manifest to')
+    parser.add_argument('--includeheader', action='store_true',
+                        help='Include the header in each split')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of workers to write the splits concurrently. Default: 1')
+    parser.add_argument('--useindex', action='store_true',
+                        help='Look up the line boundaries from a line index of the input')
+    parser.add_argument('--compression', default=None,
+                        help='Codec to compress each split with: gzip, bz2, lzma or zstd')
+    parser.add_argument('--checksum', default=None,
+                        help='Algorithm to checksum each split with such as crc32 or blake2b')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume an earlier split from its checkpoint')
+    parser.add_argument('--resumable', action='store_true',
+                        help='Checkpoint the progress after each split so it can be resumed')
+    parser.add_argument('--quotechar', default=None,
+                        help='Quote char of a CSV input to split on record boundaries')
+    parser.add_argument('--virtual', action='store_true',
+                        help='Only record the input byte range of each split in the manifest')
+    parser.add_argument('--manifestformat', default=None, help='Manifest format: csv or jsonl')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Overlap reading the input and writing the splits')
+    parser.add_argument('--fsync', action='store_true',
+                        help='Flush each split to the storage device')
+    parser.add_argument('--shardsize', type=int, default=0,
+                        help='Number of splits in each shard dir of the output dir. Default: 0 (no shards)')
+    parser.add_argument('--dropcache', action='store_true',
+                        help='Drop each split from the page cache once it is written')
+    parser.add_argument('--stdin', action='store_true',
+                        help='Split the data read from stdin')
+    parser.add_argument('--stdout', action='store_true',
+                        help='Print the path of each split to stdout as soon as it is written')
+
+
+def _getparser() -> argparse.ArgumentParser:
+    """Returns the command line parser
+
+    Returns:
+        argparse.ArgumentParser: Parser
+    """
+    parser = argparse.ArgumentParser(
+        prog='filesplit', description='Splits files and merges the splits back.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log the progress to stderr')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+    bysize = commands.add_parser('bysize', help='Split by size')
+    bysize.add_argument('size', type=int, help='Max size of each split in bytes')
+    _addsplitargs(bysize)
+    bysize.add_argument('--newline', action='store_true',
+                        help='Do not break lines across splits')
+    bysize.add_argument('--compressedsize', action='store_true',
+                        help='Apply the size to the compressed splits')
+    bylinecount = commands.add_parser('bylinecount', help='Split by line count')
+    bylinecount.add_argument('linecount', type=int, help='Max number of lines of each split')
+    _addsplitargs(bylinecount)
+    merge = commands.add_parser('merge', help='Merge the splits back into one file')
+    merge.add_argument('inputdir', help='Dir of the splits and the manifest')
+    merge.add_argument('outputfile', nargs='?', default=None,
+                       help='Merged file path, required unless --stdout is given')
+    merge.add_argument('--workers', type=int, default=1,
+                       help='Number of workers to copy the splits concurrently. Default: 1')
+    merge.add_argument('--verify', action='store_true',
+                       help='Verify the splits against the checksums in the manifest')
+    merge.add_argument('--resume', action='store_true',
+                       help='Resume an earlier merge from its checkpoint')
+    merge.add_argument('--resumable', action='store_true',
+                       help='Checkpoint the progress after each split so it can be resumed')
+    merge.add_argument('--cleanup', action='store_true',
+                       help='Remove the splits and the manifest after the merge')
+    merge.add_argument('--manfilename', default=None, help='Manifest filename. Default: manifest')
+    merge.add_argument('--stdout', action='store_true',
+                       help='Write the merged file to stdout')
+    return parser
+
+
+def _split(args: argparse.Namespace) -> None:
+    """Runs a split command
+
+    Args:
+        args (argparse.Namespace): Parsed args
+    """
+    from .split import Split
+    if args.stdin:
+        split = Split.fromstream(sys.stdin.buffer, args.outputdir, args.inputfile)
+    else:
+        split = Split(args.inputfile, args.outputdir)
+    if args.manifestformat:
+        split.manifestformat = args.manifestformat
+    split.pipeline = args.pipeline
+    split.fsync = args.fsync
+    split.shardsize = args.shardsize
+    split.dropcache = args.dropcache
+    split.resumable = args.resumable
+    callback = None
+    if args.stdout:
+        def callback(splitfile: str, splitsize: int) -> None:
+            print(splitfile, flush=True)
+    kwargs = dict(includeheader=args.includeheader, callback=callback, workers=args.workers,
+                  useindex=args.useindex, compression=args.compression,
+                  checksum=args.checksum, resume=args.resume, quotechar=args.quotechar,
+                  virtual=args.virtual)
+    if args.command == 'bysize':
+        split.bysize(args.size, newline=args.newline,
+                     compressedsize=args.compressedsize, **kwargs)
+    else:
+        split.bylinecount(args.linecount, **kwargs)
+
+
+def _merge(args: argparse.Namespace) -> None:
+    """Runs the merge command
+
+    Args:
+        args (argparse.Namespace): Parsed args
+    """
+    from .merge import Merge
+    if args.stdout:
+        # Merged file is streamed, so it is neither named nor written to a dir
+        merge = Merge(args.inputdir, os.curdir, '')
+    else:
+        outputfile = os.path.abspath(args.outputfile)
+        merge = Merge(args.inputdir, os.path.dirname(outputfile), os.path.basename(outputfile))
+    if args.manfilename:
+        merge.manfilename = args.manfilename
+    merge.resumable = args.resumable
+    if not args.stdout:
+        merge.merge(cleanup=args.cleanup, workers=args.workers,
+                    verify=args.verify, resume=args.resume)
+        return
+    if args.verify:
+        merge.verify(args.workers)
+    merge.mergeinto(sys.stdout.buffer)
+    sys.stdout.buffer.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Runs a command from the command line
+
+    Args:
+        argv (Optional[List[str]], optional): Command line args. Defaults to sys.argv.
+
+    Returns:
+        int: Exit code. 1 if the command failed.
+    """
+    parser = _getparser()
+    args = parser.parse_args(argv)
+    if args.command == 'merge':
+        if args.stdout and (args.outputfile or args.cleanup or args.resume):
+            parser.error('--stdout cannot be used with an output file, --cleanup or --resume')
+        if not args.stdout and not args.outputfile:
+            parser.error('the output file is required unless --stdout is given')
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    try:
+        if args.command == 'merge':
+            _merge(args)
+        else:
+            _split(args)
+    except BrokenPipeError:
+        # Reader of stdout has exited, output still buffered
+        # for it is dropped so that it is not flushed at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except Exception as e:
+        print(f'filesplit: error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
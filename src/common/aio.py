@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import AsyncIterator, Callable, NamedTuple, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+import asyncio
+import threading
+
+from . import constant
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executorlock = threading.Lock()
+
+
+class SplitInfo(NamedTuple):
+    path: str
+    size: int
+    splitnum: int
+
+
+def getexecutor() -> ThreadPoolExecutor:
+    """Returns the executor shared by the async API. The number of
+    workers is bounded so that concurrent splits and merges are queued.
+
+    Returns:
+        ThreadPoolExecutor: Shared executor
+    """
+    global _executor
+    with _executorlock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=constant.ASYNC_MAX_WORKERS,
+                thread_name_prefix='filesplit')
+        return _executor
+
+
+async def run(func: Callable, executor: Optional[Executor] = None, **kwargs) -> None:
+    """Runs a blocking split or merge method in the executor
+
+    Args:
+        func (Callable): Bound method to run
+        executor (Optional[Executor], optional): Executor to run the method in.
+            Defaults to the shared executor.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor or getexecutor(), partial(func, **kwargs))
+
+
+async def iterate(instance, func: Callable, executor: Optional[Executor] = None,
+                  **kwargs) -> AsyncIterator[SplitInfo]:
+    """Runs a blocking split method in the executor and yields each split
+    as soon as it is closed. The split is terminated if the iteration
+    is abandoned.
+
+    Args:
+        instance (Split): Split instance the method is bound to
+        func (Callable): Bound split method to run
+        executor (Optional[Executor], optional): Executor to run the method in.
+            Defaults to the shared executor.
+
+    Yields:
+        AsyncIterator[SplitInfo]: Split file path, size and split number
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def callback(splitfile: str, splitsize: int) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, (splitfile, splitsize))
+
+    future = loop.run_in_executor(
+        executor or getexecutor(), partial(func, callback=callback, **kwargs))
+    future.add_done_callback(lambda _: queue.put_nowait(done))
+    try:
+        splitnum = 0
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            splitnum += 1
+            yield SplitInfo(item[0], item[1], splitnum)
+        await future
+    finally:
+        if not future.done():
+            instance.terminate = True
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import Optional
+from io import BytesIO
+
+
+class BlockReader:
+
+    def __init__(self, reader: BytesIO, blocksize: int, initial: Optional[bytes] = None) -> None:
+        """Constructor
+
+        Args:
+            reader (BytesIO): File like object
+            blocksize (int): Number of bytes to read at once
+            initial (Optional[bytes], optional): Data to serve before
+                reading from the file. Defaults to None.
+        """
+        self._reader = reader
+        self._blocksize = blocksize
+        self._buf = bytes(initial) if initial else b''
+        self._pos = 0
+        self._eof = False
+        self._consumed = 0
+
+    def __len__(self) -> int:
+        """Returns number of pending bytes
+
+        Returns:
+            int: Pending bytes
+        """
+        return len(self._buf) - self._pos
+
+    def fill(self) -> bool:
+        """Reads the next block and appends it to the pending bytes.
+        Offsets relative to the pending bytes remain valid.
+
+        Returns:
+            bool: False if the end of the file has been reached
+        """
+        if self._eof:
+            return False
+        # Grow the read size with the pending bytes to keep
+        # accumulating long lines linear
+        block = self._reader.read(max(self._blocksize, len(self)))
+        if not block:
+            self._eof = True
+            return False
+        if self._pos == len(self._buf):
+            self._buf = block
+        else:
+            self._buf = self._buf[self._pos:] + block
+        self._pos = 0
+        return True
+
+    def hasdata(self) -> bool:
+        """Returns True if there are bytes left to consume
+
+        Returns:
+            bool: True/False
+        """
+        return len(self) > 0 or self.fill()
+
+    def take(self, size: int) -> memoryview:
+        """Consumes pending bytes
+
+        Args:
+            size (int): Number of bytes to consume
+
+        Returns:
+            memoryview: Consumed bytes
+        """
+        view = memoryview(self._buf)[self._pos:self._pos + size]
+        self._pos += len(view)
+        self._consumed += len(view)
+        return view
+
+    def tell(self) -> int:
+        """Returns number of bytes consumed including the initial data
+
+        Returns:
+            int: Consumed bytes
+        """
+        return self._consumed
+
+    def peek(self, size: int) -> memoryview:
+        """Returns pending bytes without consuming them. Reads
+        a block if there are none.
+
+        Args:
+            size (int): Max number of bytes to return
+
+        Returns:
+            memoryview: Pending bytes
+        """
+        self.hasdata()
+        return memoryview(self._buf)[self._pos:self._pos + size]
+
+    def read(self, size: int) -> memoryview:
+        """Consumes the given number of bytes reading more blocks if needed.
+        Less bytes are returned only at the end of the file.
+
+        Args:
+            size (int): Number of bytes to consume
+
+        Returns:
+            memoryview: Consumed bytes
+        """
+        while len(self) < size and self.fill():
+            pass
+        return self.take(size)
+
+    def _bounds(self, start: int, end: Optional[int]) -> tuple:
+        """Translates offsets relative to the pending bytes into buffer offsets
+
+        Args:
+            start (int): Relative start offset
+            end (Optional[int]): Relative end offset
+
+        Returns:
+            tuple: Buffer start and end offsets
+        """
+        stop = len(self._buf) if end is None else min(
+            len(self._buf), self._pos + max(end, 0))
+        return self._pos + start, stop
+
+    def find(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the lowest offset of sub in the pending bytes
+
+        Args:
+            sub (bytes): Bytes to find
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Relative offset or -1 if not found
+        """
+        idx = self._buf.find(sub, *self._bounds(start, end))
+        return idx if idx == -1 else idx - self._pos
+
+    def rfind(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the highest offset of sub in the pending bytes
+
+        Args:
+            sub (bytes): Bytes to find
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Relative offset or -1 if not found
+        """
+        idx = self._buf.rfind(sub, *self._bounds(start, end))
+        return idx if idx == -1 else idx - self._pos
+
+    def count(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the number of occurrences of sub in the pending bytes
+
+        Args:
+            sub (bytes): Bytes to count
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Number of occurrences
+        """
+        return self._buf.count(sub, *self._bounds(start, end))
+
+    def findnth(self, sub: bytes, n: int, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the offset of the nth occurrence of sub in the pending bytes
+
+        Args:
+            sub (bytes): Bytes to find
+            n (int): Occurrence to find starting from 1
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Relative offset or -1 if there are less than n occurrences
+        """
+        find = self._buf.find
+        idx, stop = self._bounds(start, end)
+        idx -= 1
+        for _ in range(n):
+            idx = find(sub, idx + 1, stop)
+            if idx == -1:
+                return -1
+        return idx - self._pos
+
+    def readline(self, size: Optional[int] = None) -> bytes:
+        """Consumes and returns the next line
+
+        Args:
+            size (Optional[int], optional): Max number of bytes to return. Longer
+                lines are returned partially. Defaults to None.
+
+        Returns:
+            bytes: Line including the newline if any
+        """
+        start = 0
+        while True:
+            idx = self.find(b'\n', start, size)
+            if idx != -1:
+                return bytes(self.take(idx + 1))
+            if size is not None and len(self) >= size:
+                return bytes(self.take(size))
+            start = len(self)
+            if not self.fill():
+                return bytes(self.take(len(self)))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import IO, Optional
+import json
+import os
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class Checkpoint:
+
+    def __init__(self, path: str, state: dict, flush: Optional[IO] = None,
+                 enabled: bool = True) -> None:
+        """Constructor. Keeps track of the progress of a split or merge
+        so that it can be resumed where it stopped.
+
+        Args:
+            path (str): Checkpoint file path
+            state (dict): Progress and the settings it is valid for
+            flush (Optional[IO], optional): File flushed before each save so the
+                checkpoint never gets ahead of it. Defaults to None.
+            enabled (bool, optional): Set to False to only remove a stale
+                checkpoint without saving the progress. Defaults to True.
+        """
+        self._path = path
+        self._state = state
+        self._flush = flush
+        self._enabled = enabled
+
+    @property
+    def state(self) -> dict:
+        """Returns checkpointed state
+
+        Returns:
+            dict: Progress and the settings it is valid for
+        """
+        return self._state
+
+    @classmethod
+    def load(cls, path: str) -> Optional['Checkpoint']:
+        """Loads a saved checkpoint
+
+        Args:
+            path (str): Checkpoint file path
+
+        Returns:
+            Optional[Checkpoint]: Checkpoint or None if there is no checkpoint
+        """
+        if not os.path.isfile(path):
+            return None
+        with open(path, mode='r', encoding='utf8') as reader:
+            state = json.load(reader)
+        log.info(f'Loaded checkpoint "{path}"')
+        return cls(path, state)
+
+    def save(self, **progress) -> None:
+        """Updates the progress and saves the checkpoint. The checkpoint file
+        is replaced atomically so a crash leaves the previous checkpoint intact.
+
+        Args:
+            progress: Progress values to update
+        """
+        if not self._enabled:
+            return
+        if self._flush is not None:
+            self._flush.flush()
+        self._state.update(progress)
+        tmppath = f'{self._path}.tmp'
+        with open(tmppath, mode='w', encoding='utf8') as writer:
+            json.dump(self._state, writer, separators=(',', ':'))
+        os.replace(tmppath, self._path)
+
+    def remove(self) -> None:
+        """Removes the checkpoint once the work is complete
+        """
+        if os.path.exists(self._path):
+            os.remove(self._path)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import BinaryIO, Optional
+import hashlib
+import os
+import zlib
+
+from . import constant, error
+
+# Algorithms backed by hashlib
+_HASHLIB_ALGORITHMS = ('md5', 'sha1', 'sha256', 'blake2b', 'blake2s')
+
+# Algorithms backed by the xxhash package
+_XXHASH_ALGORITHMS = ('xxh64', 'xxh3_64', 'xxh3_128')
+
+ALGORITHMS = ('crc32', 'adler32') + _HASHLIB_ALGORITHMS + _XXHASH_ALGORITHMS
+
+
+class _ZlibHash:
+
+    def __init__(self, func) -> None:
+        """Constructor. Gives the zlib checksums the hashlib interface.
+
+        Args:
+            func: zlib.crc32 or zlib.adler32
+        """
+        self._func = func
+        self._value = func(b'')
+
+    def update(self, data: bytes) -> None:
+        """Updates the checksum with data
+
+        Args:
+            data (bytes): Data to checksum
+        """
+        self._value = self._func(data, self._value)
+
+    def hexdigest(self) -> str:
+        """Returns the checksum
+
+        Returns:
+            str: Checksum as hex
+        """
+        return format(self._value, '08x')
+
+
+class Checksum:
+
+    def __init__(self, name: str) -> None:
+        """Constructor
+
+        Args:
+            name (str): Checksum algorithm. One of ALGORITHMS.
+        """
+        if name not in ALGORITHMS:
+            raise error.ChecksumNotSupported(
+                f'Checksum must be one of {", ".join(ALGORITHMS)}.')
+        if name in _XXHASH_ALGORITHMS:
+            try:
+                import xxhash  # noqa: F401
+            except ImportError:
+                raise error.ChecksumNotSupported(
+                    f'Checksum "{name}" requires the xxhash package to be installed.')
+        self._name = name
+
+    @classmethod
+    def parse(cls, value: str) -> tuple:
+        """Parses a checksum recorded as "<algorithm>:<hex>"
+
+        Args:
+            value (str): Recorded checksum
+
+        Returns:
+            tuple: Checksum and hex digest
+        """
+        name, _, digest = value.partition(':')
+        return cls(name), digest
+
+    @property
+    def name(self) -> str:
+        """Returns algorithm name
+
+        Returns:
+            str: Algorithm name
+        """
+        return self._name
+
+    def new(self):
+        """Returns a new hash object
+
+        Returns:
+            Hash object with update and hexdigest methods
+        """
+        if self._name == 'crc32':
+            return _ZlibHash(zlib.crc32)
+        if self._name == 'adler32':
+            return _ZlibHash(zlib.adler32)
+        if self._name in _XXHASH_ALGORITHMS:
+            import xxhash
+            return getattr(xxhash, self._name)()
+        return hashlib.new(self._name)
+
+    def format(self, hasher) -> str:
+        """Returns the checksum to record as "<algorithm>:<hex>"
+
+        Args:
+            hasher: Hash object returned by new
+
+        Returns:
+            str: Recorded checksum
+        """
+        return f'{self._name}:{hasher.hexdigest()}'
+
+    def hashfile(self, reader: BinaryIO, skip: int = 0) -> str:
+        """Returns the checksum of a file
+
+        Args:
+            reader (BinaryIO): File like object
+            skip (int, optional): Number of leading bytes to leave out. Defaults to 0.
+
+        Returns:
+            str: Recorded checksum
+        """
+        hasher = self.new()
+        if skip:
+            reader.read(skip)
+        while True:
+            chunk = reader.read(constant.DEFAULT_BLOCK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+        return self.format(hasher)
+
+
+class HashingWriter:
+
+    def __init__(self, writer: BinaryIO, hasher, filehasher=None, skip: int = 0) -> None:
+        """Constructor. Checksums the data on its way into the split so
+        the split is not read a second time.
+
+        Args:
+            writer (BinaryIO): Split file writer
+            hasher: Hash object of the split
+            filehasher (optional): Hash object of the whole file. Defaults to None.
+            skip (int, optional): Number of leading bytes left out of the
+                whole file checksum such as a repeated header. Defaults to 0.
+        """
+        self._writer = writer
+        self._hasher = hasher
+        self._filehasher = filehasher
+        self._skip = skip
+
+    @property
+    def writer(self) -> BinaryIO:
+        """Returns the wrapped writer
+
+        Returns:
+            BinaryIO: Split file writer
+        """
+        return self._writer
+
+    @property
+    def hasher(self):
+        """Returns hash object of the split
+
+        Returns:
+            Hash object
+        """
+        return self._hasher
+
+    def write(self, data: bytes) -> int:
+        """Checksums and writes data
+
+        Args:
+            data (bytes): Data to write
+
+        Returns:
+            int: Number of bytes written
+        """
+        self._hasher.update(data)
+        if self._filehasher is not None:
+            if self._skip:
+                skipped = min(self._skip, len(data))
+                self._skip -= skipped
+                if skipped < len(data):
+                    self._filehasher.update(memoryview(data)[skipped:])
+            else:
+                self._filehasher.update(data)
+        return self._writer.write(data)
+
+    def close(self) -> None:
+        """Closes the wrapped writer
+        """
+        self._writer.close()
+
+
+def hashrange(fd: int, start: int, end: int, *hashers) -> None:
+    """Checksums a byte range of a file
+
+    Args:
+        fd (int): File descriptor
+        start (int): Start offset of the range
+        end (int): End offset of the range
+        hashers: Hash objects to update
+    """
+    pos = start
+    while pos < end:
+        chunk = os.pread(fd, min(constant.DEFAULT_BLOCK_SIZE, end - pos), pos)
+        if not chunk:
+            break
+        for hasher in hashers:
+            hasher.update(chunk)
+        pos += len(chunk)
+
+
+def readchecksumfile(path: str) -> Optional[str]:
+    """Returns the whole file checksum saved next to the manifest
+
+    Args:
+        path (str): Checksum file path
+
+    Returns:
+        Optional[str]: Recorded checksum or None if there is no checksum file
+    """
+    if not os.path.isfile(path):
+        return None
+    with open(path, mode='r', encoding='utf8') as reader:
+        return reader.read().split()[0]
+
+
+def writechecksumfile(path: str, checksum: str, filename: str) -> None:
+    """Saves the whole file checksum next to the manifest
+
+    Args:
+        path (str): Checksum file path
+        checksum (str): Recorded checksum
+        filename (str): Input filename
+    """
+    with open(path, mode='w', encoding='utf8') as writer:
+        writer.write(f'{checksum}  {filename}\n')
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import BinaryIO, Optional
+from concurrent.futures import Executor
+import io
+import os
+import queue
+import threading
+
+from . import constant, error
+from .metrics import MetricsHook
+from .pipeline import syncfile
+
+# Codec name and the extension appended to the split filename
+_EXTENSIONS = {
+    'gzip': '.gz',
+    'bz2': '.bz2',
+    'lzma': '.xz',
+    'zstd': '.zst',
+}
+
+
+class Codec:
+
+    def __init__(self, name: str) -> None:
+        """Constructor. The compression modules are imported
+        only when a codec is used.
+
+        Args:
+            name (str): "gzip", "bz2", "lzma" or "zstd"
+        """
+        if name not in _EXTENSIONS:
+            raise error.CodecNotSupported(
+                f'Compression must be one of {", ".join(_EXTENSIONS)}.')
+        if name == 'zstd':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                raise error.CodecNotSupported(
+                    'Compression "zstd" requires the zstandard package to be installed.')
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        """Returns codec name
+
+        Returns:
+            str: Codec name
+        """
+        return self._name
+
+    @property
+    def extension(self) -> str:
+        """Returns extension appended to the compressed files
+
+        Returns:
+            str: File extension
+        """
+        return _EXTENSIONS[self._name]
+
+    def open(self, path: str, mode: str) -> BinaryIO:
+        """Opens a compressed file
+
+        Args:
+            path (str): File path
+            mode (str): "rb" or "wb"
+
+        Returns:
+            BinaryIO: File like object that compresses or decompresses
+        """
+        if self._name == 'gzip':
+            import gzip
+            return gzip.open(path, mode, compresslevel=constant.GZIP_COMPRESS_LEVEL)
+        if self._name == 'bz2':
+            import bz2
+            return bz2.open(path, mode)
+        if self._name == 'lzma':
+            import lzma
+            return lzma.open(path, mode)
+        import zstandard
+        if mode == 'wb':
+            return zstandard.ZstdCompressor().stream_writer(open(path, mode='wb'))
+        # Buffered to support readline used to skip the header
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, mode='rb')))
+
+    def compress(self, data: bytes) -> bytes:
+        """Compresses data at once
+
+        Args:
+            data (bytes): Data to compress
+
+        Returns:
+            bytes: Compressed data
+        """
+        if self._name == 'gzip':
+            import gzip
+            return gzip.compress(data, compresslevel=constant.GZIP_COMPRESS_LEVEL)
+        if self._name == 'bz2':
+            import bz2
+            return bz2.compress(data)
+        if self._name == 'lzma':
+            import lzma
+            return lzma.compress(data)
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+
+
+class CompressedWriter:
+
+    def __init__(self, path: str, codec: Codec, executor: Executor, fsync: bool = False,
+                 dropcache: bool = False, metrics: Optional[MetricsHook] = None) -> None:
+        """Constructor. Writes a split through a codec. The compression runs in
+        the executor so it overlaps with reading the data of the next split.
+
+        Args:
+            path (str): Split file path
+            codec (Codec): Codec to compress with
+            executor (Executor): Executor to run the compression in
+            fsync (bool, optional): Set to True to flush the split to the
+                storage device once it is compressed. Defaults to False.
+            dropcache (bool, optional): Set to True to drop the split from the
+                page cache once it is compressed. Defaults to False.
+            metrics (Optional[MetricsHook], optional): Hook the time spent
+                flushing the split is reported to. Defaults to None.
+        """
+        self._path = path
+        self._codec = codec
+        self._fsync = fsync
+        self._dropcache = dropcache
+        self._metrics = metrics
+        self._queue = queue.Queue(maxsize=constant.COMPRESS_QUEUE_SIZE)
+        self._rawsize = 0
+        self._future = executor.submit(self._compress)
+
+    @property
+    def rawsize(self) -> int:
+        """Returns number of bytes written before compression
+
+        Returns:
+            int: Raw size
+        """
+        return self._rawsize
+
+    def _compress(self) -> int:
+        """Compresses the queued data into the split file
+
+        Returns:
+            int: Compressed split size
+        """
+        with self._codec.open(self._path, 'wb') as writer:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    break
+                writer.write(data)
+        if self._fsync or self._dropcache:
+            syncfile(self._path, self._fsync, self._dropcache, self._metrics)
+        return os.path.getsize(self._path)
+
+    def _put(self, data) -> None:
+        """Queues data for the compression without waiting
+        forever if the compression has failed
+
+        Args:
+            data: Data to compress or None to finish the split
+        """
+        while True:
+            try:
+                self._queue.put(data, timeout=constant.COMPRESS_QUEUE_TIMEOUT)
+                return
+            except queue.Full:
+                if self._future.done():
+                    self._future.result()
+
+    def write(self, data: bytes) -> int:
+        """Queues data to be compressed into the split
+
+        Args:
+            data (bytes): Data to write
+
+        Returns:
+            int: Number of bytes written
+        """
+        self._put(data)
+        self._rawsize += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        """Finishes the split once the queued data is compressed
+        """
+        self._put(None)
+
+    def done(self) -> bool:
+        """Returns True once the split is compressed
+
+        Returns:
+            bool: True/False
+        """
+        return self._future.done()
+
+    def result(self) -> int:
+        """Waits for the split to be compressed
+
+        Returns:
+            int: Compressed split size
+        """
+        return self._future.result()
+
+
+class CompressedSizeTarget:
+
+    def __init__(self, size: int) -> None:
+        """Constructor. Translates a compressed split size into the raw
+        split size from the compression ratio observed so far.
+
+        Args:
+            size (int): Max compressed size in bytes of each split
+        """
+        self._size = size
+        self._rawsize = 0
+        self._compressedsize = 0
+        self._lock = threading.Lock()
+
+    def update(self, rawsize: int, compressedsize: int) -> None:
+        """Records the sizes of compressed data
+
+        Args:
+            rawsize (int): Size before compression
+            compressedsize (int): Size after compression
+        """
+        with self._lock:
+            self._rawsize += rawsize
+            self._compressedsize += compressedsize
+
+    def limit(self) -> int:
+        """Returns raw size limit for the next split
+
+        Returns:
+            int: Max size in bytes of the raw data of the next split
+        """
+        with self._lock:
+            if not self._rawsize or not self._compressedsize:
+                return self._size
+            return max(int(self._size * self._rawsize / self._compressedsize), 1)
@@ -7,6 +7,14 @@ Created: March 10, 2022
 
 DEFAULT_CHUNK_SIZE = 1000000  # 1 MB
 
+DEFAULT_PROBE_SIZE = 65536  # 64 KB
+
+DEFAULT_BLOCK_SIZE = 4000000  # 4 MB
+
+MIN_SCAN_WINDOW = 4096  # 4 KB
+
+DEFAULT_INDEX_BLOCK_SIZE = 64000000  # 64 MB
+
 SPLIT_DELIMITER = '_'
 
 ZERO_FILL = 4
@@ -15,4 +23,49 @@ MIN_ZERO_FILL = 1
 
 MAX_ZERO_FILL = 10
 
-MANIFEST_FILE_NAME = 'manifest'
\ No newline at end of file
+MANIFEST_FILE_NAME = 'manifest'
+
+INDEX_FILE_SUFFIX = '.idx'
+
+CHECKSUM_FILE_SUFFIX = '.sum'
+
+CHECKPOINT_FILE_SUFFIX = '.ckpt'
+
+COPY_BACKENDS = ('auto', 'copy_file_range', 'sendfile', 'read')
+
+DEFAULT_COPY_BACKEND = 'auto'
+
+ASYNC_MAX_WORKERS = 4
+
+GZIP_COMPRESS_LEVEL = 6
+
+COMPRESS_QUEUE_SIZE = 8
+
+COMPRESS_QUEUE_TIMEOUT = 1  # seconds
+
+PARTITION_BUFFER_SIZE = 32000000  # 32 MB
+
+DEFAULT_MEMORY_LIMIT = 16000000  # 16 MB
+
+LONG_LINE_POLICIES = ('allow', 'error')
+
+DEFAULT_LONG_LINE_POLICY = 'allow'
+
+PIPELINE_DEPTH = 8
+
+BATCH_WORKERS = 4
+
+BATCH_MANIFEST_FILE_NAME = 'batchmanifest'
+
+MANIFEST_FORMATS = ('csv', 'jsonl')
+
+DEFAULT_MANIFEST_FORMAT = 'csv'
+
+SHARD_ZERO_FILL = 4
+
+SORTED_MERGE_BUFFER_SIZE = 64000000  # 64 MB
+
+MIN_MERGE_BLOCK_SIZE = 65536  # 64 KB
+
+# Max number of splits merged at once by a sorted merge
+MAX_MERGE_FANIN = 256
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import Optional
+import errno
+import os
+import logging
+
+from . import constant, error
+
+log = logging.getLogger(__name__)
+
+# Errors that indicate the backend cannot be used for the given
+# pair of files (e.g. cross filesystem copies on older kernels)
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                    errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+
+
+def getavailablebackends() -> list:
+    """Returns the copy backends supported on this platform
+
+    Returns:
+        list: Copy backend names
+    """
+    backends = []
+    if hasattr(os, 'copy_file_range'):
+        backends.append('copy_file_range')
+    if hasattr(os, 'sendfile'):
+        backends.append('sendfile')
+    backends.append('read')
+    return backends
+
+
+def _pread(fd: int, size: int, offset: int) -> bytes:
+    """Reads from the given offset of a file descriptor
+
+    Args:
+        fd (int): File descriptor
+        size (int): Number of bytes to read
+        offset (int): Offset to read from
+
+    Returns:
+        bytes: Data read
+    """
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> int:
+    """Writes data at the given offset of a file descriptor
+
+    Args:
+        fd (int): File descriptor
+        data (bytes): Data to write
+        offset (int): Offset to write at
+
+    Returns:
+        int: Number of bytes written
+    """
+    if hasattr(os, 'pwrite'):
+        return os.pwrite(fd, data, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, data)
+
+
+class Copier:
+
+    def __init__(self, backend: str = constant.DEFAULT_COPY_BACKEND) -> None:
+        """Constructor
+
+        Args:
+            backend (str, optional): Copy backend to use. One of "auto",
+                "copy_file_range", "sendfile" or "read". Defaults to "auto".
+        """
+        available = getavailablebackends()
+        if backend not in constant.COPY_BACKENDS:
+            raise error.CopyBackendNotSupported(
+                f'Copy backend must be one of {", ".join(constant.COPY_BACKENDS)}.')
+        if backend == 'auto':
+            backend = available[0]
+        elif backend not in available:
+            raise error.CopyBackendNotSupported(
+                f'Copy backend "{backend}" is not supported on this platform.')
+        self._backend = backend
+
+    @property
+    def backend(self) -> str:
+        """Returns the copy backend in use
+
+        Returns:
+            str: Copy backend name
+        """
+        return self._backend
+
+    def _fallback(self, failed: str, exc: OSError) -> str:
+        """Switches to the next available backend
+
+        Args:
+            failed (str): Backend that failed
+            exc (OSError): Error raised by the backend
+
+        Returns:
+            str: Next backend to use
+        """
+        backends = getavailablebackends()
+        nextbackend = backends[backends.index(failed) + 1]
+        if self._backend == failed:
+            self._backend = nextbackend
+        log.info(
+            f'Copy backend "{failed}" failed ({exc.strerror}), falling back to "{nextbackend}"')
+        return nextbackend
+
+    def copy(self, infd: int, outfd: int, offset: int, count: int,
+             outoffset: Optional[int] = None) -> int:
+        """Copies a byte range of one file into another
+
+        Args:
+            infd (int): Source file descriptor
+            outfd (int): Destination file descriptor
+            offset (int): Source offset to copy from
+            count (int): Number of bytes to copy
+            outoffset (Optional[int], optional): Destination offset to copy to.
+                If None the data is written at the current position of the
+                destination which is then advanced. Defaults to None.
+
+        Returns:
+            int: Number of bytes copied. It is less than count only if the source
+                ends within the range, so callers must check it.
+        """
+        backend = self._backend
+        copied = 0
+        while copied < count:
+            pos = offset + copied
+            outpos = None if outoffset is None else outoffset + copied
+            remaining = count - copied
+            try:
+                if backend == 'copy_file_range':
+                    n = os.copy_file_range(
+                        infd, outfd, remaining, pos, outpos)
+                elif backend == 'sendfile' and outpos is None:
+                    n = os.sendfile(outfd, infd, pos, remaining)
+                else:
+                    chunk = _pread(infd, min(remaining, constant.DEFAULT_CHUNK_SIZE), pos)
+                    if outpos is None:
+                        n = os.write(outfd, chunk)
+                    else:
+                        n = _pwrite(outfd, chunk, outpos)
+            except OSError as exc:
+                if backend == 'read' or exc.errno not in _FALLBACK_ERRNOS:
+                    raise
+                backend = self._fallback(backend, exc)
+                continue
+            if not n:
+                # Source ended before the range
+                log.info(f'Copied {copied} of {count} bytes, source ended at offset {pos}')
+                break
+            copied += n
+        return copied
@@ -10,3 +10,24 @@ class DirectoryNotEmptyError(Exception):
 
 class ZeroFillOutOfRange(Exception):
     pass
+
+class CopyBackendNotSupported(Exception):
+    pass
+
+class SplitSizeMismatch(Exception):
+    pass
+
+class CodecNotSupported(Exception):
+    pass
+
+class ChecksumNotSupported(Exception):
+    pass
+
+class ChecksumMismatch(Exception):
+    pass
+
+class CheckpointMismatch(Exception):
+    pass
+
+class LineTooLong(Exception):
+    pass
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import Optional, Union
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import accumulate, islice
+import mmap
+import os
+import struct
+import sys
+import logging
+
+from . import constant
+from .records import scanrecords
+
+log = logging.getLogger(__name__)
+
+_INDEX_MAGIC = b'FSLIDX01'
+
+# Record index magic embeds the quote char
+_RECORD_INDEX_MAGIC = b'FSR%cIDX1'
+_INDEX_HEADER = struct.Struct('<8sQQQ')
+
+
+def countnewlines(fd: int, start: int, end: int) -> int:
+    """Returns number of newlines in a byte range of a file
+
+    Args:
+        fd (int): File descriptor
+        start (int): Start offset (inclusive)
+        end (int): End offset (exclusive)
+
+    Returns:
+        int: Number of newlines
+    """
+    count = 0
+    while start < end:
+        block = os.pread(fd, min(constant.DEFAULT_CHUNK_SIZE, end - start), start)
+        if not block:
+            break
+        count += block.count(b'\n')
+        start += len(block)
+    return count
+
+
+def countlines(data: Union[bytes, bytearray, memoryview]) -> int:
+    """Returns number of newlines in the data without copying it whole.
+    A memoryview is counted a chunk at a time as it has no count method.
+
+    Args:
+        data (Union[bytes, bytearray, memoryview]): Data to count
+
+    Returns:
+        int: Number of newlines
+    """
+    if not isinstance(data, memoryview):
+        return data.count(b'\n')
+    return sum(data[pos:pos + constant.DEFAULT_CHUNK_SIZE].tobytes().count(b'\n')
+               for pos in range(0, len(data), constant.DEFAULT_CHUNK_SIZE))
+
+
+class LineProbe:
+
+    def __init__(self, fd: int, filesize: int) -> None:
+        """Constructor. Finds line ends by probing the file around
+        the given offsets.
+
+        Args:
+            fd (int): Input file descriptor
+            filesize (int): Input file size
+        """
+        self._fd = fd
+        self._filesize = filesize
+
+    @property
+    def filesize(self) -> int:
+        """Returns input file size
+
+        Returns:
+            int: Input file size
+        """
+        return self._filesize
+
+    def lineend(self, pos: int) -> int:
+        """Returns the offset right after the first newline found
+        at or after the given position
+
+        Args:
+            pos (int): Offset to start probing from
+
+        Returns:
+            int: Line end offset or the file size if no newline is found
+        """
+        probesize = constant.DEFAULT_PROBE_SIZE
+        while pos < self._filesize:
+            block = os.pread(self._fd, probesize, pos)
+            if not block:
+                break
+            idx = block.find(b'\n')
+            if idx != -1:
+                return pos + idx + 1
+            pos += len(block)
+        return self._filesize
+
+    def lastlineend(self, lo: int, hi: int) -> int:
+        """Returns the offset right after the last newline found
+        between the given offsets. Probes backwards from the upper offset.
+
+        Args:
+            lo (int): Lower offset (inclusive)
+            hi (int): Upper offset (exclusive)
+
+        Returns:
+            int: Line end offset or -1 if no newline is found
+        """
+        probesize = constant.DEFAULT_PROBE_SIZE
+        pos = hi
+        while pos > lo:
+            blockstart = max(lo, pos - probesize)
+            block = os.pread(self._fd, pos - blockstart, blockstart)
+            idx = block.rfind(b'\n')
+            if idx != -1:
+                return blockstart + idx + 1
+            pos = blockstart
+        return -1
+
+    def nthlineend(self, pos: int, n: int) -> int:
+        """Returns the end offset of the nth line starting at the given position.
+        The newlines are counted block by block without splitting the lines.
+
+        Args:
+            pos (int): Offset of a line start
+            n (int): Number of lines
+
+        Returns:
+            int: Line end offset or the file size if the file has less lines
+        """
+        if n <= 0:
+            return pos
+        while pos < self._filesize:
+            block = os.pread(self._fd, constant.DEFAULT_BLOCK_SIZE, pos)
+            if not block:
+                break
+            count = block.count(b'\n')
+            if count >= n:
+                idx = -1
+                for _ in range(n):
+                    idx = block.find(b'\n', idx + 1)
+                return pos + idx + 1
+            n -= count
+            pos += len(block)
+        return self._filesize
+
+    def tailstart(self, n: int) -> int:
+        """Returns the start offset of the last n lines. The newlines
+        are counted block by block backwards from the end of the file.
+
+        Args:
+            n (int): Number of lines
+
+        Returns:
+            int: Line start offset or 0 if the file has less lines
+        """
+        if n <= 0:
+            return self._filesize
+        pos = self._filesize
+        if pos and os.pread(self._fd, 1, pos - 1) == b'\n':
+            # Newline ending the last line does not start a line
+            pos -= 1
+        while pos > 0:
+            blockstart = max(0, pos - constant.DEFAULT_BLOCK_SIZE)
+            block = os.pread(self._fd, pos - blockstart, blockstart)
+            count = block.count(b'\n')
+            if count >= n:
+                idx = len(block)
+                for _ in range(n):
+                    idx = block.rfind(b'\n', 0, idx)
+                return blockstart + idx + 1
+            n -= count
+            pos = blockstart
+        return 0
+
+
+class LineIndex:
+
+    def __init__(self, newlines: array, filesize: int, mtime: int,
+                 quotechar: Optional[bytes] = None) -> None:
+        """Constructor. Finds line ends by looking up the offsets
+        of every newline in the file. Lines are the records of the
+        file if a quote char is given.
+
+        Args:
+            newlines (array): Offsets of every newline in the file
+            filesize (int): Input file size
+            mtime (int): Input file modification time in nanoseconds
+            quotechar (Optional[bytes], optional): Quote char of the records
+                the newlines end. Defaults to None.
+        """
+        self._newlines = newlines
+        self._filesize = filesize
+        self._mtime = mtime
+        self._quotechar = quotechar
+
+    def __len__(self) -> int:
+        """Returns number of lines in the file
+
+        Returns:
+            int: Number of lines
+        """
+        count = len(self._newlines)
+        if self._filesize and (not count or self._newlines[-1] + 1 != self._filesize):
+            count += 1
+        return count
+
+    @property
+    def filesize(self) -> int:
+        """Returns input file size
+
+        Returns:
+            int: Input file size
+        """
+        return self._filesize
+
+    def lineend(self, pos: int) -> int:
+        """Returns the offset right after the first newline found
+        at or after the given position
+
+        Args:
+            pos (int): Offset to look up from
+
+        Returns:
+            int: Line end offset or the file size if no newline is found
+        """
+        idx = bisect_left(self._newlines, pos)
+        if idx < len(self._newlines):
+            return self._newlines[idx] + 1
+        return self._filesize
+
+    def lastlineend(self, lo: int, hi: int) -> int:
+        """Returns the offset right after the last newline found
+        between the given offsets
+
+        Args:
+            lo (int): Lower offset (inclusive)
+            hi (int): Upper offset (exclusive)
+
+        Returns:
+            int: Line end offset or -1 if no newline is found
+        """
+        idx = bisect_left(self._newlines, hi) - 1
+        if idx >= 0 and self._newlines[idx] >= lo:
+            return self._newlines[idx] + 1
+        return -1
+
+    def nthlineend(self, pos: int, n: int) -> int:
+        """Returns the end offset of the nth line starting at the given position
+
+        Args:
+            pos (int): Offset of a line start
+            n (int): Number of lines
+
+        Returns:
+            int: Line end offset or the file size if the file has less lines
+        """
+        idx = bisect_left(self._newlines, pos) + n - 1
+        if n > 0 and idx < len(self._newlines):
+            return self._newlines[idx] + 1
+        return pos if n <= 0 else self._filesize
+
+    def tailstart(self, n: int) -> int:
+        """Returns the start offset of the last n lines
+
+        Args:
+            n (int): Number of lines
+
+        Returns:
+            int: Line start offset or 0 if the file has less lines
+        """
+        count = len(self)
+        if n <= 0:
+            return self._filesize
+        if n >= count:
+            return 0
+        return self._newlines[count - n - 1] + 1
+
+    def countlines(self, lo: int, hi: int) -> int:
+        """Returns number of newlines between the given offsets
+
+        Args:
+            lo (int): Lower offset (inclusive)
+            hi (int): Upper offset (exclusive)
+
+        Returns:
+            int: Number of newlines
+        """
+        return bisect_left(self._newlines, hi) - bisect_left(self._newlines, lo)
+
+    @staticmethod
+    def _scanblock(buf: mmap.mmap, start: int, end: int,
+                   quotechar: Optional[bytes]) -> tuple:
+        """Returns the offsets of the newlines in a block of the mapped file
+
+        Args:
+            buf (mmap.mmap): Memory mapped file
+            start (int): Start offset of the block
+            end (int): End offset of the block
+            quotechar (Optional[bytes]): Quote char of the records or None
+
+        Returns:
+            tuple: Newline offsets after an even and an odd number of quote chars
+                and True if the block has an odd number of quote chars
+        """
+        if quotechar is not None:
+            return scanrecords(buf[start:end], quotechar, start)
+        newlines = array('Q')
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        if numpy is not None:
+            block = numpy.frombuffer(buf, dtype=numpy.uint8,
+                                     count=end - start, offset=start)
+            offsets = numpy.flatnonzero(block == 10).astype(numpy.uint64)
+            offsets += start
+            newlines.frombytes(offsets.tobytes())
+            return newlines, None, False
+        # Line lengths are accumulated in C to get the newline offsets
+        parts = buf[start:end].split(b'\n')
+        newlines.extend(islice(accumulate(
+            map((1).__add__, map(len, parts[:-1])), initial=start - 1), 1, None))
+        return newlines, None, False
+
+    @staticmethod
+    def _scan(buf: mmap.mmap, size: int, quotechar: Optional[bytes] = None,
+              workers: int = 1) -> array:
+        """Returns the offsets of every newline in the mapped file. The blocks
+        are scanned independently so a pool of workers can scan them.
+
+        Args:
+            buf (mmap.mmap): Memory mapped file
+            size (int): File size
+            quotechar (Optional[bytes], optional): Quote char to skip the newlines
+                inside quoted fields. Defaults to None.
+            workers (int, optional): Number of workers. Defaults to 1.
+
+        Returns:
+            array: Newline offsets
+        """
+        # Records are scanned in smaller blocks as the quote parity of
+        # every byte is held while the block is scanned
+        blocksize = (constant.DEFAULT_INDEX_BLOCK_SIZE if quotechar is None
+                     else constant.DEFAULT_BLOCK_SIZE)
+        blocks = [(start, min(start + blocksize, size))
+                  for start in range(0, size, blocksize)]
+        newlines = array('Q')
+        inquote = False
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+        with pool as executor:
+            scan = executor.map if executor else map
+            for even, odd, parity in scan(
+                    lambda block: LineIndex._scanblock(buf, *block, quotechar), blocks):
+                # Quote state at the start of each block is known
+                # once the blocks before it have been scanned
+                newlines.extend(odd if inquote else even)
+                inquote ^= parity
+        return newlines
+
+    @staticmethod
+    def _getmagic(quotechar: Optional[bytes]) -> bytes:
+        """Returns magic of the index file
+
+        Args:
+            quotechar (Optional[bytes]): Quote char of the records or None
+
+        Returns:
+            bytes: Index file magic
+        """
+        if quotechar is None:
+            return _INDEX_MAGIC
+        return _RECORD_INDEX_MAGIC % quotechar[0]
+
+    @classmethod
+    def build(cls, inputfile: str, quotechar: Optional[bytes] = None,
+              workers: int = 1) -> 'LineIndex':
+        """Builds the index by memory mapping the input file
+
+        Args:
+            inputfile (str): Path to the input file
+            quotechar (Optional[bytes], optional): Quote char to index the records
+                instead of the lines. Defaults to None.
+            workers (int, optional): Number of workers scanning the file. Defaults to 1.
+
+        Returns:
+            LineIndex: Line index
+        """
+        log.info(f'Building {"line" if quotechar is None else "record"} index for "{inputfile}"')
+        with open(inputfile, mode='rb') as reader:
+            stat = os.fstat(reader.fileno())
+            newlines = array('Q')
+            if stat.st_size:
+                with mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    newlines = cls._scan(buf, stat.st_size, quotechar, workers)
+        return cls(newlines, stat.st_size, stat.st_mtime_ns, quotechar)
+
+    @classmethod
+    def load(cls, indexfile: str, inputfile: str,
+             quotechar: Optional[bytes] = None) -> 'LineIndex':
+        """Loads a saved index. The index is discarded if the input
+        file has changed since it was built.
+
+        Args:
+            indexfile (str): Path to the index file
+            inputfile (str): Path to the input file
+            quotechar (Optional[bytes], optional): Quote char of the indexed
+                records. Defaults to None.
+
+        Returns:
+            LineIndex: Line index or None if not usable
+        """
+        if not os.path.isfile(indexfile):
+            return None
+        stat = os.stat(inputfile)
+        with open(indexfile, mode='rb') as reader:
+            magic, filesize, mtime, count = _INDEX_HEADER.unpack(
+                reader.read(_INDEX_HEADER.size))
+            if (magic != cls._getmagic(quotechar) or filesize != stat.st_size
+                    or mtime != stat.st_mtime_ns):
+                log.info(f'Line index "{indexfile}" is stale, ignoring it')
+                return None
+            newlines = array('Q')
+            newlines.fromfile(reader, count)
+        if sys.byteorder == 'big':
+            newlines.byteswap()
+        log.info(f'Loaded line index "{indexfile}"')
+        return cls(newlines, filesize, mtime, quotechar)
+
+    def save(self, indexfile: str) -> None:
+        """Saves the index
+
+        Args:
+            indexfile (str): Path to the index file
+        """
+        newlines = self._newlines
+        if sys.byteorder == 'big':
+            newlines = array('Q', newlines)
+            newlines.byteswap()
+        with open(indexfile, mode='wb') as writer:
+            writer.write(_INDEX_HEADER.pack(
+                LineIndex._getmagic(self._quotechar), self._filesize, self._mtime, len(newlines)))
+            newlines.tofile(writer)
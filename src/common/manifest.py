@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import BinaryIO, List, Optional, TextIO, Union
+import csv
+import json
+
+from .lineindex import countlines
+
+
+def hasheader(row: dict) -> bool:
+    """Returns True if the split of a manifest row includes the header
+
+    Args:
+        row (dict): Manifest row
+
+    Returns:
+        bool: True/False
+    """
+    header = row['header']
+    if isinstance(header, bool):
+        return header
+    return header.lower() == 'true'
+
+
+class ManifestWriter:
+
+    def __init__(self, writer: TextIO, fieldnames: List[str], manifestformat: str = 'csv') -> None:
+        """Constructor. Writes the manifest rows as CSV or as one
+        compact JSON object per line.
+
+        Args:
+            writer (TextIO): Manifest file writer
+            fieldnames (List[str]): Manifest columns
+            manifestformat (str, optional): "csv" or "jsonl". Defaults to 'csv'.
+        """
+        self._writer = writer
+        self._fieldnames = fieldnames
+        self._csvwriter = None
+        if manifestformat == 'csv':
+            self._csvwriter = csv.DictWriter(
+                writer, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
+
+    def writeheader(self) -> None:
+        """Writes the columns. JSON lines manifests have no header line.
+        """
+        if self._csvwriter is not None:
+            self._csvwriter.writeheader()
+
+    def writerow(self, row: dict) -> None:
+        """Writes a manifest row
+
+        Args:
+            row (dict): Manifest row
+        """
+        if self._csvwriter is not None:
+            self._csvwriter.writerow(row)
+            return
+        self._writer.write(json.dumps(
+            {name: row.get(name) for name in self._fieldnames}, separators=(',', ':')))
+        self._writer.write('\n')
+
+    def writerows(self, rows: List[dict]) -> None:
+        """Writes manifest rows
+
+        Args:
+            rows (List[dict]): Manifest rows
+        """
+        for row in rows:
+            self.writerow(row)
+
+
+class Manifest:
+
+    def __init__(self, lines: List[Union[str, dict]]) -> None:
+        """Constructor. Rows of a manifest in split order. Rows of a JSON lines
+        manifest are only parsed when they are looked up, so a subset of
+        the splits is found without parsing the whole manifest.
+
+        Args:
+            lines (List[Union[str, dict]]): JSON line or parsed row of each split
+        """
+        self._lines = lines
+
+    @classmethod
+    def load(cls, manifestfile: str) -> 'Manifest':
+        """Reads a manifest. The format is detected from its first character.
+
+        Args:
+            manifestfile (str): Manifest file path
+
+        Returns:
+            Manifest: Manifest rows
+        """
+        with open(manifestfile, mode='r', encoding='utf8', newline='') as reader:
+            if reader.read(1) != '{':
+                reader.seek(0)
+                return cls(list(csv.DictReader(reader)))
+            reader.seek(0)
+            return cls(reader.read().splitlines())
+
+    def __len__(self) -> int:
+        """Returns number of splits
+
+        Returns:
+            int: Number of splits
+        """
+        return len(self._lines)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[dict, List[dict]]:
+        """Returns the row of a split or the rows of a range of splits
+
+        Args:
+            index (Union[int, slice]): Split index starting from 0 or range of indexes
+
+        Returns:
+            Union[dict, List[dict]]: Manifest row or rows
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._lines)))]
+        row = self._lines[index]
+        if isinstance(row, str):
+            row = json.loads(row)
+            self._lines[index] = row
+        return row
+
+    def __iter__(self):
+        """Iterates over the rows in split order
+
+        Yields:
+            dict: Manifest row
+        """
+        for index in range(len(self._lines)):
+            yield self[index]
+
+    def getint(self, index: int, name: str) -> Optional[int]:
+        """Returns a numeric column of a split
+
+        Args:
+            index (int): Split index starting from 0
+            name (str): Column name
+
+        Returns:
+            Optional[int]: Column value or None if the split does not record it
+        """
+        value = self[index].get(name)
+        if value is None or value == '':
+            return None
+        return int(value)
+
+    def bisect(self, name: str, value: int) -> int:
+        """Returns the index of the first split whose numeric column is greater
+        than the given value. Only the rows probed by the binary search are parsed.
+
+        Args:
+            name (str): Column that increases in split order such as "offset" or "line"
+            value (int): Value to look up
+
+        Returns:
+            int: Split index, number of splits if no split is greater
+        """
+        lo, hi = 0, len(self._lines)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.getint(mid, name) > value:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+
+class CountingWriter:
+
+    def __init__(self, writer: BinaryIO) -> None:
+        """Constructor. Counts the bytes and lines written into a split
+        for its manifest row.
+
+        Args:
+            writer (BinaryIO): Split file writer
+        """
+        self._writer = writer
+        self._size = 0
+        self._lines = 0
+
+    @property
+    def writer(self) -> BinaryIO:
+        """Returns wrapped writer
+
+        Returns:
+            BinaryIO: Split file writer
+        """
+        return self._writer
+
+    @property
+    def size(self) -> int:
+        """Returns number of bytes written
+
+        Returns:
+            int: Number of bytes
+        """
+        return self._size
+
+    @property
+    def lines(self) -> int:
+        """Returns number of newlines written
+
+        Returns:
+            int: Number of newlines
+        """
+        return self._lines
+
+    def write(self, data: bytes) -> int:
+        """Writes data into the split
+
+        Args:
+            data (bytes): Data to write
+
+        Returns:
+            int: Number of bytes written
+        """
+        self._size += len(data)
+        self._lines += countlines(data)
+        return self._writer.write(data)
+
+    def close(self) -> None:
+        """Closes the wrapped writer
+        """
+        self._writer.close()
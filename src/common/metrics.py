@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import BinaryIO, Optional
+import threading
+import time
+
+from .lineindex import countlines
+
+
+class MetricsHook:
+    """Receives the metrics of a split or merge. Subclass it to export the
+    metrics, e.g. to Prometheus. The methods may be called from worker
+    threads and should return quickly.
+    """
+
+    def counter(self, name: str, value: int) -> None:
+        """Increments a counter
+
+        Args:
+            name (str): "bytes_read", "bytes_written", "lines" or "splits"
+            value (int): Increment
+        """
+
+    def timing(self, name: str, seconds: float) -> None:
+        """Records a duration
+
+        Args:
+            name (str): "read", "write" or "copy" for the time blocked in I/O
+                or "split" for the latency of each split
+            seconds (float): Duration
+        """
+
+    def progress(self, done: int, total: Optional[int], rate: float,
+                 eta: Optional[float]) -> None:
+        """Reports progress after each split
+
+        Args:
+            done (int): Number of input bytes processed
+            total (Optional[int]): Input size or None if not known
+            rate (float): Bytes processed per second
+            eta (Optional[float]): Estimated seconds left or None if not known
+        """
+
+
+class MetricsCollector(MetricsHook):
+
+    def __init__(self) -> None:
+        """Constructor. Collects the metrics in process.
+        """
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+        self._progress = None
+
+    def counter(self, name: str, value: int) -> None:
+        """Increments a counter
+
+        Args:
+            name (str): Counter name
+            value (int): Increment
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def timing(self, name: str, seconds: float) -> None:
+        """Records a duration
+
+        Args:
+            name (str): Timing name
+            seconds (float): Duration
+        """
+        with self._lock:
+            timing = self._timings.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            timing['count'] += 1
+            timing['total'] += seconds
+            timing['max'] = max(timing['max'], seconds)
+
+    def progress(self, done: int, total: Optional[int], rate: float,
+                 eta: Optional[float]) -> None:
+        """Keeps the last progress
+
+        Args:
+            done (int): Number of input bytes processed
+            total (Optional[int]): Input size or None if not known
+            rate (float): Bytes processed per second
+            eta (Optional[float]): Estimated seconds left or None if not known
+        """
+        with self._lock:
+            self._progress = {'done': done, 'total': total, 'rate': rate, 'eta': eta}
+
+    def snapshot(self) -> dict:
+        """Returns the metrics collected so far
+
+        Returns:
+            dict: Counters, timings with their count, total and max seconds and the last progress
+        """
+        with self._lock:
+            return {'counters': dict(self._counters),
+                    'timings': {name: dict(timing) for name, timing in self._timings.items()},
+                    'progress': dict(self._progress) if self._progress else None}
+
+
+class Progress:
+
+    def __init__(self, hook: MetricsHook, total: Optional[int], done: int = 0) -> None:
+        """Constructor. Computes throughput and ETA from the bytes processed.
+
+        Args:
+            hook (MetricsHook): Hook to report to
+            total (Optional[int]): Input size or None if not known
+            done (int, optional): Number of input bytes processed by an earlier
+                run that is resumed. Defaults to 0.
+        """
+        self._hook = hook
+        self._total = total
+        self._startdone = done
+        self._starttime = time.perf_counter()
+
+    def update(self, done: int) -> None:
+        """Reports the bytes processed so far
+
+        Args:
+            done (int): Number of input bytes processed
+        """
+        elapsed = time.perf_counter() - self._starttime
+        rate = (done - self._startdone) / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self._total is not None and rate > 0:
+            eta = max(self._total - done, 0) / rate
+        self._hook.progress(done, self._total, rate, eta)
+
+
+class MeteredReader:
+
+    def __init__(self, reader: BinaryIO, hook: MetricsHook) -> None:
+        """Constructor. Counts and times the reads of the input.
+
+        Args:
+            reader (BinaryIO): Input reader
+            hook (MetricsHook): Hook to report to
+        """
+        self._reader = reader
+        self._hook = hook
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads from the input
+
+        Args:
+            size (int, optional): Max number of bytes. Defaults to -1.
+
+        Returns:
+            bytes: Data read
+        """
+        starttime = time.perf_counter()
+        data = self._reader.read(size)
+        self._hook.timing('read', time.perf_counter() - starttime)
+        self._hook.counter('bytes_read', len(data))
+        return data
+
+    def __getattr__(self, name: str):
+        return getattr(self._reader, name)
+
+
+class MeteredWriter:
+
+    def __init__(self, writer: BinaryIO, hook: MetricsHook) -> None:
+        """Constructor. Counts and times the writes into a split.
+
+        Args:
+            writer (BinaryIO): Split writer
+            hook (MetricsHook): Hook to report to
+        """
+        self._writer = writer
+        self._hook = hook
+
+    @property
+    def writer(self) -> BinaryIO:
+        """Returns the wrapped writer
+
+        Returns:
+            BinaryIO: Split writer
+        """
+        return self._writer
+
+    def write(self, data: bytes) -> int:
+        """Writes into the split
+
+        Args:
+            data (bytes): Data to write
+
+        Returns:
+            int: Number of bytes written
+        """
+        starttime = time.perf_counter()
+        written = self._writer.write(data)
+        self._hook.timing('write', time.perf_counter() - starttime)
+        self._hook.counter('bytes_written', len(data))
+        self._hook.counter('lines', countlines(data))
+        return written
+
+    def close(self) -> None:
+        """Closes the wrapped writer
+        """
+        self._writer.close()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import Callable, List, Optional, Union
+import csv
+import io
+import zlib
+
+from .records import splitrecords
+
+
+class Partitioner:
+
+    def __init__(self, key: Union[Callable, int], partitions: int,
+                 delimiter: bytes, quotechar: Optional[bytes] = None) -> None:
+        """Constructor. Assigns records to partitions by a hash of their key.
+        The hash is stable across processes and runs, so the same key always
+        lands in the same partition. Instances are sent to worker processes
+        so the key function must be picklable to use them.
+
+        Args:
+            key (Union[Callable, int]): Function returning the key of a record
+                or index of the key column
+            partitions (int): Number of partitions
+            delimiter (bytes): Column delimiter
+            quotechar (Optional[bytes], optional): Quote char of the CSV records.
+                Defaults to None.
+        """
+        self._key = key
+        self._partitions = partitions
+        self._delimiter = delimiter
+        self._quotechar = quotechar
+
+    def getkey(self, record: bytes) -> bytes:
+        """Returns the key of a record
+
+        Args:
+            record (bytes): Record including the newline if any
+
+        Returns:
+            bytes: Key
+        """
+        if callable(self._key):
+            key = self._key(record)
+            if isinstance(key, bytes):
+                return key
+            return key.encode() if isinstance(key, str) else str(key).encode()
+        if self._quotechar is None:
+            fields = record.rstrip(b'\r\n').split(self._delimiter, self._key + 1)
+        else:
+            # Quoted fields may contain the delimiter and newlines
+            text = io.StringIO(record.decode(errors='surrogateescape'), newline='')
+            fields = next(csv.reader(text, delimiter=self._delimiter.decode(),
+                                     quotechar=self._quotechar.decode()), [])
+            fields = [field.encode(errors='surrogateescape') for field in fields]
+        return fields[self._key] if self._key < len(fields) else b''
+
+    def getpartition(self, record: bytes) -> int:
+        """Returns the partition of a record
+
+        Args:
+            record (bytes): Record including the newline if any
+
+        Returns:
+            int: Partition number starting from 0
+        """
+        return zlib.crc32(self.getkey(record)) % self._partitions
+
+    def partition(self, data: bytes) -> List[bytes]:
+        """Distributes a block of records into the partitions
+
+        Args:
+            data (bytes): Block of complete records
+
+        Returns:
+            List[bytes]: Records of each partition in the order they were read
+        """
+        parts = [[] for _ in range(self._partitions)]
+        getpartition = self.getpartition
+        for record in splitrecords(data, self._quotechar):
+            parts[getpartition(record)].append(record)
+        return [b''.join(part) for part in parts]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import BinaryIO, Optional
+from concurrent.futures import Executor
+import os
+import queue
+import threading
+import time
+
+from . import constant
+from .metrics import MetricsHook
+
+
+def syncfd(fd: int, fsync: bool = True, dropcache: bool = False,
+           metrics: Optional[MetricsHook] = None) -> None:
+    """Flushes a file to the storage device and drops its pages from the page
+    cache if requested. Dirty pages are not dropped, so they are written back first.
+
+    Args:
+        fd (int): File descriptor
+        fsync (bool, optional): Set to True to flush the file. Defaults to True.
+        dropcache (bool, optional): Set to True to drop the file from the
+            page cache. Defaults to False.
+        metrics (Optional[MetricsHook], optional): Hook the time spent flushing
+            is reported to as ``fsync``. Defaults to None.
+    """
+    if metrics is not None:
+        starttime = time.perf_counter()
+    if fsync:
+        os.fsync(fd)
+    elif dropcache:
+        os.fdatasync(fd)
+    if dropcache:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    if metrics is not None:
+        metrics.timing('fsync', time.perf_counter() - starttime)
+
+
+def syncfile(path: str, fsync: bool = True, dropcache: bool = False,
+             metrics: Optional[MetricsHook] = None) -> None:
+    """Flushes a closed file to the storage device and drops its pages
+    from the page cache if requested
+
+    Args:
+        path (str): File path
+        fsync (bool, optional): Set to True to flush the file. Defaults to True.
+        dropcache (bool, optional): Set to True to drop the file from the
+            page cache. Defaults to False.
+        metrics (Optional[MetricsHook], optional): Hook the time spent flushing
+            is reported to as ``fsync``. Defaults to None.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        syncfd(fd, fsync, dropcache, metrics)
+    finally:
+        os.close(fd)
+
+
+class ReadAheadReader:
+
+    def __init__(self, reader: BinaryIO, blocksize: int,
+                 depth: int = constant.PIPELINE_DEPTH) -> None:
+        """Constructor. Reads the next blocks in a background thread while
+        the blocks read so far are processed, so read latency overlaps
+        with the processing and the writes.
+
+        Args:
+            reader (BinaryIO): File like object
+            blocksize (int): Number of bytes to read at once
+            depth (int, optional): Max number of blocks read ahead.
+                Defaults to constant.PIPELINE_DEPTH.
+        """
+        self._reader = reader
+        self._blocksize = blocksize
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._block = b''
+        self._pos = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._readahead, daemon=True)
+        self._thread.start()
+
+    def _readahead(self) -> None:
+        """Reads the blocks into the queue until the end of the file.
+        An error is queued to be raised by the reader.
+        """
+        try:
+            while not self._stop.is_set():
+                block = self._reader.read(self._blocksize)
+                self._put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item) -> None:
+        """Queues an item without waiting forever once the reader is closed
+
+        Args:
+            item: Block, empty block at the end of the file or error
+        """
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=constant.COMPRESS_QUEUE_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads up to size bytes. Whole blocks are returned without copying.
+
+        Args:
+            size (int, optional): Max number of bytes to read,
+                a negative size reads the next block. Defaults to -1.
+
+        Returns:
+            bytes: Data, empty at the end of the file
+        """
+        if self._pos == len(self._block):
+            if self._eof:
+                return b''
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            self._block, self._pos = item, 0
+            if not item:
+                self._eof = True
+                return b''
+        if size < 0 or size >= len(self._block) - self._pos:
+            data = self._block if not self._pos else self._block[self._pos:]
+            self._pos = len(self._block)
+            return data
+        data = self._block[self._pos:self._pos + size]
+        self._pos += size
+        return data
+
+    def close(self) -> None:
+        """Stops reading ahead. The wrapped reader is left open.
+        """
+        self._stop.set()
+        while self._thread.is_alive():
+            # Unblock a pending put
+            try:
+                self._queue.get(timeout=constant.COMPRESS_QUEUE_TIMEOUT)
+            except queue.Empty:
+                pass
+
+
+class WriteBehindWriter:
+
+    def __init__(self, path: str, executor: Executor, fsync: bool = False,
+                 dropcache: bool = False, metrics: Optional[MetricsHook] = None) -> None:
+        """Constructor. Writes a split in the executor, from opening the file
+        to closing it, so the writes overlap with reading the data of the
+        next split. The split size is counted as the data is written.
+
+        Args:
+            path (str): Split file path
+            executor (Executor): Executor to run the writes in
+            fsync (bool, optional): Set to True to flush the split to the
+                storage device before it is closed. Defaults to False.
+            dropcache (bool, optional): Set to True to drop the split from the
+                page cache before it is closed. Defaults to False.
+            metrics (Optional[MetricsHook], optional): Hook the time spent
+                flushing the split is reported to. Defaults to None.
+        """
+        self._path = path
+        self._fsync = fsync
+        self._dropcache = dropcache
+        self._metrics = metrics
+        self._queue = queue.Queue(maxsize=constant.PIPELINE_DEPTH)
+        self._rawsize = 0
+        self._future = executor.submit(self._write)
+
+    @property
+    def rawsize(self) -> int:
+        """Returns number of bytes written
+
+        Returns:
+            int: Raw size
+        """
+        return self._rawsize
+
+    def _write(self) -> int:
+        """Writes the queued data into the split file
+
+        Returns:
+            int: Split size
+        """
+        size = 0
+        with open(self._path, mode='wb') as writer:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    break
+                size += writer.write(data)
+            if self._fsync or self._dropcache:
+                writer.flush()
+                syncfd(writer.fileno(), self._fsync, self._dropcache, self._metrics)
+        return size
+
+    def _put(self, data: Optional[bytes]) -> None:
+        """Queues data for the writes without waiting
+        forever if the writes have failed
+
+        Args:
+            data (Optional[bytes]): Data to write or None to finish the split
+        """
+        while True:
+            try:
+                self._queue.put(data, timeout=constant.COMPRESS_QUEUE_TIMEOUT)
+                return
+            except queue.Full:
+                if self._future.done():
+                    self._future.result()
+
+    def write(self, data: bytes) -> int:
+        """Queues data to be written into the split. The data must not
+        be modified afterwards as it is not copied.
+
+        Args:
+            data (bytes): Data to write
+
+        Returns:
+            int: Number of bytes written
+        """
+        self._put(data)
+        self._rawsize += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        """Finishes the split once the queued data is written
+        """
+        self._put(None)
+
+    def done(self) -> bool:
+        """Returns True once the split is written
+
+        Returns:
+            bool: True/False
+        """
+        return self._future.done()
+
+    def result(self) -> int:
+        """Waits for the split to be written
+
+        Returns:
+            int: Split size
+        """
+        return self._future.result()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import BinaryIO, List, Optional, Tuple
+from array import array
+from bisect import bisect_left
+
+from .blockreader import BlockReader
+
+
+def scanrecords(data: bytes, quotechar: bytes, base: int = 0) -> Tuple[array, array, bool]:
+    """Returns the offsets of the newlines in the data split by the parity of
+    the quote chars found before them. Newlines preceded by an even number of
+    quote chars end a record if the data starts outside a quoted field, the odd
+    ones end a record otherwise. As the data is scanned without knowing
+    the quote state it starts in, blocks can be scanned independently.
+
+    Args:
+        data (bytes): Bytes like object
+        quotechar (bytes): Quote char
+        base (int, optional): Offset added to the newline offsets. Defaults to 0.
+
+    Returns:
+        Tuple[array, array, bool]: Offsets of the newlines after an even and an odd
+            number of quote chars and True if the data has an odd number of quote chars
+    """
+    even, odd = array('Q'), array('Q')
+    if not len(data):
+        return even, odd, False
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is not None:
+        block = numpy.frombuffer(data, dtype=numpy.uint8)
+        # Parity survives the running count wrapping around
+        quotes = numpy.cumsum(block == quotechar[0], dtype=numpy.uint8)
+        newlines = numpy.flatnonzero(block == 10)
+        inquote = (quotes[newlines] & 1).astype(bool)
+        offsets = newlines.astype(numpy.uint64)
+        offsets += base
+        even.frombytes(offsets[~inquote].tobytes())
+        odd.frombytes(offsets[inquote].tobytes())
+        return even, odd, bool(quotes[-1] & 1)
+    # Parts between the quote chars alternate between even and odd parity
+    parts = bytes(data).split(quotechar)
+    pos = base
+    for num, part in enumerate(parts):
+        idx = part.find(b'\n')
+        if idx != -1:
+            offsets = odd if num & 1 else even
+            while idx != -1:
+                offsets.append(pos + idx)
+                idx = part.find(b'\n', idx + 1)
+        pos += len(part) + 1
+    return even, odd, bool((len(parts) - 1) & 1)
+
+
+def splitrecords(data: bytes, quotechar: Optional[bytes] = None) -> List[bytes]:
+    """Returns the records of a block of complete records
+
+    Args:
+        data (bytes): Block starting on a record boundary
+        quotechar (Optional[bytes], optional): Quote char or None to
+            split the lines. Defaults to None.
+
+    Returns:
+        List[bytes]: Records including their newlines. The last record of
+            the data is kept as read if it has no newline.
+    """
+    if quotechar is None:
+        records = data.split(b'\n')
+        last = records.pop()
+        records = [record + b'\n' for record in records]
+    else:
+        ends, _, _ = scanrecords(data, quotechar)
+        records, start = [], 0
+        for end in ends:
+            records.append(data[start:end + 1])
+            start = end + 1
+        last = data[start:]
+    if last:
+        records.append(last)
+    return records
+
+
+def readrecord(reader: BinaryIO, quotechar: Optional[bytes]) -> bytes:
+    """Reads the next record. Lines are read until the quote chars are balanced.
+
+    Args:
+        reader (BinaryIO): File like object
+        quotechar (Optional[bytes]): Quote char or None to read a line
+
+    Returns:
+        bytes: Record including the newline if any
+    """
+    record = reader.readline()
+    if quotechar is None:
+        return record
+    quotes = record.count(quotechar)
+    while quotes & 1:
+        line = reader.readline()
+        if not line:
+            break
+        record += line
+        quotes += line.count(quotechar)
+    return record
+
+
+class RecordReader(BlockReader):
+
+    def __init__(self, reader: BinaryIO, blocksize: int, quotechar: bytes,
+                 initial: Optional[bytes] = None) -> None:
+        """Constructor. Block reader that only finds the newlines ending a
+        record, the newlines inside quoted fields are skipped. Input must
+        start on a record boundary.
+
+        Args:
+            reader (BinaryIO): File like object
+            blocksize (int): Number of bytes to read at once
+            quotechar (bytes): Quote char
+            initial (Optional[bytes], optional): Data to serve before
+                reading from the file. Defaults to None.
+        """
+        super().__init__(reader, blocksize, initial)
+        self._quotechar = quotechar
+        self._inquote = False
+        # Offsets of the record ends counted from the start of the input
+        self._ends = array('Q')
+        self._scanned = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        """Finds the record ends in the bytes read since the last scan
+        """
+        base = self._consumed - self._pos
+        del self._ends[:bisect_left(self._ends, self._consumed)]
+        even, odd, parity = scanrecords(
+            memoryview(self._buf)[self._scanned - base:], self._quotechar, self._scanned)
+        self._ends.extend(odd if self._inquote else even)
+        self._inquote ^= parity
+        self._scanned = base + len(self._buf)
+
+    def fill(self) -> bool:
+        """Reads the next block and appends it to the pending bytes.
+        Offsets relative to the pending bytes remain valid.
+
+        Returns:
+            bool: False if the end of the file has been reached
+        """
+        if not super().fill():
+            return False
+        self._scan()
+        return True
+
+    def _range(self, start: int, end: Optional[int]) -> tuple:
+        """Translates offsets relative to the pending bytes into
+        indexes of the record ends
+
+        Args:
+            start (int): Relative start offset
+            end (Optional[int]): Relative end offset
+
+        Returns:
+            tuple: Start and end index
+        """
+        stop = len(self) if end is None else min(len(self), max(end, 0))
+        return (bisect_left(self._ends, self._consumed + start),
+                bisect_left(self._ends, self._consumed + stop))
+
+    def find(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the lowest offset of sub in the pending bytes.
+        Only the newlines ending a record are found.
+
+        Args:
+            sub (bytes): Bytes to find
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Relative offset or -1 if not found
+        """
+        if sub != b'\n':
+            return super().find(sub, start, end)
+        lo, hi = self._range(start, end)
+        return self._ends[lo] - self._consumed if lo < hi else -1
+
+    def rfind(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the highest offset of sub in the pending bytes.
+        Only the newlines ending a record are found.
+
+        Args:
+            sub (bytes): Bytes to find
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Relative offset or -1 if not found
+        """
+        if sub != b'\n':
+            return super().rfind(sub, start, end)
+        lo, hi = self._range(start, end)
+        return self._ends[hi - 1] - self._consumed if lo < hi else -1
+
+    def count(self, sub: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the number of occurrences of sub in the pending bytes.
+        Only the newlines ending a record are counted.
+
+        Args:
+            sub (bytes): Bytes to count
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Number of occurrences
+        """
+        if sub != b'\n':
+            return super().count(sub, start, end)
+        lo, hi = self._range(start, end)
+        return max(hi - lo, 0)
+
+    def findnth(self, sub: bytes, n: int, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the offset of the nth occurrence of sub in the pending bytes.
+        Only the newlines ending a record are found.
+
+        Args:
+            sub (bytes): Bytes to find
+            n (int): Occurrence to find starting from 1
+            start (int, optional): Relative start offset. Defaults to 0.
+            end (Optional[int], optional): Relative end offset. Defaults to None.
+
+        Returns:
+            int: Relative offset or -1 if there are less than n occurrences
+        """
+        if sub != b'\n':
+            return super().findnth(sub, n, start, end)
+        lo, hi = self._range(start, end)
+        idx = lo + n - 1
+        return self._ends[idx] - self._consumed if idx < hi else -1
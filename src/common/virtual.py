@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import BinaryIO, List, Optional
+import io
+import mmap
+import os
+
+from .manifest import Manifest
+
+
+class _VirtualReader(io.RawIOBase):
+
+    def __init__(self, split: 'VirtualSplit') -> None:
+        """Constructor. Reads the header and the byte range of a
+        virtual split from the input file as one stream.
+
+        Args:
+            split (VirtualSplit): Virtual split
+        """
+        self._split = split
+        self._fd = os.open(split.source, os.O_RDONLY)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        """Returns True as the split can be read
+
+        Returns:
+            bool: True
+        """
+        return True
+
+    def seekable(self) -> bool:
+        """Returns True as the split can be seeked
+
+        Returns:
+            bool: True
+        """
+        return True
+
+    def tell(self) -> int:
+        """Returns current position in the split
+
+        Returns:
+            int: Position
+        """
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Changes position in the split
+
+        Args:
+            offset (int): Offset relative to whence
+            whence (int, optional): io.SEEK_SET, io.SEEK_CUR or io.SEEK_END.
+                Defaults to io.SEEK_SET.
+
+        Raises:
+            ValueError: Position is negative
+
+        Returns:
+            int: New position
+        """
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._split.size
+        if offset < 0:
+            raise ValueError(f'Negative seek position {offset}')
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        """Reads into a buffer
+
+        Args:
+            buffer: Writable bytes like object
+
+        Returns:
+            int: Number of bytes read, 0 at the end of the split
+        """
+        split = self._split
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < len(view) and self._pos < split.size:
+            if self._pos < split.headersize:
+                # Header is read from the start of the input file
+                pos, remaining = self._pos, split.headersize - self._pos
+            else:
+                pos = split.offset + self._pos - split.headersize
+                remaining = split.size - self._pos
+            data = os.pread(self._fd, min(len(view) - filled, remaining), pos)
+            if not data:
+                break
+            view[filled:filled + len(data)] = data
+            filled += len(data)
+            self._pos += len(data)
+        return filled
+
+    def close(self) -> None:
+        """Closes the input file
+        """
+        if not self.closed:
+            os.close(self._fd)
+        super().close()
+
+
+class VirtualSplit:
+
+    def __init__(self, source: str, offset: int, length: int,
+                 headersize: int = 0, filename: Optional[str] = None) -> None:
+        """Constructor. Split that is a byte range of the input file
+        with the header prepended instead of a file of its own.
+
+        Args:
+            source (str): Input file path
+            offset (int): Start offset of the range
+            length (int): Range size
+            headersize (int, optional): Size of the header at the start of
+                the input file prepended to the range. Defaults to 0.
+            filename (Optional[str], optional): Split filename. Defaults to None.
+        """
+        self._source = source
+        self._offset = offset
+        self._length = length
+        self._headersize = headersize
+        self._filename = filename
+
+    @classmethod
+    def fromrow(cls, row: dict) -> 'VirtualSplit':
+        """Creates the virtual split recorded in a manifest row
+
+        Args:
+            row (dict): Manifest row
+
+        Returns:
+            VirtualSplit: Virtual split
+        """
+        return cls(row['source'], int(row['offset']), int(row['length']),
+                   int(row['headersize']), row['filename'])
+
+    @property
+    def source(self) -> str:
+        """Returns input file path
+
+        Returns:
+            str: Input file path
+        """
+        return self._source
+
+    @property
+    def offset(self) -> int:
+        """Returns start offset of the range
+
+        Returns:
+            int: Start offset
+        """
+        return self._offset
+
+    @property
+    def length(self) -> int:
+        """Returns range size
+
+        Returns:
+            int: Range size
+        """
+        return self._length
+
+    @property
+    def headersize(self) -> int:
+        """Returns size of the header prepended to the range
+
+        Returns:
+            int: Header size
+        """
+        return self._headersize
+
+    @property
+    def filename(self) -> Optional[str]:
+        """Returns split filename
+
+        Returns:
+            Optional[str]: Split filename
+        """
+        return self._filename
+
+    @property
+    def size(self) -> int:
+        """Returns split size
+
+        Returns:
+            int: Header and range size
+        """
+        return self._headersize + self._length
+
+    def open(self, buffersize: int = io.DEFAULT_BUFFER_SIZE) -> BinaryIO:
+        """Opens the split as a binary file like object
+
+        Args:
+            buffersize (int, optional): Read buffer size. Defaults to io.DEFAULT_BUFFER_SIZE.
+
+        Returns:
+            BinaryIO: Seekable reader of the header and the range
+        """
+        return io.BufferedReader(_VirtualReader(self), buffersize)
+
+    def read(self) -> bytes:
+        """Returns the whole split
+
+        Returns:
+            bytes: Header and range
+        """
+        with self.open() as reader:
+            return reader.read()
+
+    def view(self, buffer: mmap.mmap) -> memoryview:
+        """Returns the range without the header as a memoryview over the
+        memory mapped input file. No data is copied.
+
+        Args:
+            buffer (mmap.mmap): Memory mapped input file
+
+        Returns:
+            memoryview: Range of the input file
+        """
+        return memoryview(buffer)[self._offset:self._offset + self._length]
+
+
+def readsplits(manifestfile: str) -> List[VirtualSplit]:
+    """Returns the virtual splits recorded in a manifest
+
+    Args:
+        manifestfile (str): Manifest file path
+
+    Raises:
+        ValueError: Manifest does not record virtual splits
+
+    Returns:
+        List[VirtualSplit]: Virtual splits in split order
+    """
+    rows = Manifest.load(manifestfile)
+    if len(rows) and not rows[0].get('source'):
+        raise ValueError(f'Manifest "{manifestfile}" does not record virtual splits.')
+    return [VirtualSplit.fromrow(row) for row in rows]
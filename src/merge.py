@@ -5,12 +5,26 @@ Author: rjayapalan
 Created: March 09, 2022
 """
 import os
+from typing import BinaryIO, Callable, Iterator, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 import csv
-from typing import Callable, Optional
+import io
 import logging
+import shutil
+import tempfile
 import time
 
 from .common import constant, error
+from .common.checkpoint import Checkpoint
+from .common.checksum import Checksum, readchecksumfile
+from .common.codec import Codec
+from .common.copier import Copier
+from .common.manifest import Manifest, hasheader
+from .common.metrics import MetricsHook, Progress
+from .common.partition import Partitioner
+from .common.records import readrecord, scanrecords, splitrecords
+from .common.virtual import VirtualSplit
 
 log = logging.getLogger(__name__)
 
@@ -37,6 +51,11 @@ class Merge:
         self._outputfilename = outputfilename
         self._terminate = False
         self._manfilename = constant.MANIFEST_FILE_NAME
+        self._copier = Copier(constant.DEFAULT_COPY_BACKEND)
+        self._checkpoint = None
+        self._resumable = False
+        self._metrics = None
+        self._progress = None
         self._starttime = time.time()
 
     @property
@@ -84,6 +103,33 @@ class Merge:
         """
         return self._manfilename
 
+    @property
+    def copybackend(self) -> str:
+        """Returns copy backend used to move data into the merged file
+
+        Returns:
+            str: Copy backend name
+        """
+        return self._copier.backend
+
+    @property
+    def metrics(self) -> Optional[MetricsHook]:
+        """Returns hook receiving the metrics of the merge
+
+        Returns:
+            Optional[MetricsHook]: Metrics hook
+        """
+        return self._metrics
+
+    @property
+    def resumable(self) -> bool:
+        """Returns True if the progress is checkpointed to resume the merge
+
+        Returns:
+            bool: True/False
+        """
+        return self._resumable
+
     @terminate.setter
     def terminate(self, value: bool) -> None:
         """Sets terminate flag that will terminate the process
@@ -102,6 +148,36 @@ class Merge:
         """
         self._manfilename = value
 
+    @copybackend.setter
+    def copybackend(self, value: str) -> None:
+        """Sets copy backend used to move data into the merged file
+
+        Args:
+            value (str): "auto", "copy_file_range", "sendfile" or "read"
+        """
+        self._copier = Copier(value)
+
+    @metrics.setter
+    def metrics(self, value: Optional[MetricsHook]) -> None:
+        """Sets hook receiving the metrics of the merge. Metrics
+        are not collected when not set.
+
+        Args:
+            value (Optional[MetricsHook]): Metrics hook
+        """
+        self._metrics = value
+
+    @resumable.setter
+    def resumable(self, value: bool) -> None:
+        """Sets whether the progress is checkpointed after each split merged
+        in order so that a merge that did not complete can be resumed.
+        A resumed merge is always checkpointed.
+
+        Args:
+            value (bool): True/False
+        """
+        self._resumable = value
+
     def _getmanifestpath(self) -> str:
         """Returns manifest filepath
 
@@ -130,7 +206,423 @@ class Merge:
         runtime = int((endtime - self._starttime)/60)
         log.info(f'Process completed in {runtime} min(s)')
 
-    def merge(self, cleanup: bool = False, callback: Optional[Callable] = None) -> None:
+    @staticmethod
+    def _readheader(reader: BinaryIO, row: dict, quotechar: Optional[bytes] = None) -> bytes:
+        """Reads the header from the start of a split. The header size recorded
+        in the manifest is read if any, else one whole record so that the
+        newlines quoted in the header are read with it.
+
+        Args:
+            reader (BinaryIO): Split reader positioned at the start of the split
+            row (dict): Manifest row of the split
+            quotechar (Optional[bytes], optional): Quote char of the CSV records
+                if the manifest does not record it. Defaults to None.
+
+        Returns:
+            bytes: Header
+        """
+        headersize = row.get('headersize')
+        if headersize not in (None, ''):
+            return reader.read(int(headersize))
+        if row.get('quotechar'):
+            quotechar = row['quotechar'].encode()
+        return readrecord(reader, quotechar)
+
+    @staticmethod
+    def _getheadersize(row: dict, splitfile: str, skipheader: bool,
+                       virtual: Optional[VirtualSplit] = None) -> int:
+        """Returns size of the header to skip from the split
+
+        Args:
+            row (dict): Manifest row of the split
+            splitfile (str): Split file path
+            skipheader (bool): True if the header of the split is skipped
+            virtual (Optional[VirtualSplit], optional): Virtual split
+                recorded in the manifest. Defaults to None.
+
+        Returns:
+            int: Header size
+        """
+        if not skipheader:
+            return 0
+        if virtual is not None:
+            return virtual.headersize
+        with open(splitfile, mode='rb') as splitreader:
+            return len(Merge._readheader(splitreader, row))
+
+    @staticmethod
+    def _preallocate(fd: int, size: int) -> None:
+        """Preallocates the output file
+
+        Args:
+            fd (int): Output file descriptor
+            size (int): Output file size
+        """
+        if size and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError:
+                log.info('Preallocation is not supported, truncating instead')
+        os.ftruncate(fd, size)
+
+    def _copysplit(self, fd: int, pieces: List[Tuple[str, int, int]],
+                   outoffset: int, skipped: int = 0) -> None:
+        """Copies split body into its position in the output file
+
+        Args:
+            fd (int): Output file descriptor
+            pieces (List[Tuple[str, int, int]]): File path, offset and size of each
+                piece of the body. Virtual splits are copied from the input file.
+            outoffset (int): Offset of the body in the output file
+            skipped (int, optional): Number of bytes read to skip the header. Defaults to 0.
+
+        Raises:
+            error.SplitSizeMismatch: Split is smaller than recorded in the manifest
+        """
+        if self.terminate:
+            return
+        if self._metrics is not None:
+            starttime = time.perf_counter()
+        copied = 0
+        for splitfile, offset, size in pieces:
+            with open(splitfile, mode='rb') as splitreader:
+                piececopied = self._copier.copy(
+                    splitreader.fileno(), fd, offset, size, outoffset + copied)
+            copied += piececopied
+            if piececopied != size:
+                raise error.SplitSizeMismatch(
+                    f'Split file "{splitfile}" is smaller than recorded in the manifest.')
+        if self._metrics is not None:
+            self._reportsplit(time.perf_counter() - starttime, skipped + copied, copied)
+
+    def _verifysplit(self, splitfile: str, splitsize: int,
+                     compression: Optional[str], checksum: str,
+                     virtual: Optional[VirtualSplit] = None) -> None:
+        """Verifies split against its size and checksum recorded in the manifest
+
+        Args:
+            splitfile (str): Split file path
+            splitsize (int): Split size
+            compression (Optional[str]): Codec the split is compressed with
+            checksum (str): Checksum of the split data
+            virtual (Optional[VirtualSplit], optional): Virtual split
+                recorded in the manifest. Defaults to None.
+
+        Raises:
+            error.SplitSizeMismatch: Split size does not match the manifest
+            error.ChecksumMismatch: Split checksum does not match the manifest
+        """
+        if self.terminate:
+            return
+        if virtual is not None:
+            if os.path.getsize(virtual.source) < virtual.offset + virtual.length:
+                raise error.SplitSizeMismatch(
+                    f'Input file "{virtual.source}" is smaller than recorded in the manifest.')
+        elif os.path.getsize(splitfile) != splitsize:
+            raise error.SplitSizeMismatch(
+                f'Split file "{splitfile}" size does not match the manifest.')
+        algorithm, _ = Checksum.parse(checksum)
+        if virtual is not None:
+            splitreader = virtual.open()
+        elif compression:
+            splitreader = Codec(compression).open(splitfile, 'rb')
+        else:
+            splitreader = open(splitfile, mode='rb')
+        with splitreader:
+            if algorithm.hashfile(splitreader) != checksum:
+                raise error.ChecksumMismatch(
+                    f'Split file "{splitfile}" checksum does not match the manifest.')
+
+    def verify(self, workers: int = 1) -> None:
+        """Verifies the split files against the checksums recorded in the manifest
+
+        Args:
+            workers (int, optional): Number of workers to verify
+                the splits concurrently. Defaults to 1.
+
+        Raises:
+            error.SplitSizeMismatch: Split size does not match the manifest
+            error.ChecksumMismatch: Split checksum does not match the manifest
+        """
+        rows = Manifest.load(self._getmanifestpath())
+        if not len(rows) or not rows[0].get('checksum'):
+            log.info('Manifest has no checksums to verify')
+            return
+        log.info(f'Verifying {len(rows)} split(s) using {workers} worker(s)')
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = [executor.submit(self._verifysplit,
+                                       os.path.join(self.inputdir, row['filename']),
+                                       int(row['filesize']), row.get('compression'),
+                                       row['checksum'],
+                                       VirtualSplit.fromrow(row) if row.get('source') else None)
+                       for row in rows]
+            for future in futures:
+                future.result()
+
+    def _verifyoutput(self, manfile: str, outputfile: str) -> None:
+        """Verifies merged file against the whole file checksum saved next to the manifest
+
+        Args:
+            manfile (str): Manifest file path
+            outputfile (str): Output file path
+
+        Raises:
+            error.ChecksumMismatch: Merged file checksum does not match
+        """
+        checksum = readchecksumfile(manfile + constant.CHECKSUM_FILE_SUFFIX)
+        if checksum is None:
+            return
+        algorithm, _ = Checksum.parse(checksum)
+        with open(outputfile, mode='rb') as reader:
+            if algorithm.hashfile(reader) != checksum:
+                raise error.ChecksumMismatch(
+                    f'Merged file "{outputfile}" checksum does not match the original file.')
+        log.info(f'Verified merged file "{outputfile}"')
+
+    def _mergeparallel(self, rows: Sequence[dict], outputfile: str, workers: int,
+                       splitnum: int = 0, offset: int = 0) -> None:
+        """Merges the splits concurrently. Offset of each split in the output
+        file is computed from the manifest, the output file is preallocated and
+        each split is copied into its position by a pool of workers.
+
+        Args:
+            rows (Sequence[dict]): Manifest rows of the splits to merge
+            outputfile (str): Output file path
+            workers (int): Number of workers
+            splitnum (int, optional): Number of splits already merged. Defaults to 0.
+            offset (int, optional): Output offset right after the merged splits. Defaults to 0.
+        """
+        splits: List[Tuple[str, int, bool, Optional[VirtualSplit]]] = []
+        skipheader = False
+        for line in rows:
+            if line.get('compression'):
+                # Offsets in the merged file are not known
+                # until the splits are decompressed
+                log.info('Splits are compressed, merging sequentially')
+                self._mergesequential(rows, outputfile, splitnum, offset)
+                return
+            splitfile = os.path.join(self.inputdir, line['filename'])
+            virtual = VirtualSplit.fromrow(line) if line.get('source') else None
+            splits.append((splitfile, int(line['filesize']), skipheader, virtual))
+            if hasheader(line):
+                skipheader = True
+        log.info(f'Merging using {workers} workers')
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            headersizes = list(executor.map(
+                lambda row, split: Merge._getheadersize(row, split[0], split[2], split[3]),
+                rows, splits))
+            copies = []
+            outoffset = 0
+            for (splitfile, splitsize, _, virtual), headersize in zip(splits, headersizes):
+                size = splitsize - headersize
+                if virtual is None:
+                    copies.append(([(splitfile, headersize, size)], outoffset, headersize))
+                else:
+                    # Virtual splits are materialized from the input file
+                    pieces = [(virtual.source, virtual.offset, virtual.length)]
+                    if not headersize and virtual.headersize:
+                        pieces.insert(0, (virtual.source, 0, virtual.headersize))
+                    copies.append((pieces, outoffset, 0))
+                outoffset += size
+            flags = os.O_WRONLY | os.O_CREAT
+            if not splitnum:
+                flags |= os.O_TRUNC
+            fd = os.open(outputfile, flags, 0o666)
+            try:
+                Merge._preallocate(fd, outoffset)
+                futures = [executor.submit(self._copysplit, fd, *copy)
+                           for copy in copies[splitnum:]]
+                # Only the splits merged in order are checkpointed
+                done = sum(split[1] for split in splits[:splitnum])
+                for num, (future, copy) in enumerate(
+                        zip(futures, copies[splitnum:]), start=splitnum + 1):
+                    future.result()
+                    self._savecheckpoint(num, copy[1] + sum(piece[2] for piece in copy[0]))
+                    done += splits[num - 1][1]
+                    self._reportprogress(done)
+            finally:
+                os.close(fd)
+        if self.terminate:
+            log.info('Term flag has been set by the user.')
+            log.info('Terminating the process.')
+
+    def _copyall(self, infd: int, outfd: int, offset: int, count: int, path: str) -> int:
+        """Copies a byte range of a split into the output file at its current position
+
+        Args:
+            infd (int): Split file descriptor
+            outfd (int): Output file descriptor
+            offset (int): Split offset to copy from
+            count (int): Number of bytes to copy
+            path (str): Split file path
+
+        Raises:
+            error.SplitSizeMismatch: Split ended within the range
+
+        Returns:
+            int: Number of bytes copied
+        """
+        copied = self._copier.copy(infd, outfd, offset, count)
+        if copied != count:
+            raise error.SplitSizeMismatch(
+                f'Split file "{path}" is smaller than recorded in the manifest.')
+        return copied
+
+    def _appendsplit(self, writer: BinaryIO, splitfile: str, row: dict,
+                     skipheader: bool, virtual: Optional[VirtualSplit] = None) -> int:
+        """Appends split body to the output file
+
+        Args:
+            writer (BinaryIO): Output file writer
+            splitfile (str): Split file path
+            row (dict): Manifest row of the split
+            skipheader (bool): True if the header of the split is skipped
+            virtual (Optional[VirtualSplit], optional): Virtual split
+                recorded in the manifest. Defaults to None.
+
+        Raises:
+            error.SplitSizeMismatch: Split is smaller than expected
+
+        Returns:
+            int: Number of bytes written
+        """
+        written = 0
+        if virtual is not None:
+            # Virtual splits are materialized from the input file
+            fd = os.open(virtual.source, os.O_RDONLY)
+            try:
+                if not skipheader and virtual.headersize:
+                    written += self._copyall(fd, writer.fileno(), 0, virtual.headersize,
+                                             virtual.source)
+                written += self._copyall(fd, writer.fileno(), virtual.offset, virtual.length,
+                                         virtual.source)
+            finally:
+                os.close(fd)
+            return written
+        if row.get('compression'):
+            with Codec(row['compression']).open(splitfile, 'rb') as splitreader:
+                if skipheader:
+                    self._readheader(splitreader, row)
+                while True:
+                    chunk = splitreader.read(constant.DEFAULT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += writer.write(chunk)
+            # Copy backends write at the file offset
+            writer.flush()
+            return written
+        with open(splitfile, mode='rb') as splitreader:
+            headersize = len(self._readheader(splitreader, row)) if skipheader else 0
+            splitsize = os.fstat(splitreader.fileno()).st_size
+            return self._copyall(splitreader.fileno(), writer.fileno(),
+                                 headersize, splitsize - headersize, splitfile)
+
+    def _mergesequential(self, rows: Sequence[dict], outputfile: str,
+                         splitnum: int = 0, offset: int = 0) -> None:
+        """Merges the splits one after another
+
+        Args:
+            rows (Sequence[dict]): Manifest rows of the splits to merge
+            outputfile (str): Output file path
+            splitnum (int, optional): Number of splits already merged. Defaults to 0.
+            offset (int, optional): Output offset right after the merged splits. Defaults to 0.
+        """
+        with open(outputfile, mode='r+b' if splitnum else 'wb+') as writer:
+            if splitnum:
+                # Anything written after the checkpoint is written again
+                writer.truncate(offset)
+                writer.seek(offset)
+            skipheader = False
+            done = 0
+            for num, line in enumerate(rows, start=1):
+                if self.terminate:
+                    log.info('Term flag has been set by the user.')
+                    log.info('Terminating the process.')
+                    break
+                splitfilename = line['filename']
+                splitfile = os.path.join(self.inputdir, splitfilename)
+                done += int(line['filesize'])
+                if num > splitnum:
+                    if self._metrics is not None:
+                        starttime = time.perf_counter()
+                        outoffset = os.lseek(writer.fileno(), 0, os.SEEK_CUR)
+                    virtual = VirtualSplit.fromrow(line) if line.get('source') else None
+                    self._appendsplit(writer, splitfile, line, skipheader, virtual)
+                    offset = os.lseek(writer.fileno(), 0, os.SEEK_CUR)
+                    self._savecheckpoint(num, offset)
+                    if self._metrics is not None:
+                        self._reportsplit(time.perf_counter() - starttime,
+                                          int(line['filesize']), offset - outoffset)
+                    self._reportprogress(done)
+                if hasheader(line):
+                    skipheader = True
+
+    def _reportsplit(self, elapsed: float, splitsize: int, written: int) -> None:
+        """Reports the metrics of a merged split
+
+        Args:
+            elapsed (float): Seconds taken to merge the split
+            splitsize (int): Number of bytes read from the split
+            written (int): Number of bytes written to the output file
+        """
+        # Data is moved by the copy backend, so the time blocked in
+        # reading and writing is reported together
+        self._metrics.timing('copy', elapsed)
+        self._metrics.timing('split', elapsed)
+        self._metrics.counter('bytes_read', splitsize)
+        self._metrics.counter('bytes_written', written)
+
+    def _reportprogress(self, done: int) -> None:
+        """Reports the progress after a split is merged in order
+
+        Args:
+            done (int): Number of split bytes merged
+        """
+        if self._progress is None:
+            return
+        self._metrics.counter('splits', 1)
+        self._progress.update(done)
+
+    def _savecheckpoint(self, splitnum: int, offset: int) -> None:
+        """Checkpoints the last split merged in order
+
+        Args:
+            splitnum (int): Number of splits merged
+            offset (int): Output offset right after the merged splits
+        """
+        if self._checkpoint is None or self.terminate:
+            return
+        self._checkpoint.save(splitnum=splitnum, offset=offset)
+
+    def _loadcheckpoint(self, state: dict, outputfile: str) -> Tuple[int, int]:
+        """Loads the progress of an earlier merge to resume from
+
+        Args:
+            state (dict): Manifest identity
+            outputfile (str): Output file path
+
+        Raises:
+            error.CheckpointMismatch: Checkpoint was saved for a different manifest
+
+        Returns:
+            Tuple[int, int]: Number of merged splits and output offset right after them
+        """
+        checkpointfile = outputfile + constant.CHECKPOINT_FILE_SUFFIX
+        checkpoint = Checkpoint.load(checkpointfile)
+        if checkpoint is None or not os.path.isfile(outputfile):
+            log.info('No checkpoint found, merging from the start')
+            return 0, 0
+        if any(checkpoint.state.get(key) != value for key, value in state.items()):
+            raise error.CheckpointMismatch(
+                f'Checkpoint "{checkpointfile}" was saved for a different manifest.')
+        if os.path.getsize(outputfile) < checkpoint.state['offset']:
+            raise error.CheckpointMismatch(
+                f'Merged file "{outputfile}" is smaller than recorded in the checkpoint.')
+        return checkpoint.state['splitnum'], checkpoint.state['offset']
+
+    def merge(self, cleanup: bool = False, callback: Optional[Callable] = None,
+              workers: int = 1, verify: bool = False, resume: bool = False) -> None:
         """Merges the split files back into one single file
 
         Args:
@@ -140,43 +632,621 @@ class Merge:
                 after all the splits have been merged. 
                 The callback passes merged file path, size [str, int] as args. 
                 Defaults to None.
+            workers (int, optional): Number of workers to copy the splits
+                into the merged file concurrently. Defaults to 1.
+            verify (bool, optional): If true, the splits are verified against the
+                checksums in the manifest before merging and the merged file
+                against the whole file checksum after merging. Defaults to False.
+            resume (bool, optional): If true, an earlier merge that did not complete
+                is resumed from where it stopped. Defaults to False.
         """
         manfile = self._getmanifestpath()
         outputfile = self._getoutputfilepath()
-        with open(manfile, mode='r', encoding='utf8', newline='') as reader:
-            with open(outputfile, mode='wb+') as writer:
-                csvreader = csv.DictReader(reader)
-                skipheader = False
-                for line in csvreader:
-                    if self.terminate:
-                        log.info('Term flag has been set by the user.')
-                        log.info('Terminating the process.')
-                        break
-                    splitfilename = line['filename']
-                    splitfile = os.path.join(self.inputdir, splitfilename)
-                    header = True if line['header'].lower(
-                    ) == 'true' else False
-                    with open(splitfile, mode='rb') as splitreader:
-                        if skipheader:
-                            next(splitreader)
-                        for line in splitreader:
-                            writer.write(line)
-                    if header:
-                        skipheader = True
+        if verify:
+            self.verify(workers)
+        stat = os.stat(manfile)
+        state = {'manifest': {'filesize': stat.st_size, 'mtime': stat.st_mtime_ns}}
+        splitnum, offset = self._loadcheckpoint(state, outputfile) if resume else (0, 0)
+        if splitnum:
+            log.info(f'Resuming after split {splitnum} at output offset {offset}')
+        self._checkpoint = Checkpoint(outputfile + constant.CHECKPOINT_FILE_SUFFIX,
+                                      dict(state, splitnum=splitnum, offset=offset),
+                                      enabled=self._resumable or resume)
+        rows = Manifest.load(manfile)
+        if self._metrics is not None:
+            sizes = [int(line['filesize']) for line in rows]
+            self._progress = Progress(self._metrics, sum(sizes), sum(sizes[:splitnum]))
+        log.info(f'Merging using "{self.copybackend}" copy backend')
+        if workers > 1:
+            self._mergeparallel(rows, outputfile, workers, splitnum, offset)
+        else:
+            self._mergesequential(rows, outputfile, splitnum, offset)
+        if not self.terminate:
+            self._checkpoint.remove()
+        self._checkpoint = None
+        self._progress = None
+        if verify and not self.terminate:
+            self._verifyoutput(manfile, outputfile)
         if cleanup and not self.terminate:
-            with open(manfile, mode='r', encoding='utf8', newline='') as reader:
-                csvreader = csv.DictReader(reader)
-                for line in csvreader:
-                    splitfilename = line['filename']
-                    splitfile = os.path.join(self.inputdir, splitfilename)
-                    if os.path.exists(splitfile):
-                        os.remove(splitfile)
+            sharddirs = set()
+            for line in rows:
+                if line.get('source'):
+                    # Virtual splits have no split file
+                    continue
+                splitfilename = line['filename']
+                splitfile = os.path.join(self.inputdir, splitfilename)
+                if os.path.exists(splitfile):
+                    os.remove(splitfile)
+                sharddir = os.path.dirname(splitfilename)
+                if sharddir:
+                    sharddirs.add(os.path.join(self.inputdir, sharddir))
+            for sharddir in sharddirs:
+                # Shard dirs holding other files are left in place
+                try:
+                    os.rmdir(sharddir)
+                except OSError:
+                    pass
             if os.path.exists(manfile):
                 os.remove(manfile)
+            checksumfile = manfile + constant.CHECKSUM_FILE_SUFFIX
+            if os.path.exists(checksumfile):
+                os.remove(checksumfile)
+        if callback:
+            callback(outputfile, os.path.getsize(outputfile))
+        self._endprocess()
+
+    def mergeinto(self, writer: BinaryIO, callback: Optional[Callable] = None) -> None:
+        """Merges the split files into a binary file that is written sequentially,
+        such as stdout or a pipe, so the merged file does not have to land on disk.
+
+        Args:
+            writer (BinaryIO): Binary file with a file descriptor such as sys.stdout.buffer
+            callback (Optional[Callable], optional): Callback function to invoke
+                after all the splits have been merged.
+                The callback passes number of bytes written [int] as arg.
+                Defaults to None.
+        """
+        rows = Manifest.load(self._getmanifestpath())
+        if self._metrics is not None:
+            self._progress = Progress(self._metrics, sum(int(line['filesize']) for line in rows))
+        # Copy backends write to the file descriptor
+        writer.flush()
+        written = 0
+        skipheader = False
+        done = 0
+        for line in rows:
+            if self.terminate:
+                log.info('Term flag has been set by the user.')
+                log.info('Terminating the process.')
+                break
+            splitfile = os.path.join(self.inputdir, line['filename'])
+            virtual = VirtualSplit.fromrow(line) if line.get('source') else None
+            if self._metrics is not None:
+                starttime = time.perf_counter()
+            splitwritten = self._appendsplit(writer, splitfile, line, skipheader, virtual)
+            written += splitwritten
+            done += int(line['filesize'])
+            if self._metrics is not None:
+                self._reportsplit(time.perf_counter() - starttime,
+                                  int(line['filesize']), splitwritten)
+            self._reportprogress(done)
+            if hasheader(line):
+                skipheader = True
+        self._progress = None
+        if callback:
+            callback(written)
+        self._endprocess()
+
+    def mergesplits(self, first: int, last: int, callback: Optional[Callable] = None,
+                    workers: int = 1) -> None:
+        """Merges a subset of the splits into the output file. The header
+        is kept once as in a whole merge. Only the manifest rows of the
+        subset are parsed from a JSON lines manifest.
+
+        Args:
+            first (int): Number of the first split to merge starting from 1
+            last (int): Number of the last split to merge (inclusive)
+            callback (Optional[Callable], optional): Callback function to invoke
+                after the splits have been merged.
+                The callback passes merged file path, size [str, int] as args.
+                Defaults to None.
+            workers (int, optional): Number of workers to copy the splits
+                into the merged file concurrently. Defaults to 1.
+
+        Raises:
+            ValueError: Split numbers are out of range
+        """
+        rows = Manifest.load(self._getmanifestpath())
+        if not 1 <= first <= last <= len(rows):
+            raise ValueError(
+                f'Split numbers must be between 1 and {len(rows)} and first must not be after last.')
+        outputfile = self._getoutputfilepath()
+        rows = rows[first - 1:last]
+        if self._metrics is not None:
+            self._progress = Progress(self._metrics, sum(int(line['filesize']) for line in rows))
+        log.info(f'Merging splits {first} to {last} using "{self.copybackend}" copy backend')
+        if workers > 1:
+            self._mergeparallel(rows, outputfile, workers)
+        else:
+            self._mergesequential(rows, outputfile)
+        self._progress = None
+        if callback:
+            callback(outputfile, os.path.getsize(outputfile))
+        self._endprocess()
+
+    def _opensplit(self, row: dict, pos: int) -> BinaryIO:
+        """Opens a split positioned at an offset of its data
+
+        Args:
+            row (dict): Manifest row of the split
+            pos (int): Offset in the uncompressed split including the header
+
+        Returns:
+            BinaryIO: Split reader
+        """
+        if row.get('source'):
+            reader = VirtualSplit.fromrow(row).open(constant.DEFAULT_CHUNK_SIZE)
+            reader.seek(pos)
+            return reader
+        splitfile = os.path.join(self.inputdir, row['filename'])
+        if not row.get('compression'):
+            reader = open(splitfile, mode='rb')
+            reader.seek(pos)
+            return reader
+        reader = Codec(row['compression']).open(splitfile, 'rb')
+        # Compressed splits are read up to the offset
+        while pos > 0:
+            chunk = reader.read(min(constant.DEFAULT_CHUNK_SIZE, pos))
+            if not chunk:
+                break
+            pos -= len(chunk)
+        return reader
+
+    def _copysplitrange(self, writer: BinaryIO, row: dict, pos: int, size: int) -> None:
+        """Appends a byte range of a split to the output file
+
+        Args:
+            writer (BinaryIO): Output file writer
+            row (dict): Manifest row of the split
+            pos (int): Offset in the uncompressed split including the header
+            size (int): Number of bytes to copy
+
+        Raises:
+            error.SplitSizeMismatch: Split is smaller than recorded in the manifest
+        """
+        if row.get('compression'):
+            copied = 0
+            with self._opensplit(row, pos) as reader:
+                while copied < size:
+                    chunk = reader.read(min(constant.DEFAULT_CHUNK_SIZE, size - copied))
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    copied += len(chunk)
+            # Copy backends write at the file offset
+            writer.flush()
+        else:
+            if row.get('source'):
+                # Virtual splits are copied from the input file
+                splitfile = row['source']
+                headersize = int(row['headersize'])
+                if pos >= headersize:
+                    pos += int(row['offset']) - headersize
+            else:
+                splitfile = os.path.join(self.inputdir, row['filename'])
+            with open(splitfile, mode='rb') as splitreader:
+                copied = self._copier.copy(splitreader.fileno(), writer.fileno(), pos, size)
+        if copied != size:
+            raise error.SplitSizeMismatch(
+                f'Split file "{row["filename"]}" is smaller than recorded in the manifest.')
+
+    def _getlineoffset(self, rows: Manifest, line: int) -> int:
+        """Returns the offset in the original file where a line starts. Only
+        the split holding the line is read.
+
+        Args:
+            rows (Manifest): Manifest rows
+            line (int): Line number starting from 0
+
+        Returns:
+            int: Line start offset or the file size if the file has less lines
+        """
+        if line <= 0:
+            return 0
+        # Line starts right after the newline ending the previous line,
+        # which is in the last split starting before that newline
+        index = rows.bisect('line', line - 1) - 1
+        if index < 0:
+            # Newline is in the header
+            pos, start, count = 0, 0, line
+            row = rows[0]
+        else:
+            row = rows[index]
+            if index == len(rows) - 1 and rows.getint(index, 'line') + rows.getint(index, 'lines') < line:
+                return rows.getint(index, 'offset') + rows.getint(index, 'length')
+            pos = rows.getint(index, 'headersize')
+            start = rows.getint(index, 'offset')
+            count = line - rows.getint(index, 'line')
+        with self._opensplit(row, pos) as reader:
+            scanned = 0
+            while True:
+                chunk = reader.read(constant.DEFAULT_CHUNK_SIZE)
+                if not chunk:
+                    raise error.SplitSizeMismatch(
+                        f'Split file "{row["filename"]}" has less lines than recorded in the manifest.')
+                found = chunk.count(b'\n')
+                if found < count:
+                    count -= found
+                    scanned += len(chunk)
+                    continue
+                idx = -1
+                for _ in range(count):
+                    idx = chunk.index(b'\n', idx + 1)
+                return start + scanned + idx + 1
+
+    def mergerange(self, start: int, end: int, lines: bool = False,
+                   callback: Optional[Callable] = None) -> None:
+        """Extracts a byte range or a line range of the original file into the output
+        file. Only the splits covering the range are read, which are looked up by a
+        binary search over the input offsets recorded in a JSON lines manifest.
+
+        Args:
+            start (int): Start offset or line number starting from 0 (inclusive)
+            end (int): End offset or line number (exclusive)
+            lines (bool, optional): Set to true if start and end are line numbers.
+                Defaults to False.
+            callback (Optional[Callable], optional): Callback function to invoke
+                after the range has been extracted.
+                The callback passes merged file path, size [str, int] as args.
+                Defaults to None.
+
+        Raises:
+            ValueError: Manifest does not record the input offsets of the splits
+        """
+        rows = Manifest.load(self._getmanifestpath())
+        field = 'line' if lines else 'offset'
+        if not len(rows) or rows.getint(0, field) is None:
+            raise ValueError('Manifest does not record the input position of the splits, '
+                             'split with the "jsonl" manifest format to extract ranges.')
+        outputfile = self._getoutputfilepath()
+        if lines:
+            start = self._getlineoffset(rows, start)
+            end = self._getlineoffset(rows, end)
+        last = len(rows) - 1
+        start = max(start, 0)
+        end = min(end, rows.getint(last, 'offset') + rows.getint(last, 'length'))
+        log.info(f'Extracting input range {start} to {end}')
+        with open(outputfile, mode='wb') as writer:
+            # Header at the start of the input is held at the start of the first split
+            headersize = min(rows.getint(0, 'headersize'), rows.getint(0, 'offset'))
+            if start < min(end, headersize):
+                self._copysplitrange(writer, rows[0], start, min(end, headersize) - start)
+            index = max(rows.bisect('offset', start) - 1, 0)
+            while index <= last and start < end:
+                offset = rows.getint(index, 'offset')
+                length = rows.getint(index, 'length')
+                if offset >= end:
+                    break
+                lo, hi = max(start, offset), min(end, offset + length)
+                if lo < hi:
+                    self._copysplitrange(writer, rows[index],
+                                         rows.getint(index, 'headersize') + lo - offset, hi - lo)
+                index += 1
         if callback:
             callback(outputfile, os.path.getsize(outputfile))
         self._endprocess()
 
+    def _readblocks(self, row: dict, skipheader: bool, blocksize: int,
+                    quotechar: Optional[bytes], executor: Optional[Executor],
+                    unterminated: List[bytes]) -> Iterator[List[bytes]]:
+        """Generates the records of a split block by block. The split is read in
+        blocks of the given size and the next block is read by the executor, if any,
+        while the records of the current one are merged.
+
+        Args:
+            row (dict): Manifest row of the split
+            skipheader (bool): True if the header of the split is skipped
+            blocksize (int): Number of bytes to read at once
+            quotechar (Optional[bytes]): Quote char of the CSV records or None
+            executor (Optional[Executor]): Executor to read the blocks ahead in
+            unterminated (List[bytes]): Last records of the splits that had no
+                newline, to which the record is added with its newline
+
+        Yields:
+            Iterator[List[bytes]]: Records of a block including their newlines
+        """
+        with self._opensplit(row, 0) as reader:
+            if skipheader:
+                self._readheader(reader, row, quotechar)
+            pending = executor.submit(reader.read, blocksize) if executor else None
+            try:
+                carry = b''
+                while not self.terminate:
+                    block = pending.result() if pending else reader.read(blocksize)
+                    if not block:
+                        break
+                    if pending:
+                        pending = executor.submit(reader.read, blocksize)
+                    if self._metrics is not None:
+                        self._metrics.counter('bytes_read', len(block))
+                    data = carry + block if carry else block
+                    if quotechar is None:
+                        end = data.rfind(b'\n') + 1
+                    else:
+                        ends, _, _ = scanrecords(data, quotechar)
+                        end = ends[-1] + 1 if ends else 0
+                    # Incomplete record at the end of the block
+                    # is completed by the next block
+                    carry = data[end:]
+                    if end:
+                        yield splitrecords(data[:end], quotechar)
+                if carry and not self.terminate:
+                    # Last record is given a newline as other records
+                    # may be merged after it
+                    record = carry + b'\n'
+                    unterminated.append(record)
+                    yield [record]
+            finally:
+                if pending:
+                    # Reader is closed once the read ahead is done
+                    wait([pending])
+
+    @staticmethod
+    def _bisectrecords(records: List[bytes], bound, key: Callable, reverse: bool,
+                       lo: int = 0, right: bool = True) -> int:
+        """Returns the index where the bound would be inserted into sorted records
+
+        Args:
+            records (List[bytes]): Records sorted by key
+            bound: Key to look up
+            key (Callable): Function returning the key of a record
+            reverse (bool): True if the records are sorted in descending order
+            lo (int, optional): Index to look up from. Defaults to 0.
+            right (bool, optional): Set to False to insert the bound before the
+                records with an equal key instead of after them. Defaults to True.
+
+        Returns:
+            int: Record index
+        """
+        hi = len(records)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = key(records[mid])
+            if right:
+                left = value < bound if reverse else bound < value
+            else:
+                left = not (bound < value if reverse else value < bound)
+            if left:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _mergeblocks(self, splits: List[Iterator[List[bytes]]], key: Optional[Callable],
+                     reverse: bool) -> Iterator[List[bytes]]:
+        """Merges the sorted blocks of the splits in rounds. Each round takes from
+        every split the records up to the smallest last record of the blocks being
+        merged, as no record left to read can come before it, and sorts them
+        together. The sort finds the sorted run of each split and merges the
+        runs without comparing the records one by one in Python.
+
+        Args:
+            splits (List[Iterator[List[bytes]]]): Sorted blocks of each split
+            key (Optional[Callable]): Function returning the sort key of a record
+            reverse (bool): True if the splits are sorted in descending order
+
+        Yields:
+            Iterator[List[bytes]]: Sorted records of each round
+        """
+        keyof = key or (lambda record: record)
+        # Block, index of the next record and blocks left of each split
+        buffers = []
+        for split in splits:
+            block = next(split, None)
+            if block:
+                buffers.append([block, 0, split])
+        while buffers:
+            lasts = [keyof(block[-1]) for block, _, _ in buffers]
+            bound = max(lasts) if reverse else min(lasts)
+            batch = []
+            for buffer in buffers:
+                block, pos, split = buffer
+                end = self._bisectrecords(block, bound, keyof, reverse, pos)
+                batch.extend(block[pos:end] if pos or end < len(block) else block)
+                buffer[1] = end
+                if end == len(block):
+                    buffer[0], buffer[1] = next(split, None), 0
+            buffers = [buffer for buffer in buffers if buffer[0]]
+            batch.sort(key=key, reverse=reverse)
+            yield batch
+
+    def _writesorted(self, writer: BinaryIO, sources: List[Tuple[dict, bool]],
+                     key: Optional[Callable], reverse: bool, unique: bool, buffersize: int,
+                     quotechar: Optional[bytes], executor: Optional[Executor]) -> None:
+        """Merges sorted splits into a writer
+
+        Args:
+            writer (BinaryIO): Writer of the merged records
+            sources (List[Tuple[dict, bool]]): Manifest row of each split and
+                True if its header is skipped
+            key (Optional[Callable]): Function returning the sort key of a record
+            reverse (bool): True if the splits are sorted in descending order
+            unique (bool): True to drop duplicate records
+            buffersize (int): Max number of bytes buffered for all the splits together
+            quotechar (Optional[bytes]): Quote char of the CSV records or None
+            executor (Optional[Executor]): Executor to read the blocks ahead in
+        """
+        # Each split holds a block being merged and a block read ahead
+        blocksize = max(buffersize // (2 * len(sources)), constant.MIN_MERGE_BLOCK_SIZE)
+        unterminated = []
+        splits = [self._readblocks(row, skipheader, blocksize, quotechar, executor, unterminated)
+                  for row, skipheader in sources]
+        keyof = key or (lambda record: record)
+        held = []
+        last = None
+        try:
+            for batch in self._mergeblocks(splits, key, reverse):
+                if unique:
+                    # Records sharing the last key may be duplicated
+                    # in the next round, so they are held back
+                    batch = list(dict.fromkeys(held + batch if held else batch))
+                    tail = self._bisectrecords(
+                        batch, keyof(batch[-1]), keyof, reverse, right=False)
+                    held = batch[tail:]
+                    del batch[tail:]
+                if batch:
+                    last = batch[-1]
+                writer.write(b''.join(batch))
+            if held:
+                last = held[-1]
+            writer.write(b''.join(held))
+            if last is not None and last in unterminated:
+                # Record merged last is written as read without a newline
+                writer.seek(-1, os.SEEK_CUR)
+                writer.truncate()
+        finally:
+            for split in splits:
+                split.close()
+
+    def sortedmerge(self, key: Union[Callable, int, str, None] = None, reverse: bool = False,
+                    unique: bool = False, workers: int = 1, delimiter: str = ',',
+                    quotechar: Optional[str] = None,
+                    buffersize: int = constant.SORTED_MERGE_BUFFER_SIZE,
+                    verify: bool = False, callback: Optional[Callable] = None,
+                    keytype: Optional[Callable] = None) -> None:
+        """Merges splits that are each sorted into one sorted file by a streaming
+        k-way merge. Only a block of each split is held in memory, so the splits
+        of a file far bigger than the memory can be merged. The header is kept
+        once as in a whole merge.
+
+        Args:
+            key (Union[Callable, int, str, None], optional): Function that accepts a
+                record [bytes] and returns its sort key, index of the key column or
+                name of the key column in the header. Key columns compare as bytes
+                unless keytype is given. Defaults to None (whole record).
+            reverse (bool, optional): Set to true if the splits are sorted in
+                descending order. Defaults to False.
+            unique (bool, optional): Set to true to drop duplicate records.
+                Defaults to False.
+            workers (int, optional): Number of workers to read and decompress the
+                splits ahead of the merge. Defaults to 1.
+            delimiter (str, optional): Column delimiter. Defaults to ','.
+            quotechar (Optional[str], optional): Quote char of a CSV file such as '"'.
+                Records are merged instead of lines and the key column is parsed
+                as CSV. Defaults to None.
+            buffersize (int, optional): Max number of bytes buffered for all the
+                splits together. Defaults to 64 MB.
+            verify (bool, optional): If true, the splits are verified against the
+                checksums in the manifest before merging. Defaults to False.
+            callback (Optional[Callable], optional): Callback function to invoke
+                after all the splits have been merged.
+                The callback passes merged file path, size [str, int] as args.
+                Defaults to None.
+            keytype (Optional[Callable], optional): Function that converts the value
+                [bytes] of the key column to the type it is compared as, such as int
+                or float so that numbers are not compared digit by digit.
+                Defaults to None (bytes).
+
+        Raises:
+            ValueError: Quote char is not a single byte, the key column is not found
+                or keytype is given without a key column
+        """
+        quotebytes = quotechar.encode() if quotechar else None
+        if quotebytes is not None and len(quotebytes) != 1:
+            raise ValueError('Quote char must be a single byte character.')
+        if keytype is not None and not isinstance(key, (int, str)):
+            raise ValueError('Key type requires the key to be a column index or name.')
+        if verify:
+            self.verify(workers)
+        rows = Manifest.load(self._getmanifestpath())
+        outputfile = self._getoutputfilepath()
+        # Header of the first split holding one is written once above the records
+        header = b''
+        headerrow = next((row for row in rows if hasheader(row)), None)
+        if headerrow is not None:
+            with self._opensplit(headerrow, 0) as reader:
+                header = self._readheader(reader, headerrow, quotebytes)
+        if isinstance(key, str):
+            text = io.StringIO(header.decode(errors='surrogateescape'), newline='')
+            columns = next(csv.reader(text, delimiter=delimiter,
+                                      quotechar=quotechar or '"'), [])
+            if key not in columns:
+                raise ValueError(f'Key column "{key}" is not found in the header.')
+            key = columns.index(key)
+        if isinstance(key, int):
+            getkey = Partitioner(key, 1, delimiter.encode(), quotebytes).getkey
+            key = getkey
+            if keytype is not None:
+                key = lambda record: keytype(getkey(record))
+        # Each split holds a block being merged and a block read ahead, so no more
+        # splits are merged at once than fit in the buffer with the smallest blocks
+        fanin = max(min(constant.MAX_MERGE_FANIN,
+                        buffersize // (2 * constant.MIN_MERGE_BLOCK_SIZE)), 2)
+        sources = [(row, hasheader(row)) for row in rows]
+        log.info(f'Merging {len(rows)} sorted splits {fanin} at a time')
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+        rundir = None
+        with pool as executor:
+            try:
+                while len(sources) > fanin and not self.terminate:
+                    # Groups of splits are merged into sorted runs
+                    # which are merged by the next pass
+                    if rundir is None:
+                        # Absolute so the runs are not looked up in the input dir
+                        rundir = tempfile.mkdtemp(prefix='.sortedmerge-',
+                                                  dir=os.path.abspath(self.outputdir))
+                    runs = []
+                    for start in range(0, len(sources), fanin):
+                        group = sources[start:start + fanin]
+                        if len(group) == 1:
+                            runs.extend(group)
+                            continue
+                        runfile = os.path.join(rundir, f'run{start // fanin}-{len(sources)}')
+                        with open(runfile, mode='wb') as writer:
+                            self._writesorted(writer, group, key, reverse, unique,
+                                              buffersize, quotebytes, executor)
+                        runs.append(({'filename': runfile, 'header': False}, False))
+                        for row, _ in group:
+                            if os.path.dirname(row['filename']) == rundir:
+                                # Run of the previous pass is merged
+                                os.remove(row['filename'])
+                    sources = runs
+                if not self.terminate:
+                    with open(outputfile, mode='wb') as writer:
+                        writer.write(header)
+                        self._writesorted(writer, sources, key, reverse, unique,
+                                          buffersize, quotebytes, executor)
+                        if self._metrics is not None:
+                            self._metrics.counter('bytes_written', writer.tell())
+            finally:
+                if rundir is not None:
+                    shutil.rmtree(rundir, ignore_errors=True)
+        if self.terminate:
+            log.info('Term flag has been set by the user.')
+            log.info('Terminating the process.')
+        if callback and not self.terminate:
+            callback(outputfile, os.path.getsize(outputfile))
+        self._endprocess()
+
+    async def amerge(self, cleanup: bool = False, callback: Optional[Callable] = None,
+                     executor: Optional[Executor] = None, **kwargs) -> None:
+        """Merges the split files back into one single file without
+        blocking the event loop. Accepts the same args as merge.
+
+        Args:
+            cleanup (bool, optional): If true, all the split files and manifest
+                file will be purged after successful merge. Defaults to False.
+            callback (Optional[Callable], optional): Callback function to invoke
+                after all the splits have been merged.
+                The callback passes merged file path, size [str, int] as args.
+                Defaults to None.
+            executor (Optional[Executor], optional): Executor to run the merge in.
+                Defaults to an executor shared by all the async splits and merges.
+        """
+        # Imported here to keep asyncio out of the synchronous API's import time
+        from .common import aio
+        await aio.run(self.merge, executor, cleanup=cleanup, callback=callback, **kwargs)
+
 
 # if __name__ == '__main__':
 #
@@ -4,15 +4,38 @@
 Author: rjayapalan
 Created: March 05, 2022
 """
-from typing import Callable, Optional
-from io import BytesIO
+from typing import TYPE_CHECKING, AsyncIterator, BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+from contextlib import nullcontext
+from collections import deque
+from itertools import accumulate, chain
+from bisect import bisect_left
+from concurrent.futures import Executor, ThreadPoolExecutor
+from io import BytesIO, StringIO
 import ntpath
+import math
 import os
+import random
+import shutil
+import tempfile
 import csv
 import time
 import logging
 
 from .common import constant, error
+from .common.blockreader import BlockReader
+from .common.checkpoint import Checkpoint
+from .common.checksum import Checksum, HashingWriter, hashrange, writechecksumfile
+from .common.codec import Codec, CompressedSizeTarget, CompressedWriter
+from .common.copier import Copier
+from .common.lineindex import LineIndex, LineProbe, countnewlines
+from .common.manifest import CountingWriter, Manifest, ManifestWriter
+from .common.metrics import MeteredReader, MeteredWriter, MetricsHook, Progress
+from .common.partition import Partitioner
+from .common.pipeline import ReadAheadReader, WriteBehindWriter, syncfd, syncfile
+from .common.records import RecordReader, readrecord, splitrecords
+
+if TYPE_CHECKING:
+    from .common.aio import SplitInfo
 
 log = logging.getLogger(__name__)
 
@@ -30,15 +53,66 @@ class Split:
         if not os.path.exists(inputfile):
             raise FileNotFoundError(
                 f'Given input file path "{inputfile}" does not exist.')
+        self._initialize(inputfile, outputdir)
+
+    @classmethod
+    def fromstream(cls, fileobj: BinaryIO, outputdir: str, name: str) -> 'Split':
+        """Creates an instance that splits a binary file like object
+        (stdin, pipes, sockets, compressed streams) as it is read
+
+        Args:
+            fileobj (BinaryIO): Binary file like object
+            outputdir (str): Output directory path to write the file splits
+            name (str): Filename used to name the splits as if the
+                stream was a file on disk
+
+        Returns:
+            Split: Split instance
+        """
+        log.info('Starting stream split process')
+        instance = cls.__new__(cls)
+        instance._initialize(name, outputdir)
+        instance._stream = fileobj
+        return instance
+
+    def _initialize(self, inputfile: str, outputdir: str) -> None:
+        """Initializes the instance
+
+        Args:
+            inputfile (str): Path to the original file
+            outputdir (str): Output directory path to write the file splits
+        """
         if not os.path.isdir(outputdir):
             raise NotADirectoryError(
                 f'Given output directory path "{outputdir}" is not a valid directory.')
         self._terminate = False
+        self._stream = None
         self._inputfile = inputfile
         self._outputdir = outputdir
         self._splitdelimiter = constant.SPLIT_DELIMITER
         self._splitzerofill = constant.ZERO_FILL
         self._manfilename = constant.MANIFEST_FILE_NAME
+        self._copier = Copier(constant.DEFAULT_COPY_BACKEND)
+        self._indexfile = None
+        self._codec = None
+        self._quotechar = None
+        self._virtual = False
+        self._executor = None
+        self._checksum = None
+        self._filehasher = None
+        self._checkpoint = None
+        self._metrics = None
+        self._progress = None
+        self._memorylimit = constant.DEFAULT_MEMORY_LIMIT
+        self._longlines = constant.DEFAULT_LONG_LINE_POLICY
+        self._pipeline = False
+        self._fsync = False
+        self._manifestformat = constant.DEFAULT_MANIFEST_FORMAT
+        self._shardsize = 0
+        self._dropcache = False
+        self._resumable = False
+        # Index of the last shard dir created
+        self._shard = None
         self._starttime = time.time()
 
     @property
@@ -95,6 +169,108 @@ class Split:
         """
         return self._manfilename
 
+    @property
+    def copybackend(self) -> str:
+        """Returns copy backend used to move data into the splits
+
+        Returns:
+            str: Copy backend name
+        """
+        return self._copier.backend
+
+    @property
+    def indexfile(self) -> str:
+        """Returns line index file path. Defaults to the manifest
+        filepath suffixed with ".idx"
+
+        Returns:
+            str: Line index file path
+        """
+        if self._indexfile:
+            return self._indexfile
+        return self._getmanifestpath() + constant.INDEX_FILE_SUFFIX
+
+    @property
+    def metrics(self) -> Optional[MetricsHook]:
+        """Returns hook receiving the metrics of the split
+
+        Returns:
+            Optional[MetricsHook]: Metrics hook
+        """
+        return self._metrics
+
+    @property
+    def memorylimit(self) -> int:
+        """Returns max number of bytes of a single line held in memory
+
+        Returns:
+            int: Memory limit in bytes
+        """
+        return self._memorylimit
+
+    @property
+    def longlines(self) -> str:
+        """Returns how lines longer than the split size are handled
+
+        Returns:
+            str: "allow" or "error"
+        """
+        return self._longlines
+
+    @property
+    def pipeline(self) -> bool:
+        """Returns True if reading and writing the splits overlap
+
+        Returns:
+            bool: True/False
+        """
+        return self._pipeline
+
+    @property
+    def fsync(self) -> bool:
+        """Returns True if the splits are flushed to the storage device
+
+        Returns:
+            bool: True/False
+        """
+        return self._fsync
+
+    @property
+    def manifestformat(self) -> str:
+        """Returns manifest format
+
+        Returns:
+            str: "csv" or "jsonl"
+        """
+        return self._manifestformat
+
+    @property
+    def shardsize(self) -> int:
+        """Returns number of splits in each shard dir, 0 if the splits are not sharded
+
+        Returns:
+            int: Shard size
+        """
+        return self._shardsize
+
+    @property
+    def dropcache(self) -> bool:
+        """Returns True if the splits are dropped from the page cache
+
+        Returns:
+            bool: True/False
+        """
+        return self._dropcache
+
+    @property
+    def resumable(self) -> bool:
+        """Returns True if the progress is checkpointed to resume the split
+
+        Returns:
+            bool: True/False
+        """
+        return self._resumable
+
     @terminate.setter
     def terminate(self, value: bool) -> None:
         """Sets terminate flag. Once flag is set
@@ -135,6 +311,140 @@ class Split:
         """
         self._manfilename = value
 
+    @copybackend.setter
+    def copybackend(self, value: str) -> None:
+        """Sets copy backend used to move data into the splits
+
+        Args:
+            value (str): "auto", "copy_file_range", "sendfile" or "read"
+        """
+        self._copier = Copier(value)
+
+    @indexfile.setter
+    def indexfile(self, value: str) -> None:
+        """Sets line index file path. Set it to share the index
+        between splits of the same file into different directories.
+
+        Args:
+            value (str): Line index file path
+        """
+        self._indexfile = value
+
+    @metrics.setter
+    def metrics(self, value: Optional[MetricsHook]) -> None:
+        """Sets hook receiving the metrics of the split. Metrics
+        are not collected when not set.
+
+        Args:
+            value (Optional[MetricsHook]): Metrics hook
+        """
+        self._metrics = value
+
+    @memorylimit.setter
+    def memorylimit(self, value: int) -> None:
+        """Sets max number of bytes of a single line held in memory. Longer
+        lines are streamed in blocks or spilled to a temporary file, and a
+        longer header raises error.LineTooLong as it is written to every split.
+
+        Args:
+            value (int): Memory limit in bytes
+        """
+        if value <= 0:
+            raise ValueError('Memory limit must be greater than zero.')
+        self._memorylimit = value
+
+    @longlines.setter
+    def longlines(self, value: str) -> None:
+        """Sets how lines longer than the split size are handled. "allow" writes
+        the line to a split of its own that exceeds the split size and logs a
+        warning, "error" raises error.LineTooLong.
+
+        Args:
+            value (str): "allow" or "error"
+        """
+        if value not in constant.LONG_LINE_POLICIES:
+            raise ValueError(
+                f'Long line policy must be one of {", ".join(constant.LONG_LINE_POLICIES)}.')
+        self._longlines = value
+
+    @pipeline.setter
+    def pipeline(self, value: bool) -> None:
+        """Sets pipelined mode. The input is read ahead in a background thread
+        and the splits are opened, written and closed in the background while
+        the next split is read. Applies to the splits written sequentially.
+
+        Args:
+            value (bool): True/False
+        """
+        self._pipeline = value
+
+    @fsync.setter
+    def fsync(self, value: bool) -> None:
+        """Sets whether each split is flushed to the storage device
+        before it is recorded in the manifest
+
+        Args:
+            value (bool): True/False
+        """
+        self._fsync = value
+
+    @manifestformat.setter
+    def manifestformat(self, value: str) -> None:
+        """Sets manifest format. "jsonl" writes one JSON object per split that
+        also records the input offset, size and line number of its data, which
+        lets Merge extract a subset of the splits or a range of the original
+        file by reading only the splits it covers.
+
+        Args:
+            value (str): "csv" or "jsonl"
+        """
+        if value not in constant.MANIFEST_FORMATS:
+            raise ValueError(
+                f'Manifest format must be one of {", ".join(constant.MANIFEST_FORMATS)}.')
+        self._manifestformat = value
+
+    @shardsize.setter
+    def shardsize(self, value: int) -> None:
+        """Sets number of splits in each shard dir. The splits are written to
+        numbered dirs in the output dir instead of the output dir itself, which
+        keeps the dirs small when there are millions of splits. The split path
+        relative to the output dir is recorded in the manifest. Set to 0 to
+        write the splits to the output dir.
+
+        Args:
+            value (int): Shard size
+        """
+        if value < 0:
+            raise ValueError('Shard size must not be negative.')
+        self._shardsize = value
+
+    @dropcache.setter
+    def dropcache(self, value: bool) -> None:
+        """Sets whether each split is written back and dropped from the
+        page cache once it is written, so that large splits do not evict
+        the data cached for other processes
+
+        Args:
+            value (bool): True/False
+
+        Raises:
+            NotImplementedError: Platform does not support dropping files from the page cache
+        """
+        if value and not hasattr(os, 'posix_fadvise'):
+            raise NotImplementedError('Dropping the splits from the page cache is not supported on this platform.')
+        self._dropcache = value
+
+    @resumable.setter
+    def resumable(self, value: bool) -> None:
+        """Sets whether the progress is checkpointed after each split so that
+        a split that did not complete can be resumed. A resumed split is
+        always checkpointed.
+
+        Args:
+            value (bool): True/False
+        """
+        self._resumable = value
+
     @staticmethod
     def _getreadbuffersize(splitsize: int) -> int:
         """Returns buffer size to be used with the file reader
@@ -151,7 +461,9 @@ class Split:
         return defaultchunksize
 
     def _getnextsplit(self, splitnum: int) -> str:
-        """Returns next split filename
+        """Returns next split filename. Sharded splits are named by their
+        path relative to the output dir and their shard dir is created
+        once for all the splits it holds.
 
         Args:
             splitnum (int): Next split number
@@ -163,7 +475,16 @@ class Split:
         fname, ext = ntpath.splitext(filename)
         zsplitnum = format(splitnum, '0'+str(self.splitzerofill))
         splitfilename = f'{fname}{self.splitdelimiter}{zsplitnum}{ext}'
-        return splitfilename
+        if self._codec is not None:
+            splitfilename += self._codec.extension
+        if not self._shardsize:
+            return splitfilename
+        shard = (splitnum - 1) // self._shardsize
+        sharddir = format(shard, '0' + str(constant.SHARD_ZERO_FILL))
+        if shard != self._shard and not self._virtual:
+            os.makedirs(os.path.join(self.outputdir, sharddir), exist_ok=True)
+            self._shard = shard
+        return f'{sharddir}/{splitfilename}'
 
     def _getmanifestpath(self) -> str:
         """Returns manifest filepath
@@ -193,34 +514,90 @@ class Split:
         splitnum: int = kwargs.get('splitnum', 1)
         carryover: bytes = kwargs.get('carryover', None)
         header: bytes = kwargs.get('header', None)
-        manifest: csv.DictWriter = kwargs.get('manifest', None)
+        manifest: ManifestWriter = kwargs.get('manifest', None)
+        sizetarget: CompressedSizeTarget = kwargs.get('sizetarget', None)
+        offset: int = kwargs.get('offset', 0)
+        # Number of newlines in the input before the next split
+        line: int = kwargs.get('line', 0)
+        if splitby not in ('size', 'linecount'):
+            raise ValueError('Unsupported split type provided.')
+        if includeheader:
+            newline = True
+        # Line aware splits scan large blocks for newlines
+        # instead of reading the file line by line
+        linesaware = newline or splitby == 'linecount'
+        if self._quotechar is not None:
+            blocks = RecordReader(reader, constant.DEFAULT_BLOCK_SIZE, self._quotechar)
+        else:
+            blocks = BlockReader(reader, constant.DEFAULT_BLOCK_SIZE,
+                                 carryover if linesaware else None)
+        # Resumed split starts with the line carried over from the last completed split
+        carried = kwargs.get('carried', False)
+        # Start of a long line spilled to disk that did not fit in the last split
+        spool = None
+        if linesaware:
+            carried = carried or bool(carryover)
+            carryover = None
+        if splitnum > 1 and not carryover and not blocks.hasdata():
+            # Resumed split has nothing left to process
+            return
+        if sizetarget:
+            sample = blocks.peek(constant.DEFAULT_CHUNK_SIZE)
+            sizetarget.update(len(sample), len(self._codec.compress(sample)))
+        pending = deque()
+        # Header passed in has already been written to a previous split
+        headerwritten = bool(header)
         while True:
+            if sizetarget:
+                limit = sizetarget.limit()
             processed = 0
             splitfilename = self._getnextsplit(splitnum)
             splitfile = os.path.join(self.outputdir, splitfilename)
             if includeheader and not header:
-                newline = True
-                header = reader.readline()
-            writer = open(splitfile, mode='wb+')
+                header = self._readheader(blocks)
+                line += header.count(b'\n')
+            if self._metrics is not None:
+                starttime = time.perf_counter()
+            writer = self._openwriter(
+                splitfile, len(header) if header and headerwritten else 0)
+            if self._manifestformat == 'jsonl':
+                writer = CountingWriter(writer)
             try:
                 if header:
                     writer.write(header)
                     processed += len(header) if splitby == 'size' else 1
                 if carryover:
                     writer.write(carryover)
-                    processed += len(carryover) if splitby == 'size' else 1
+                    processed += len(carryover)
                     carryover = None
-                if splitby == 'size':
+                if carried:
+                    # Line carried over from the previous split is
+                    # always written even if it does not fit in the split
+                    linesize = 0
+                    if spool is not None:
+                        linesize = self._writespool(spool, writer)
+                        spool = None
+                    linesize += self._writeline(blocks, writer)
+                    if splitby == 'size':
+                        processed += linesize
+                        if processed > limit:
+                            self._reportlongline(
+                                offset + blocks.tell() - linesize, linesize)
+                    else:
+                        processed += 1
+                if linesaware:
+                    if splitby == 'size':
+                        spool = self._writebysize(blocks, writer, limit - processed)
+                    else:
+                        self._writebylinecount(blocks, writer, limit - processed)
+                else:
                     buffersize = Split._getreadbuffersize(splitsize=limit)
                     while 1:
                         if self.terminate:
                             log.info('Term flag has been set by the user.')
                             log.info('Terminating the process.')
                             break
-                        if newline:
-                            chunk = reader.readline()
-                        else:
-                            chunk = reader.read(buffersize)
+                        chunk = blocks.read(buffersize)
                         if not chunk:
                             break
                         chunksize = len(chunk)
@@ -230,36 +607,1126 @@ class Split:
                         else:
                             carryover = chunk
                             break
-                elif splitby == 'linecount':
-                    while 1:
-                        if self.terminate:
-                            log.info('Term flag has been set by the user.')
-                            log.info('Terminating the process.')
-                            break
-                        chunk = reader.readline()
-                        if not chunk:
-                            break
-                        processed += 1
-                        if processed <= limit:
-                            writer.write(chunk)
-                        else:
-                            carryover = chunk
-                            break
-                else:
-                    raise ValueError('Unsupported split type provided.')
             finally:
-                writer.close()
-            splitsize = os.path.getsize(splitfile)
+                splitsize = self._closewriter(writer, splitfile)
+            headerwritten = True
+            counter = None
+            if isinstance(writer, CountingWriter):
+                counter = writer
+                writer = writer.writer
+            checksum = None
+            if isinstance(writer, HashingWriter):
+                checksum = self._checksum.format(writer.hasher)
+                writer = writer.writer
+            if isinstance(writer, MeteredWriter):
+                writer = writer.writer
+                self._metrics.timing('split', time.perf_counter() - starttime)
+            # Input offset right after the data written so far
+            inputoffset = offset + blocks.tell() - (len(carryover) if carryover else 0)
+            if spool is not None:
+                inputoffset -= spool.tell()
+            position = None
+            if counter is not None:
+                position = self._getposition(counter, header, inputoffset, line)
+                line += position['lines']
+            pending.append((splitnum, splitfilename, splitfile, writer,
+                            splitsize, checksum, inputoffset, position))
+            self._recordsplits(pending, manifest, includeheader,
+                               callback, sizetarget, wait=False)
+            if linesaware:
+                carried = not self.terminate and (spool is not None or blocks.hasdata())
+            if carryover or carried:
+                splitnum += 1
+                continue
+            else:
+                break
+        self._recordsplits(pending, manifest, includeheader,
+                           callback, sizetarget, wait=True)
+
+    def _openwriter(self, splitfile: str, skip: int = 0, background: bool = True) -> BinaryIO:
+        """Returns writer of the split file. Compressed splits, and all the
+        splits in pipelined mode, are written in the background while the next split is read.
+        The data is checksummed on its way into the split if requested.
+
+        Args:
+            splitfile (str): Split file path
+            skip (int, optional): Number of leading bytes of the split left out
+                of the whole file checksum. Defaults to 0.
+            background (bool, optional): Set to False to compress as the data
+                is written. Defaults to True.
+
+        Returns:
+            BinaryIO: Split file writer
+        """
+        if self._codec is None:
+            if background and self._pipeline:
+                writer = WriteBehindWriter(splitfile, self._executor, self._fsync,
+                                           self._dropcache, self._metrics)
+            else:
+                writer = open(splitfile, mode='wb+')
+        elif background:
+            writer = CompressedWriter(splitfile, self._codec, self._executor,
+                                      self._fsync, self._dropcache, self._metrics)
+        else:
+            writer = self._codec.open(splitfile, 'wb')
+        if self._metrics is not None:
+            writer = MeteredWriter(writer, self._metrics)
+        if self._checksum is not None:
+            writer = HashingWriter(writer, self._checksum.new(), self._filehasher, skip)
+        return writer
+
+    def _closewriter(self, writer: BinaryIO, splitfile: str) -> Optional[int]:
+        """Closes the writer of a split, flushing the split to the storage
+        device if requested. The size of an uncompressed split is taken
+        from the writer instead of the file system.
+
+        Args:
+            writer (BinaryIO): Split file writer
+            splitfile (str): Split file path
+
+        Returns:
+            Optional[int]: Split size or None if the split is written in the background
+        """
+        base = writer
+        while isinstance(base, (CountingWriter, HashingWriter, MeteredWriter)):
+            base = base.writer
+        if isinstance(base, (CompressedWriter, WriteBehindWriter)):
+            # Flushed by the background writer
+            writer.close()
+            return None
+        if self._codec is not None:
+            writer.close()
+            if self._fsync or self._dropcache:
+                syncfile(splitfile, self._fsync, self._dropcache, self._metrics)
+            return os.path.getsize(splitfile)
+        splitsize = base.tell()
+        if self._fsync or self._dropcache:
+            base.flush()
+            syncfd(base.fileno(), self._fsync, self._dropcache, self._metrics)
+        writer.close()
+        return splitsize
+
+    def _getmanifestrow(self, splitfilename: str, splitsize: int, includeheader: bool,
+                        checksum: Optional[str] = None) -> dict:
+        """Returns manifest row of a split
+
+        Args:
+            splitfilename (str): Split filename
+            splitsize (int): Split size
+            includeheader (bool): True if the split includes the header
+            checksum (Optional[str], optional): Checksum of the split data. Defaults to None.
+
+        Returns:
+            dict: Manifest row
+        """
+        row = {'filename': splitfilename, 'filesize': splitsize, 'header': includeheader}
+        if self._codec is not None:
+            row['compression'] = self._codec.name
+        if self._checksum is not None:
+            row['checksum'] = checksum
+        if self._quotechar is not None:
+            row['quotechar'] = self._quotechar.decode()
+        return row
+
+    @staticmethod
+    def _getposition(counter: CountingWriter, header: Optional[bytes],
+                     inputoffset: int, line: int) -> dict:
+        """Returns the position of the split data in the input recorded in the manifest
+
+        Args:
+            counter (CountingWriter): Writer that counted the split
+            header (Optional[bytes]): Header written to the split
+            inputoffset (int): Input offset right after the split
+            line (int): Number of newlines in the input before the split
+
+        Returns:
+            dict: Input offset, size, header size, line number and number of lines
+        """
+        headersize = len(header) if header else 0
+        length = counter.size - headersize
+        lines = counter.lines - (header.count(b'\n') if header else 0)
+        return {'offset': inputoffset - length, 'length': length,
+                'headersize': headersize, 'line': line, 'lines': lines}
+
+    def _recordsplits(self, pending: deque, manifest: ManifestWriter, includeheader: bool,
+                      callback: Optional[Callable], sizetarget: Optional[CompressedSizeTarget],
+                      wait: bool) -> None:
+        """Records closed splits in the manifest and invokes the callback in
+        split order once the splits are completely written
+
+        Args:
+            pending (deque): Split number, filename, path, writer, size, checksum,
+                input end offset and input position of the closed splits
+            manifest (ManifestWriter): Manifest writer
+            includeheader (bool): True if the splits include the header
+            callback (Optional[Callable]): callback function to invoke after each split that accepts
+                split file path, size [str, int] as args
+            sizetarget (Optional[CompressedSizeTarget]): Compressed size target to update
+            wait (bool): Set to True to wait for all the splits to be written
+        """
+        while pending:
+            (splitnum, splitfilename, splitfile, writer,
+             splitsize, checksum, inputoffset, position) = pending[0]
+            if isinstance(writer, (CompressedWriter, WriteBehindWriter)):
+                if not wait and not writer.done():
+                    return
+                splitsize = writer.result()
+                if sizetarget:
+                    sizetarget.update(writer.rawsize, splitsize)
+            pending.popleft()
             if manifest:
-                manifest.writerow(
-                    {'filename': splitfilename, 'filesize': splitsize, 'header': includeheader})
+                row = self._getmanifestrow(splitfilename, splitsize, includeheader, checksum)
+                if position is not None:
+                    row.update(position)
+                manifest.writerow(row)
+                self._savecheckpoint(splitnum, inputoffset)
+            self._reportprogress(inputoffset)
             if callback:
                 callback(splitfile, splitsize)
-            if carryover:
-                splitnum += 1
+
+    def _reportprogress(self, offset: int) -> None:
+        """Reports the progress after a split is recorded
+
+        Args:
+            offset (int): Input offset right after the split
+        """
+        if self._progress is None:
+            return
+        self._metrics.counter('splits', 1)
+        self._progress.update(offset)
+
+    def _savecheckpoint(self, splitnum: int, offset: int) -> None:
+        """Checkpoints the last split recorded in the manifest. Splits recorded
+        after the process was terminated are not checkpointed as they may be incomplete.
+
+        Args:
+            splitnum (int): Split number
+            offset (int): Input offset right after the split
+        """
+        if self._checkpoint is None or self.terminate:
+            return
+        self._checkpoint.save(splitnum=splitnum, offset=offset)
+
+    @staticmethod
+    def _writeline(blocks: BlockReader, writer: BytesIO) -> int:
+        """Writes the next line as it is read without holding it in memory
+
+        Args:
+            blocks (BlockReader): Block reader
+            writer (BytesIO): Split file writer
+
+        Returns:
+            int: Line size
+        """
+        linesize = 0
+        while True:
+            idx = blocks.find(b'\n')
+            size = idx + 1 if idx != -1 else len(blocks)
+            writer.write(blocks.take(size))
+            linesize += size
+            if idx != -1 or not blocks.fill():
+                return linesize
+
+    @staticmethod
+    def _writespool(spool: BinaryIO, writer: BytesIO) -> int:
+        """Writes the start of a line spilled to a temporary file and closes it
+
+        Args:
+            spool (BinaryIO): Temporary file
+            writer (BytesIO): Split file writer
+
+        Returns:
+            int: Number of bytes written
+        """
+        with spool:
+            size = spool.tell()
+            spool.seek(0)
+            shutil.copyfileobj(spool, writer, constant.DEFAULT_CHUNK_SIZE)
+        return size
+
+    def _reportlongline(self, offset: int, linesize: int) -> None:
+        """Reports a line that does not fit in a split of its own
+
+        Args:
+            offset (int): Input offset of the line
+            linesize (int): Line size
+
+        Raises:
+            error.LineTooLong: Long lines are not allowed
+        """
+        if self._longlines == 'error':
+            raise error.LineTooLong(
+                f'Line of {linesize} bytes at input offset {offset} is longer than the split size.')
+        log.warning(f'Line of {linesize} bytes at input offset {offset} is longer than '
+                    'the split size, it is written to a split that exceeds the split size.')
+        if self._metrics is not None:
+            self._metrics.counter('long_lines', 1)
+
+    def _readheader(self, blocks: BlockReader) -> bytes:
+        """Reads the header holding no more than the memory limit
+
+        Args:
+            blocks (BlockReader): Block reader
+
+        Raises:
+            error.LineTooLong: Header is longer than the memory limit
+
+        Returns:
+            bytes: Header
+        """
+        header = blocks.readline(self._memorylimit + 1)
+        self._checkheadersize(len(header))
+        return header
+
+    def _checkheadersize(self, headersize: int) -> None:
+        """Checks that the header fits in memory as it is written to every split
+
+        Args:
+            headersize (int): Header size
+
+        Raises:
+            error.LineTooLong: Header is longer than the memory limit
+        """
+        if headersize > self._memorylimit:
+            raise error.LineTooLong(
+                f'Header is longer than the memory limit of {self._memorylimit} bytes.')
+
+    def _writebysize(self, blocks: BlockReader, writer: BytesIO, room: int) -> Optional[BinaryIO]:
+        """Writes as many complete lines as fit in the given room.
+        Data is written a block at a time. A partial line is held in memory
+        until it is known to fit, past the memory limit it is spilled to
+        a temporary file instead.
+
+        Args:
+            blocks (BlockReader): Block reader
+            writer (BytesIO): Split file writer
+            room (int): Number of bytes left in the split
+
+        Returns:
+            Optional[BinaryIO]: Temporary file holding the start of the
+                line carried over to the next split if it was spilled
+        """
+        written = 0
+        spool = None
+        spooled = 0
+        while True:
+            if self.terminate:
+                log.info('Term flag has been set by the user.')
+                log.info('Terminating the process.')
+                if spool is not None:
+                    spool.close()
+                return None
+            avail = room - written - spooled
+            if spool is not None:
+                end = blocks.find(b'\n', 0, avail) + 1
+                if end:
+                    # Spilled line fits in the split
+                    written += self._writespool(spool, writer)
+                    spool, spooled = None, 0
+                    writer.write(blocks.take(end))
+                    written += end
+                    continue
+                if len(blocks) > avail:
+                    # Spilled line does not fit, the rest of it is carried over
+                    return spool
+            elif len(blocks) > avail:
+                # Cut after the last line that fits, the rest is carried over
+                end = blocks.rfind(b'\n', 0, avail) + 1
+                if end:
+                    writer.write(blocks.take(end))
+                return None
+            else:
+                end = blocks.rfind(b'\n') + 1
+                if end:
+                    writer.write(blocks.take(end))
+                    written += end
+            if spool is not None or len(blocks) > self._memorylimit:
+                if spool is None:
+                    spool = tempfile.SpooledTemporaryFile(
+                        max_size=self._memorylimit, dir=self.outputdir)
+                spooled += len(blocks)
+                spool.write(blocks.take(len(blocks)))
+            if not blocks.fill():
+                # Last line without a newline at the end of the file
+                if spool is not None:
+                    self._writespool(spool, writer)
+                if len(blocks):
+                    writer.write(blocks.take(len(blocks)))
+                return None
+
+    def _writebylinecount(self, blocks: BlockReader, writer: BytesIO, count: int) -> None:
+        """Writes the given number of lines. Lines are counted a window
+        at a time and only the window holding the last line is searched line by line.
+        The window grows until it holds the last line.
+
+        Args:
+            blocks (BlockReader): Block reader
+            writer (BytesIO): Split file writer
+            count (int): Number of lines left in the split
+        """
+        window = constant.MIN_SCAN_WINDOW
+        scanned = 0
+        while count > 0:
+            if self.terminate:
+                log.info('Term flag has been set by the user.')
+                log.info('Terminating the process.')
+                break
+            if scanned >= len(blocks):
+                # Everything scanned so far including a partial line
+                # belongs to the split since lines are left to write
+                if scanned:
+                    writer.write(blocks.take(scanned))
+                    scanned = 0
+                if not blocks.fill():
+                    if len(blocks):
+                        writer.write(blocks.take(len(blocks)))
+                    return
+            stop = min(len(blocks), scanned + window)
+            found = blocks.count(b'\n', scanned, stop)
+            if found >= count:
+                scanned = blocks.findnth(b'\n', count, scanned, stop) + 1
+                break
+            count -= found
+            scanned = stop
+            window = min(window * 2, constant.DEFAULT_BLOCK_SIZE)
+        if scanned:
+            writer.write(blocks.take(scanned))
+
+    def _readrecordblocks(self, blocks: BlockReader) -> Iterator[bytes]:
+        """Generates blocks of complete lines. A line longer than a
+        block is read whole into one block.
+
+        Args:
+            blocks (BlockReader): Block reader
+
+        Raises:
+            error.LineTooLong: Line is longer than the memory limit
+
+        Yields:
+            Iterator[bytes]: Block of complete lines
+        """
+        while blocks.hasdata():
+            end = blocks.rfind(b'\n') + 1
+            if not end and len(blocks) > self._memorylimit:
+                # Lines are partitioned whole in memory
+                raise error.LineTooLong(
+                    f'Line is longer than the memory limit of {self._memorylimit} bytes.')
+            if not end and blocks.fill():
                 continue
+            yield bytes(blocks.take(end or len(blocks)))
+
+    def _processkeys(self, blocks: BlockReader, partitioner: Partitioner,
+                     writers: list, workers: int, buffersize: int) -> None:
+        """Process that handles the split by key. Blocks of lines are
+        partitioned, optionally by a pool of worker processes, and the lines
+        of each partition are buffered until the buffers of all the partitions
+        add up to the buffer size.
+
+        Args:
+            blocks (BlockReader): Block reader positioned after the header
+            partitioner (Partitioner): Partitioner of the lines
+            writers (list): Writer of each partition
+            workers (int): Number of worker processes
+            buffersize (int): Max number of bytes buffered for all the partitions
+        """
+        buffers = [[] for _ in writers]
+        buffered = 0
+
+        def add(parts: List[bytes]) -> None:
+            nonlocal buffered
+            for buffer, part in zip(buffers, parts):
+                if part:
+                    buffer.append(part)
+                    buffered += len(part)
+            if buffered >= buffersize:
+                flush()
+
+        def flush() -> None:
+            nonlocal buffered
+            for writer, buffer in zip(writers, buffers):
+                if buffer:
+                    writer.write(b''.join(buffer))
+                    buffer.clear()
+            buffered = 0
+
+        if workers > 1:
+            # Imported here to keep multiprocessing out of the import time
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            pool = nullcontext()
+        with pool as executor:
+            pending = deque()
+            for data in self._readrecordblocks(blocks):
+                if self.terminate:
+                    log.info('Term flag has been set by the user.')
+                    log.info('Terminating the process.')
+                    break
+                if executor is None:
+                    add(partitioner.partition(data))
+                    continue
+                # Blocks are partitioned ahead by the workers
+                # and their lines are added in input order
+                pending.append(executor.submit(partitioner.partition, data))
+                if len(pending) >= workers * 2:
+                    add(pending.popleft().result())
+            while pending:
+                add(pending.popleft().result())
+        flush()
+
+    def _getsizeranges(self, lines: LineProbe, limit: int, newline: bool,
+                       headersize: int, offset: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Generates the input byte ranges of each split for the split by size.
+        The ranges are identical to the ones produced by the sequential process.
+
+        Args:
+            lines (LineProbe): Line probe or line index of the input file
+            limit (int): Max size in bytes allowed in each split
+            newline (bool): Set to True if the split should not contain any incomplete lines
+            headersize (int): Size of the header included in each split
+            offset (Optional[int], optional): Input offset right after the last
+                completed split to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, int]]: Start and end offset of each split
+        """
+        filesize = lines.filesize
+        if not newline:
+            buffersize = Split._getreadbuffersize(splitsize=limit)
+            step = limit - limit % buffersize
+            start = offset or 0
+            while True:
+                # Trailing chunk shorter than the buffer size ends up
+                # in the last split as long as it fits
+                end = filesize if filesize - start <= limit else start + step
+                yield start, end
+                if end >= filesize:
+                    break
+                start = end
+            return
+        room = limit - headersize
+        start = headersize if offset is None else offset
+        first = offset is None
+        while True:
+            if filesize - start <= room:
+                end = filesize
             else:
+                end = lines.lastlineend(start, start + max(room, 0))
+                if end == -1:
+                    end = start
+                if not first:
+                    # Line carried over from the previous split is always
+                    # written even if it does not fit in the split
+                    lineend = lines.lineend(start)
+                    if lineend - start > room:
+                        self._reportlongline(start, lineend - start)
+                    end = max(end, lineend)
+            yield start, end
+            if end >= filesize:
                 break
+            start = end
+            first = False
+
+    def _getlinecountranges(self, lines: LineIndex, limit: int, headersize: int,
+                            offset: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Generates the input byte ranges of each split for the split by line count.
+        The ranges are identical to the ones produced by the sequential process.
+
+        Args:
+            lines (LineIndex): Line index of the input file
+            limit (int): Max number of lines allowed in each split
+            headersize (int): Size of the header included in each split
+            offset (Optional[int], optional): Input offset right after the last
+                completed split to resume from. Defaults to None.
+
+        Yields:
+            Iterator[Tuple[int, int]]: Start and end offset of each split
+        """
+        filesize = lines.filesize
+        count = limit - 1 if headersize else limit
+        start = headersize if offset is None else offset
+        first = offset is None
+        while True:
+            # Line carried over from the previous split is always written
+            end = lines.nthlineend(start, max(count, 0 if first else 1))
+            yield start, end
+            if end >= filesize:
+                break
+            start = end
+            first = False
+
+    @staticmethod
+    def _snapboundary(lines: LineProbe, pos: int, lo: int) -> int:
+        """Returns the line end nearest to the given offset. Only the
+        bytes around the offset are probed.
+
+        Args:
+            lines (LineProbe): Line probe or line index of the input file
+            pos (int): Offset to snap
+            lo (int): Lowest offset to probe from
+
+        Returns:
+            int: Line end offset
+        """
+        after = lines.lineend(pos)
+        # Line end before the offset is probed no further than the one after it
+        before = lines.lastlineend(max(lo, 2 * pos - after), pos)
+        if before != -1 and pos - before <= after - pos:
+            return before
+        return after
+
+    def _getpartranges(self, lines: LineProbe, parts: int, newline: bool, start: int,
+                       workers: int, offset: Optional[int] = None,
+                       end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Generates the input byte ranges of each split for the split into parts.
+        The range is divided evenly by size and each boundary is snapped
+        to the nearest line end by the workers in parallel.
+
+        Args:
+            lines (LineProbe): Line probe or line index of the input file
+            parts (int): Number of splits
+            newline (bool): Set to True if the split should not contain any incomplete lines
+            start (int): Start offset of the first split, right after the header
+            workers (int): Number of workers probing the boundaries
+            offset (Optional[int], optional): Input offset right after the last
+                completed split to resume from. Defaults to None.
+            end (Optional[int], optional): End offset of the last split.
+                Defaults to the input file size.
+
+        Yields:
+            Iterator[Tuple[int, int]]: Start and end offset of each split
+        """
+        lo = start
+        end = lines.filesize if end is None else end
+        bodysize = end - start
+        bounds = [start + bodysize * num // parts for num in range(1, parts)]
+        if newline:
+            pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+            with pool as executor:
+                snap = executor.map if executor else map
+                bounds = list(snap(
+                    lambda pos: Split._snapboundary(lines, pos, lo), bounds))
+        ends = []
+        for bound in bounds:
+            # Boundaries snapped to the same line end make less splits
+            if (ends[-1] if ends else start) < bound < end:
+                ends.append(bound)
+        ends.append(end)
+        for stop in ends:
+            if offset is None or start >= offset:
+                yield start, stop
+            start = stop
+
+    def _writerange(self, fd: int, splitfile: str, header: bytes, start: int, end: int,
+                    filehasher=None) -> Tuple[Optional[int], Optional[str]]:
+        """Writes the given input byte range into a split file
+
+        Args:
+            fd (int): Input file descriptor
+            splitfile (str): Split file path
+            header (bytes): Header to write at the beginning of the split
+            start (int): Start offset of the range
+            end (int): End offset of the range
+            filehasher (optional): Hash object of the whole file to update with
+                the range. Defaults to None.
+
+        Returns:
+            Tuple[Optional[int], Optional[str]]: Split size or None if the process
+                was terminated and checksum of the split if requested
+        """
+        if self.terminate:
+            return None, None
+        hasher = self._checksum.new() if self._checksum is not None else None
+        if self._metrics is None:
+            splitsize = self._copyrange(fd, splitfile, header, start, end, hasher, filehasher)
+        else:
+            starttime = time.perf_counter()
+            splitsize = self._copyrange(fd, splitfile, header, start, end, hasher, filehasher)
+            elapsed = time.perf_counter() - starttime
+            # Data is moved by the copy backend, so the time blocked in
+            # reading and writing is reported together
+            self._metrics.timing('copy', elapsed)
+            self._metrics.timing('split', elapsed)
+            self._metrics.counter('bytes_read', end - start)
+            self._metrics.counter('bytes_written', len(header) + end - start)
+        return splitsize, self._checksum.format(hasher) if hasher is not None else None
+
+    @staticmethod
+    def _preadrange(fd: int, start: int, end: int, writer: BinaryIO, *hashers) -> int:
+        """Copies a byte range of the input into a writer chunk by chunk,
+        checksumming each chunk as it is copied
+
+        Args:
+            fd (int): Input file descriptor
+            start (int): Start offset of the range
+            end (int): End offset of the range
+            writer (BinaryIO): Split file writer
+            hashers: Hash objects to update
+
+        Returns:
+            int: Number of bytes copied
+        """
+        pos = start
+        while pos < end:
+            chunk = os.pread(fd, min(constant.DEFAULT_CHUNK_SIZE, end - pos), pos)
+            if not chunk:
+                break
+            for hasher in hashers:
+                hasher.update(chunk)
+            writer.write(chunk)
+            pos += len(chunk)
+        return pos - start
+
+    def _checkrange(self, start: int, end: int, copied: int) -> None:
+        """Checks that a whole input byte range was copied into its split
+
+        Args:
+            start (int): Start offset of the range
+            end (int): End offset of the range
+            copied (int): Number of bytes copied
+
+        Raises:
+            error.SplitSizeMismatch: Input ended within the range, e.g. it
+                was truncated while being split
+        """
+        if copied != end - start:
+            raise error.SplitSizeMismatch(
+                f'Input file "{self.inputfile}" ended at offset {start + copied} '
+                f'within the split range [{start}, {end}).')
+
+    def _copyrange(self, fd: int, splitfile: str, header: bytes, start: int, end: int,
+                   hasher=None, filehasher=None) -> int:
+        """Copies the given input byte range into a split file. A checksummed
+        range is read and written chunk by chunk so it is hashed as it is
+        copied instead of being read a second time.
+
+        Args:
+            fd (int): Input file descriptor
+            splitfile (str): Split file path
+            header (bytes): Header to write at the beginning of the split
+            start (int): Start offset of the range
+            end (int): End offset of the range
+            hasher (optional): Hash object of the split. Defaults to None.
+            filehasher (optional): Hash object of the whole file. Defaults to None.
+
+        Raises:
+            error.SplitSizeMismatch: Input ended within the range
+
+        Returns:
+            int: Split size
+        """
+        hashers = [h for h in (hasher, filehasher) if h is not None]
+        if hasher is not None:
+            hasher.update(header)
+        if self._codec is not None:
+            with self._codec.open(splitfile, 'wb') as writer:
+                writer.write(header)
+                copied = self._preadrange(fd, start, end, writer, *hashers)
+            self._checkrange(start, end, copied)
+            if self._fsync or self._dropcache:
+                syncfile(splitfile, self._fsync, self._dropcache, self._metrics)
+            return os.path.getsize(splitfile)
+        with open(splitfile, mode='wb+') as writer:
+            if header:
+                writer.write(header)
+            if hashers:
+                copied = self._preadrange(fd, start, end, writer, *hashers)
+                writer.flush()
+            else:
+                writer.flush()
+                copied = self._copier.copy(fd, writer.fileno(), start, end - start)
+            self._checkrange(start, end, copied)
+            if self._fsync or self._dropcache:
+                syncfd(writer.fileno(), self._fsync, self._dropcache, self._metrics)
+        return len(header) + copied
+
+    def _writeranges(self, fd: int, header: bytes, ranges: Iterator[Tuple[int, int]],
+                     workers: int, splitnum: int = 1
+                     ) -> Iterator[Tuple[str, str, int, int, Optional[int], Optional[str]]]:
+        """Writes each input byte range into its own split. Nothing is
+        written for virtual splits. Splits are checksummed as they are written
+        and the whole file checksum is updated if the splits are written in order.
+
+        Args:
+            fd (int): Input file descriptor
+            header (bytes): Header to write at the beginning of each split
+            ranges (Iterator[Tuple[int, int]]): Start and end offset of each split
+            workers (int): Number of workers writing the splits concurrently
+            splitnum (int, optional): Split number of the first range. Defaults to 1.
+
+        Yields:
+            Iterator[Tuple[str, str, int, int, Optional[int], Optional[str]]]: Split filename,
+                path, input range, size and checksum in split order. Size is None if
+                the process was terminated.
+        """
+        splits = ((self._getnextsplit(splitnum), start, end)
+                  for splitnum, (start, end) in enumerate(ranges, start=splitnum))
+        if self._virtual:
+            # Virtual splits are only recorded in the manifest, so
+            # the input range is read once to checksum it
+            for splitfilename, start, end in splits:
+                splitfile = os.path.join(self.outputdir, splitfilename)
+                splitsize = None if self.terminate else len(header) + end - start
+                checksum = None
+                if splitsize is not None and self._checksum is not None:
+                    hasher = self._checksum.new()
+                    hasher.update(header)
+                    hashers = [hasher]
+                    if self._filehasher is not None:
+                        hashers.append(self._filehasher)
+                    hashrange(fd, start, end, *hashers)
+                    checksum = self._checksum.format(hasher)
+                yield splitfilename, splitfile, start, end, splitsize, checksum
+            return
+        if workers <= 1:
+            for splitfilename, start, end in splits:
+                splitfile = os.path.join(self.outputdir, splitfilename)
+                yield (splitfilename, splitfile, start, end) + self._writerange(
+                    fd, splitfile, header, start, end, self._filehasher)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for splitfilename, start, end in splits:
+                splitfile = os.path.join(self.outputdir, splitfilename)
+                future = executor.submit(
+                    self._writerange, fd, splitfile, header, start, end)
+                futures.append((splitfilename, splitfile, start, end, future))
+            for splitfilename, splitfile, start, end, future in futures:
+                yield (splitfilename, splitfile, start, end) + future.result()
+
+    def _getlineindex(self, workers: int = 1) -> LineIndex:
+        """Returns line index of the input file. A saved index is reused
+        if the input file has not changed, else the index is built and saved.
+        The records are indexed instead of the lines if a quote char is set.
+
+        Args:
+            workers (int, optional): Number of workers building the index. Defaults to 1.
+
+        Returns:
+            LineIndex: Line index
+        """
+        index = LineIndex.load(self.indexfile, self.inputfile, self._quotechar)
+        if index is None:
+            index = LineIndex.build(self.inputfile, self._quotechar, workers)
+            index.save(self.indexfile)
+        return index
+
+    def _recordranges(self, fd: int, header: bytes, ranges: Iterator[Tuple[int, int]],
+                      includeheader: bool, callback: Optional[Callable], workers: int,
+                      manifest: ManifestWriter, index: Optional[LineIndex],
+                      splitnum: int, line: int) -> None:
+        """Writes each input byte range into its own split and records
+        the splits in the manifest in split order
+
+        Args:
+            fd (int): Input file descriptor
+            header (bytes): Header to write at the beginning of each split
+            ranges (Iterator[Tuple[int, int]]): Start and end offset of each split
+            includeheader (bool): True if the splits include the header
+            callback (Optional[Callable]): callback function to invoke after each split that accepts
+                split file path, size [str, int] as args
+            workers (int): Number of workers writing the splits concurrently
+            manifest (ManifestWriter): Manifest writer
+            index (Optional[LineIndex]): Line index to count the lines of each split from
+            splitnum (int): Split number of the first range
+            line (int): Number of newlines in the input before the first range
+        """
+        log.info(f'Splitting using {workers} worker(s) and '
+                 f'"{self.copybackend}" copy backend')
+        if self._filehasher is not None:
+            if workers > 1 and not self._virtual:
+                # Splits written concurrently are not hashed in input order
+                log.info('Whole file checksum is not computed for splits written by several workers')
+                self._filehasher = None
+            else:
+                self._filehasher.update(header)
+        for splitfilename, splitfile, start, end, splitsize, checksum in self._writeranges(
+                fd, header, ranges, workers, splitnum):
+            if splitsize is None:
+                log.info('Term flag has been set by the user.')
+                log.info('Terminating the process.')
+                break
+            row = self._getmanifestrow(splitfilename, splitsize, includeheader, checksum)
+            if self._virtual:
+                row['source'] = os.path.abspath(self.inputfile)
+            if self._virtual or self._manifestformat == 'jsonl':
+                row.update(offset=start, length=end - start, headersize=len(header))
+            if self._manifestformat == 'jsonl':
+                if index is not None and self._quotechar is None:
+                    count = index.countlines(start, end)
+                else:
+                    count = countnewlines(fd, start, end)
+                row.update(line=line, lines=count)
+                line += count
+            manifest.writerow(row)
+            self._savecheckpoint(splitnum, end)
+            self._reportprogress(end)
+            splitnum += 1
+            if callback:
+                callback(splitfile, splitsize)
+
+    def _processranges(self, limit: int, splitby: str, newline: bool,
+                       includeheader: bool, callback: Optional[Callable],
+                       workers: int, manifest: ManifestWriter,
+                       index: Optional[LineIndex] = None, splitnum: int = 1,
+                       offset: Optional[int] = None, line: Optional[int] = None) -> None:
+        """Process that handles the file split using byte ranges.
+        The split boundaries are computed up front and each split is copied
+        from its input range with the copy backend, optionally by a pool of workers.
+
+        Args:
+            limit (int): Size, Number of lines or Number of parts
+            splitby (str): "size", "linecount" or "parts"
+            newline (bool): Set to True if the split should not contain any incomplete lines
+            includeheader (bool): Set to true to include header in each split
+            callback (Optional[Callable]): callback function to invoke after each split that accepts
+                split file path, size [str, int] as args
+            workers (int): Number of workers
+            manifest (ManifestWriter): Manifest writer
+            index (Optional[LineIndex], optional): Line index to look up the
+                boundaries from. Required to split by line count. Defaults to None.
+            splitnum (int, optional): Split number to start from. Defaults to 1.
+            offset (Optional[int], optional): Input offset right after the last
+                completed split to resume from. Defaults to None.
+            line (Optional[int], optional): Number of newlines in the input before
+                the split to resume from. Defaults to None.
+        """
+        fd = os.open(self.inputfile, os.O_RDONLY)
+        try:
+            lines = index if index is not None else LineProbe(fd, os.fstat(fd).st_size)
+            header = b''
+            if includeheader:
+                newline = True
+                self._checkheadersize(lines.lineend(0))
+                header = os.pread(fd, lines.lineend(0), 0)
+                if self._metrics is not None:
+                    self._metrics.counter('bytes_read', len(header))
+            if line is None:
+                line = header.count(b'\n')
+            if splitby == 'size':
+                ranges = self._getsizeranges(
+                    lines, limit, newline, len(header), offset)
+            elif splitby == 'parts':
+                ranges = self._getpartranges(
+                    lines, limit, newline, len(header), workers, offset)
+            else:
+                ranges = self._getlinecountranges(lines, limit, len(header), offset)
+            self._recordranges(fd, header, ranges, includeheader, callback,
+                               workers, manifest, index, splitnum, line)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _getextractrange(lines: LineProbe, start: int, end: Optional[int],
+                         bylines: bool) -> Tuple[int, int]:
+        """Returns the input byte range to extract. Negative positions count
+        back from the end of the file.
+
+        Args:
+            lines (LineProbe): Line probe or line index of the input file
+            start (int): Start offset or number of the first line
+            end (Optional[int]): End offset or number of the line after the
+                last one, None for the end of the file
+            bylines (bool): True if the positions are line numbers
+
+        Returns:
+            Tuple[int, int]: Start and end offset
+        """
+        filesize = lines.filesize
+        if not bylines:
+            lo = start + filesize if start < 0 else start
+            hi = filesize if end is None else end + filesize if end < 0 else end
+            lo = min(max(lo, 0), filesize)
+            return lo, min(max(hi, lo), filesize)
+        lo = lines.tailstart(-start) if start < 0 else lines.nthlineend(0, start)
+        if end is None:
+            hi = filesize
+        elif end < 0:
+            hi = lines.tailstart(-end)
+        elif start >= 0:
+            # Lines are only counted from the start of the range
+            hi = lines.nthlineend(lo, end - start)
+        else:
+            hi = lines.nthlineend(0, end)
+        return lo, max(hi, lo)
+
+    @staticmethod
+    def _uniform(rng: random.Random) -> float:
+        """Returns a random number greater than zero and less than one
+
+        Args:
+            rng (random.Random): Random number generator
+
+        Returns:
+            float: Random number
+        """
+        while True:
+            value = rng.random()
+            if value:
+                return value
+
+    def _samplestride(self, blocks: BlockReader, stride: int, rng: random.Random,
+                      parts: int, filesize: Optional[int],
+                      headersize: int) -> Iterator[Tuple[int, List[bytes]]]:
+        """Samples every nth line starting from a random line among the first n.
+        Each line goes to the part covering its input offset, so the parts
+        sample about equal shares of the input.
+
+        Args:
+            blocks (BlockReader): Block reader positioned after the header
+            stride (int): Number of lines between the sampled lines
+            rng (random.Random): Random number generator
+            parts (int): Number of splits
+            filesize (Optional[int]): Input file size or None for a stream
+            headersize (int): Size of the header
+
+        Yields:
+            Iterator[Tuple[int, List[bytes]]]: Part and sampled lines of each block
+        """
+        skip = rng.randrange(stride)
+        bodysize = max((filesize or 0) - headersize, 1)
+        for data in self._readrecordblocks(blocks):
+            if self.terminate:
+                log.info('Term flag has been set by the user.')
+                log.info('Terminating the process.')
+                break
+            records = splitrecords(data, self._quotechar)
+            part = 0
+            cuts = []
+            if parts > 1:
+                blockstart = blocks.tell() - len(data)
+                part = min((blockstart - headersize) * parts // bodysize, parts - 1)
+                # Line starts locate the first line of each part starting in the block
+                starts = list(accumulate(map(len, records), initial=blockstart))
+                for nextpart in range(part + 1, parts):
+                    bound = headersize - (-bodysize * nextpart // parts)
+                    if bound >= starts[-1]:
+                        break
+                    cuts.append(bisect_left(starts, bound, 0, len(records)))
+            cuts.append(len(records))
+            begin = 0
+            for cut in cuts:
+                picked = records[begin + (skip - begin) % stride:cut:stride]
+                if picked:
+                    yield part, picked
+                part += 1
+                begin = cut
+            skip = (skip - len(records)) % stride
+
+    def _samplereservoir(self, blocks: BlockReader, count: int, rng: random.Random,
+                         parts: int) -> Iterator[Tuple[int, List[bytes]]]:
+        """Samples the given number of lines uniformly in one pass. The number of
+        lines skipped before the next line replaces one in the reservoir is drawn
+        at once, so only the lines kept are touched. The sample is divided
+        evenly into the parts in input order.
+
+        Args:
+            blocks (BlockReader): Block reader positioned after the header
+            count (int): Number of lines to sample
+            rng (random.Random): Random number generator
+            parts (int): Number of splits
+
+        Yields:
+            Iterator[Tuple[int, List[bytes]]]: Part and sampled lines of each part
+        """
+        reservoir = []
+        weight = math.exp(math.log(self._uniform(rng)) / count)
+        nextpick = count + int(math.log(self._uniform(rng)) / math.log(1 - weight))
+        base = 0
+        for data in self._readrecordblocks(blocks):
+            if self.terminate:
+                log.info('Term flag has been set by the user.')
+                log.info('Terminating the process.')
+                break
+            records = splitrecords(data, self._quotechar)
+            if len(reservoir) < count:
+                fill = records[:count - len(reservoir)]
+                reservoir.extend(zip(range(base, base + len(fill)), fill))
+            while nextpick < base + len(records):
+                reservoir[rng.randrange(count)] = (nextpick, records[nextpick - base])
+                weight *= math.exp(math.log(self._uniform(rng)) / count)
+                nextpick += int(math.log(self._uniform(rng)) / math.log(1 - weight)) + 1
+            base += len(records)
+        reservoir.sort(key=lambda item: item[0])
+        size = len(reservoir)
+        for part in range(parts):
+            picked = [record for _, record in
+                      reservoir[size * part // parts:size * (part + 1) // parts]]
+            if picked:
+                yield part, picked
+
+    def _recordsample(self, split: tuple, includeheader: bool, manifest: ManifestWriter,
+                      callback: Optional[Callable], offset: int) -> None:
+        """Closes a sample split and records it in the manifest
+
+        Args:
+            split (tuple): Split filename, path and writer
+            includeheader (bool): True if the split includes the header
+            manifest (ManifestWriter): Manifest writer
+            callback (Optional[Callable]): callback function to invoke after the split that accepts
+                split file path, size [str, int] as args
+            offset (int): Input offset read so far
+        """
+        splitfilename, splitfile, writer = split
+        splitsize = self._closewriter(writer, splitfile)
+        checksum = None
+        if isinstance(writer, HashingWriter):
+            checksum = self._checksum.format(writer.hasher)
+        manifest.writerow(self._getmanifestrow(splitfilename, splitsize, includeheader, checksum))
+        self._reportprogress(offset)
+        if callback:
+            callback(splitfile, splitsize)
+
+    def _writesample(self, samples: Iterator[Tuple[int, List[bytes]]], parts: int,
+                     header: bytes, includeheader: bool, manifest: ManifestWriter,
+                     callback: Optional[Callable], blocks: BlockReader) -> None:
+        """Writes the sampled lines into the splits in part order. Every
+        part is given a split, even if no line is sampled into it.
+
+        Args:
+            samples (Iterator[Tuple[int, List[bytes]]]): Part and sampled lines
+                in increasing part order
+            parts (int): Number of splits
+            header (bytes): Header to write at the beginning of each split
+            includeheader (bool): True if the splits include the header
+            manifest (ManifestWriter): Manifest writer
+            callback (Optional[Callable]): callback function to invoke after each split that accepts
+                split file path, size [str, int] as args
+            blocks (BlockReader): Block reader of the input
+        """
+        splitnum = 0
+        split = None
+        try:
+            for part, records in chain(samples, [(parts - 1, [])]):
+                while splitnum <= part:
+                    if split is not None:
+                        closing, split = split, None
+                        self._recordsample(closing, includeheader, manifest,
+                                           callback, blocks.tell())
+                    splitnum += 1
+                    splitfilename = self._getnextsplit(splitnum)
+                    splitfile = os.path.join(self.outputdir, splitfilename)
+                    split = (splitfilename, splitfile,
+                             self._openwriter(splitfile, background=False))
+                    if header:
+                        split[2].write(header)
+                if records:
+                    split[2].write(b''.join(records))
+            closing, split = split, None
+            self._recordsample(closing, includeheader, manifest, callback, blocks.tell())
+        finally:
+            if split is not None:
+                self._closewriter(split[2], split[1])
+
+    def _openinput(self) -> BinaryIO:
+        """Returns reader of the input file or stream
+
+        Returns:
+            BinaryIO: Reader to use as a context manager
+        """
+        if self._stream is not None:
+            return nullcontext(self._stream)
+        return open(self.inputfile, mode='rb')
 
     def _endprocess(self):
         """Runs statements that marks the completion of the process
@@ -268,8 +1735,272 @@ class Split:
         runtime = int((endtime - self._starttime)/60)
         log.info(f'Process completed in {runtime} min(s)')
 
+    def _getinputstate(self) -> dict:
+        """Returns the input file identity recorded in the checkpoint
+
+        Returns:
+            dict: Input filename, size and modification time
+        """
+        state = {'filename': ntpath.basename(self.inputfile)}
+        if self._stream is None:
+            stat = os.stat(self.inputfile)
+            state.update(filesize=stat.st_size, mtime=stat.st_mtime_ns)
+        return state
+
+    def _loadcheckpoint(self, state: dict) -> Tuple[int, int, list]:
+        """Loads the progress of an earlier split to resume from
+
+        Args:
+            state (dict): Input file identity and split options
+
+        Raises:
+            error.CheckpointMismatch: Checkpoint was saved for a different input or options
+
+        Returns:
+            Tuple[int, int, list]: Number of completed splits, input offset right
+                after them and their manifest rows
+        """
+        checkpointfile = self._getmanifestpath() + constant.CHECKPOINT_FILE_SUFFIX
+        checkpoint = Checkpoint.load(checkpointfile)
+        if checkpoint is None:
+            log.info('No checkpoint found, splitting from the start')
+            return 0, 0, []
+        if any(checkpoint.state.get(key) != value for key, value in state.items()):
+            raise error.CheckpointMismatch(
+                f'Checkpoint "{checkpointfile}" was saved for a different input file or split options.')
+        splitnum = checkpoint.state['splitnum']
+        # Splits recorded after the checkpoint are written again
+        rows = Manifest.load(self._getmanifestpath())[:splitnum]
+        if len(rows) < splitnum:
+            raise error.CheckpointMismatch(
+                f'Manifest has less splits than recorded in checkpoint "{checkpointfile}".')
+        return splitnum, checkpoint.state['offset'], rows
+
+    def _resumeinput(self, reader: BinaryIO, offset: int, includeheader: bool) -> Optional[bytes]:
+        """Positions the input right after the completed splits
+
+        Args:
+            reader (BinaryIO): Input file or stream reader
+            offset (int): Input offset to resume from
+            includeheader (bool): True if the splits include the header
+
+        Returns:
+            Optional[bytes]: Header to include in the remaining splits
+        """
+        header = None
+        seekable = reader.seekable()
+        if includeheader:
+            header = readrecord(reader, self._quotechar)
+        if seekable:
+            reader.seek(offset)
+            return header
+        # Streams that cannot seek are read up to the offset
+        log.info('Input stream is not seekable, skipping the completed splits by reading them')
+        remaining = offset - (len(header) if header else 0)
+        while remaining > 0:
+            chunk = reader.read(min(constant.DEFAULT_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        return header
+
+    def _setoptions(self, compression: Optional[str], checksum: Optional[str],
+                    quotechar: Optional[str], virtual: bool = False) -> None:
+        """Sets the options shared by all the split types
+
+        Args:
+            compression (Optional[str]): Codec to compress each split with
+            checksum (Optional[str]): Algorithm to checksum each split and the whole file with
+            quotechar (Optional[str]): Quote char of the CSV records
+            virtual (bool, optional): Set to true to only record the input
+                byte range of each split. Defaults to False.
+
+        Raises:
+            ValueError: Quote char is not a single byte or virtual splits
+                are compressed or split from a stream
+            NotImplementedError: Platform does not support reading file ranges
+        """
+        self._quotechar = quotechar.encode() if quotechar else None
+        if self._quotechar is not None and len(self._quotechar) != 1:
+            raise ValueError('Quote char must be a single byte character.')
+        self._virtual = virtual
+        self._shard = None
+        if virtual:
+            if self._stream is not None:
+                raise ValueError('Virtual splits are byte ranges of a file, streams are not supported.')
+            if compression:
+                raise ValueError('Virtual splits cannot be compressed.')
+            if not hasattr(os, 'pread'):
+                raise NotImplementedError('Virtual splits are not supported on this platform.')
+        self._codec = Codec(compression) if compression else None
+        self._checksum = Checksum(checksum) if checksum else None
+        self._filehasher = self._checksum.new() if checksum else None
+
+    def _getfieldnames(self, positions: bool = True) -> List[str]:
+        """Returns manifest columns for the options set
+
+        Args:
+            positions (bool, optional): Set to False if the splits are not
+                ranges of the input. Defaults to True.
+
+        Returns:
+            List[str]: Manifest columns
+        """
+        fieldnames = ['filename', 'filesize', 'header']
+        if self._codec is not None:
+            fieldnames.append('compression')
+            log.info(f'Compressing splits with "{self._codec.name}"')
+        if self._checksum is not None:
+            fieldnames.append('checksum')
+        if self._quotechar is not None:
+            # Merge skips the header as a whole record
+            fieldnames.append('quotechar')
+        if self._virtual:
+            fieldnames.append('source')
+        if self._virtual or self._manifestformat == 'jsonl' and positions:
+            fieldnames.extend(['offset', 'length', 'headersize'])
+        if self._manifestformat == 'jsonl' and positions:
+            fieldnames.extend(['line', 'lines'])
+        return fieldnames
+
+    def _split(self, limit: int, splitby: str, newline: bool, includeheader: bool,
+               callback: Optional[Callable], workers: int, useindex: bool,
+               compression: Optional[str], checksum: Optional[str],
+               compressedsize: bool = False, resume: bool = False,
+               quotechar: Optional[str] = None, virtual: bool = False) -> None:
+        """Runs the split picking the process that fits the given options
+
+        Args:
+            limit (int): Size, Number of lines or Number of parts
+            splitby (str): "size", "linecount" or "parts"
+            newline (bool): Set to True if the split should not contain any incomplete lines
+            includeheader (bool): Set to true to include header in each split
+            callback (Optional[Callable]): callback function to invoke after each split that accepts
+                split file path, size [str, int] as args
+            workers (int): Number of workers
+            useindex (bool): Set to true to look up the line boundaries from the line index
+            compression (Optional[str]): Codec to compress each split with
+            checksum (Optional[str]): Algorithm to checksum each split and the whole file with
+            compressedsize (bool, optional): Set to true to apply the size limit
+                to the compressed splits. Defaults to False.
+            resume (bool, optional): Set to true to resume an earlier split
+                from its checkpoint. Defaults to False.
+            quotechar (Optional[str], optional): Quote char of the CSV records
+                to split on record boundaries. Defaults to None.
+            virtual (bool, optional): Set to true to only record the input byte
+                range of each split without writing the splits. Defaults to False.
+        """
+        self._setoptions(compression, checksum, quotechar, virtual)
+        if self._quotechar is not None:
+            # Records are split on record boundaries only
+            newline = True
+        linesaware = newline or includeheader or splitby == 'linecount'
+        if splitby == 'size':
+            # Splits that do not need to be line aware are copied as byte
+            # ranges which lets the copy backend move the data
+            byranges = (workers > 1 or useindex or not linesaware) and limit > 0
+        elif splitby == 'linecount':
+            byranges = workers > 1 or useindex
+        else:
+            # Parts are derived from the input file size
+            byranges = True
+        if virtual:
+            if splitby == 'size' and limit <= 0:
+                raise ValueError('Size of virtual splits must be greater than zero.')
+            byranges = True
+        if (self._codec is not None and splitby != 'parts'
+                and (compressedsize or (workers <= 1 and not useindex))):
+            # Compressed size is only known once the split is written and a single
+            # worker compresses in the background while the next split is read
+            byranges = False
+        if byranges and self._stream is not None:
+            if workers > 1 or useindex:
+                log.info('Workers and line index are not supported for streams.')
+            byranges = False
+        if byranges and not hasattr(os, 'pread'):
+            if workers > 1 or useindex:
+                log.info('Workers and line index are not supported on this platform.')
+            byranges = False
+        fieldnames = self._getfieldnames()
+        # Splits are identical whichever process writes them, so workers
+        # and index may differ from the split being resumed
+        state = {'input': self._getinputstate(), 'options': {
+            'splitby': splitby, 'limit': limit, 'newline': newline,
+            'includeheader': includeheader, 'compression': compression,
+            'compressedsize': compressedsize, 'checksum': checksum, 'quotechar': quotechar,
+            'virtual': virtual, 'manifestformat': self.manifestformat,
+            'shardsize': self.shardsize,
+            'splitdelimiter': self.splitdelimiter, 'splitzerofill': self.splitzerofill}}
+        splitnum, offset, rows = self._loadcheckpoint(state) if resume else (0, 0, [])
+        with open(self._getmanifestpath(), mode='w+', encoding='utf8', newline='') as writer:
+            manifest = ManifestWriter(writer, fieldnames, self.manifestformat)
+            manifest.writeheader()
+            manifest.writerows(rows)
+            self._checkpoint = Checkpoint(
+                self._getmanifestpath() + constant.CHECKPOINT_FILE_SUFFIX,
+                dict(state, splitnum=splitnum, offset=offset), flush=writer,
+                enabled=self._resumable or resume)
+            if self._metrics is not None:
+                total = state['input'].get('filesize')
+                self._progress = Progress(self._metrics, total, offset)
+            kwargs = {}
+            if splitnum:
+                log.info(f'Resuming after split {splitnum} at input offset {offset}')
+                if self._filehasher is not None:
+                    log.info('Whole file checksum is not computed for a resumed split')
+                    self._filehasher = None
+                kwargs = {'splitnum': splitnum + 1, 'offset': offset, 'carried': linesaware}
+                if self.manifestformat == 'jsonl':
+                    kwargs['line'] = int(rows[-1]['line']) + int(rows[-1]['lines'])
+            if splitnum and self._stream is None and offset >= state['input']['filesize']:
+                log.info('Completed splits cover the whole input file')
+            elif byranges:
+                index = None
+                if useindex and linesaware or splitby == 'linecount' or self._quotechar:
+                    index = self._getlineindex(workers)
+                self._processranges(limit, splitby, newline, includeheader,
+                                    callback, workers, manifest, index,
+                                    splitnum + 1, offset if splitnum else None,
+                                    kwargs.get('line'))
+            else:
+                with self._openinput() as reader:
+                    if self._metrics is not None:
+                        reader = MeteredReader(reader, self._metrics)
+                    if splitnum:
+                        kwargs['header'] = self._resumeinput(reader, offset, includeheader)
+                    if self._pipeline:
+                        reader = ReadAheadReader(reader, constant.DEFAULT_BLOCK_SIZE)
+                    try:
+                        if self._codec is not None or self._pipeline:
+                            if self._codec is not None and compressedsize and splitby == 'size':
+                                kwargs['sizetarget'] = CompressedSizeTarget(limit)
+                            with ThreadPoolExecutor(max_workers=max(workers, 1)) as self._executor:
+                                self._process(reader, limit, splitby, newline, includeheader,
+                                              callback, manifest=manifest, **kwargs)
+                            self._executor = None
+                        else:
+                            self._process(reader, limit, splitby, newline, includeheader,
+                                          callback, manifest=manifest, **kwargs)
+                    finally:
+                        if isinstance(reader, ReadAheadReader):
+                            reader.close()
+        if not self.terminate:
+            self._checkpoint.remove()
+        self._checkpoint = None
+        self._progress = None
+        if self._filehasher is not None and not self.terminate:
+            writechecksumfile(self._getmanifestpath() + constant.CHECKSUM_FILE_SUFFIX,
+                              self._checksum.format(self._filehasher),
+                              ntpath.basename(self.inputfile))
+        self._filehasher = None
+        self._endprocess()
+
     def bysize(self, size: int, newline: bool = False,
-               includeheader: bool = False, callback: Callable = None) -> None:
+               includeheader: bool = False, callback: Callable = None,
+               workers: int = 1, useindex: bool = False,
+               compression: Optional[str] = None, compressedsize: bool = False,
+               checksum: Optional[str] = None, resume: bool = False,
+               quotechar: Optional[str] = None, virtual: bool = False) -> None:
         """Splits by size
 
         Args:
@@ -280,19 +2011,32 @@ class Split:
                 Defaults to False.
             callback (Callable, optional): Callback function to invoke after each split that passes
                 split file path, size [str, int] as args. Defaults to None.
+            workers (int, optional): Number of workers to write the splits in parallel.
+                Defaults to 1.
+            useindex (bool, optional): Set to true to look up the line boundaries
+                from the line index of the input file. Defaults to False.
+            compression (Optional[str], optional): Codec to compress each split with.
+                "gzip", "bz2", "lzma" or "zstd". Defaults to None.
+            compressedsize (bool, optional): Set to true to apply the size to the
+                compressed splits instead of the raw data. Defaults to False.
+            checksum (Optional[str], optional): Algorithm to checksum each split and
+                the whole file with such as "crc32", "blake2b" or "xxh64". Defaults to None.
+            resume (bool, optional): Set to true to resume an earlier split that did not
+                complete from where it stopped. Defaults to False.
+            quotechar (Optional[str], optional): Quote char of a CSV file such as '"'.
+                Splits are cut on record boundaries only, so quoted fields containing
+                newlines are kept intact. Implies newline. Defaults to None.
+            virtual (bool, optional): Set to true to only record the input byte range
+                of each split in the manifest without writing the splits. Defaults to False.
         """
-        with open(self.inputfile, mode='rb') as reader:
-            with open(self._getmanifestpath(), mode='w+', encoding='utf8', newline='') as writer:
-                fieldnames = ['filename', 'filesize', 'header']
-                manifest = csv.DictWriter(
-                    writer, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
-                manifest.writeheader()
-                self._process(reader, size, 'size', newline,
-                              includeheader, callback, manifest=manifest)
-        self._endprocess()
+        self._split(size, 'size', newline, includeheader, callback, workers,
+                    useindex, compression, checksum, compressedsize, resume, quotechar, virtual)
 
     def bylinecount(self, linecount: int, includeheader: bool = False,
-                    callback: Callable = None) -> None:
+                    callback: Callable = None, workers: int = 1,
+                    useindex: bool = False, compression: Optional[str] = None,
+                    checksum: Optional[str] = None, resume: bool = False,
+                    quotechar: Optional[str] = None, virtual: bool = False) -> None:
         """Splits by line count
 
         Args:
@@ -301,17 +2045,413 @@ class Split:
                 Defaults to False.
             callback (Callable, optional): Callback function to invoke after each split that passes
                 split file path, size [str, int] as args. Defaults to None.
+            workers (int, optional): Number of workers to write the splits in parallel.
+                Requires the line index which is used regardless of useindex. Defaults to 1.
+            useindex (bool, optional): Set to true to look up the line boundaries
+                from the line index of the input file. Defaults to False.
+            compression (Optional[str], optional): Codec to compress each split with.
+                "gzip", "bz2", "lzma" or "zstd". Defaults to None.
+            checksum (Optional[str], optional): Algorithm to checksum each split and
+                the whole file with such as "crc32", "blake2b" or "xxh64". Defaults to None.
+            resume (bool, optional): Set to true to resume an earlier split that did not
+                complete from where it stopped. Defaults to False.
+            quotechar (Optional[str], optional): Quote char of a CSV file such as '"'.
+                Records are counted instead of lines, so quoted fields containing
+                newlines are kept intact. Defaults to None.
+            virtual (bool, optional): Set to true to only record the input byte range
+                of each split in the manifest without writing the splits. Defaults to False.
+        """
+        self._split(linecount, 'linecount', True, includeheader, callback, workers,
+                    useindex, compression, checksum, resume=resume, quotechar=quotechar,
+                    virtual=virtual)
+
+    def intoparts(self, parts: int, newline: bool = False,
+                  includeheader: bool = False, callback: Callable = None,
+                  workers: int = 1, useindex: bool = False,
+                  compression: Optional[str] = None, checksum: Optional[str] = None,
+                  resume: bool = False, quotechar: Optional[str] = None,
+                  virtual: bool = False) -> None:
+        """Splits into the given number of splits of about equal size. Only
+        the input around each boundary is probed to snap it to a line end.
+
+        Args:
+            parts (int): Number of splits. Less splits are made if the
+                boundaries snap to the same line end.
+            newline (bool, optional): Set to true to avoid any incomplete lines
+                in each split. Defaults to False.
+            includeheader (bool, optional): Set to true to include header with each split.
+                Defaults to False.
+            callback (Callable, optional): Callback function to invoke after each split that passes
+                split file path, size [str, int] as args. Defaults to None.
+            workers (int, optional): Number of workers to probe the boundaries and write
+                the splits in parallel. Defaults to 1.
+            useindex (bool, optional): Set to true to look up the line boundaries
+                from the line index of the input file. Defaults to False.
+            compression (Optional[str], optional): Codec to compress each split with.
+                "gzip", "bz2", "lzma" or "zstd". Defaults to None.
+            checksum (Optional[str], optional): Algorithm to checksum each split and
+                the whole file with such as "crc32", "blake2b" or "xxh64". Defaults to None.
+            resume (bool, optional): Set to true to resume an earlier split that did not
+                complete from where it stopped. Defaults to False.
+            quotechar (Optional[str], optional): Quote char of a CSV file such as '"'.
+                Boundaries are snapped to record ends looked up from the record index.
+                Implies newline. Defaults to None.
+            virtual (bool, optional): Set to true to only record the input byte range
+                of each split in the manifest without writing the splits. Defaults to False.
+
+        Raises:
+            ValueError: Number of parts is not positive or the input is a stream
+            NotImplementedError: Platform does not support reading file ranges
+        """
+        if parts < 1:
+            raise ValueError('Number of parts must be greater than zero.')
+        if self._stream is not None:
+            raise ValueError('Splitting into parts requires the input size, streams are not supported.')
+        if not hasattr(os, 'pread'):
+            raise NotImplementedError('Splitting into parts is not supported on this platform.')
+        self._split(parts, 'parts', newline, includeheader, callback, workers,
+                    useindex, compression, checksum, resume=resume, quotechar=quotechar,
+                    virtual=virtual)
+
+    def bykey(self, key: Union[Callable, int, str], partitions: int,
+              includeheader: bool = False, callback: Callable = None,
+              workers: int = 1, delimiter: str = ',',
+              compression: Optional[str] = None, checksum: Optional[str] = None,
+              quotechar: Optional[str] = None,
+              buffersize: int = constant.PARTITION_BUFFER_SIZE) -> None:
+        """Splits by key. Each line goes to one of the given number of splits
+        by a hash of its key, so lines with the same key always land in the same split.
+
+        Args:
+            key (Union[Callable, int, str]): Function that accepts a line [bytes] and
+                returns its key, index of the key column or name of the key column
+                in the header
+            partitions (int): Number of splits
+            includeheader (bool, optional): Set to true to include header with each split.
+                Required to look up the key column by name. Defaults to False.
+            callback (Callable, optional): Callback function to invoke after each split that passes
+                split file path, size [str, int] as args. Defaults to None.
+            workers (int, optional): Number of worker processes to partition the lines.
+                A key function must be picklable to be used by the workers. Defaults to 1.
+            delimiter (str, optional): Column delimiter. Defaults to ','.
+            compression (Optional[str], optional): Codec to compress each split with.
+                "gzip", "bz2", "lzma" or "zstd". Defaults to None.
+            checksum (Optional[str], optional): Algorithm to checksum each split with
+                such as "crc32", "blake2b" or "xxh64". Defaults to None.
+            quotechar (Optional[str], optional): Quote char of a CSV file such as '"'.
+                Records are partitioned instead of lines and the key column is parsed
+                as CSV. Defaults to None.
+            buffersize (int, optional): Max number of bytes buffered for all the splits
+                before they are written. Defaults to 32 MB.
+
+        Raises:
+            ValueError: Number of partitions is not positive or the key column is not found
+        """
+        if partitions < 1:
+            raise ValueError('Number of partitions must be greater than zero.')
+        if isinstance(key, str) and not includeheader:
+            raise ValueError('Key column can only be looked up by name in the header.')
+        self._setoptions(compression, checksum, quotechar)
+        # Lines are reordered, so there is no whole file checksum
+        self._filehasher = None
+        fieldnames = self._getfieldnames(positions=False) + ['partition']
+        with open(self._getmanifestpath(), mode='w+', encoding='utf8', newline='') as writer:
+            manifest = ManifestWriter(writer, fieldnames, self.manifestformat)
+            manifest.writeheader()
+            with self._openinput() as reader:
+                if self._metrics is not None:
+                    reader = MeteredReader(reader, self._metrics)
+                    total = self._getinputstate().get('filesize')
+                    self._progress = Progress(self._metrics, total)
+                if self._quotechar is not None:
+                    blocks = RecordReader(reader, constant.DEFAULT_BLOCK_SIZE, self._quotechar)
+                else:
+                    blocks = BlockReader(reader, constant.DEFAULT_BLOCK_SIZE)
+                header = self._readheader(blocks) if includeheader else b''
+                if isinstance(key, str):
+                    text = StringIO(header.decode(errors='surrogateescape'), newline='')
+                    columns = next(csv.reader(text, delimiter=delimiter,
+                                              quotechar=quotechar or '"'), [])
+                    if key not in columns:
+                        raise ValueError(f'Key column "{key}" is not found in the header.')
+                    key = columns.index(key)
+                partitioner = Partitioner(key, partitions, delimiter.encode(), self._quotechar)
+                splits = []
+                sizes = []
+                try:
+                    for partition in range(partitions):
+                        splitfilename = self._getnextsplit(partition + 1)
+                        splitfile = os.path.join(self.outputdir, splitfilename)
+                        splitwriter = self._openwriter(splitfile, background=False)
+                        splits.append((splitfilename, splitfile, splitwriter))
+                        if header:
+                            splitwriter.write(header)
+                    self._processkeys(blocks, partitioner, [split[2] for split in splits],
+                                      workers, buffersize)
+                finally:
+                    for _, splitfile, splitwriter in splits:
+                        sizes.append(self._closewriter(splitwriter, splitfile))
+            for partition, (splitfilename, splitfile, splitwriter) in enumerate(splits):
+                checksum = None
+                if isinstance(splitwriter, HashingWriter):
+                    checksum = self._checksum.format(splitwriter.hasher)
+                splitsize = sizes[partition]
+                row = self._getmanifestrow(splitfilename, splitsize, includeheader, checksum)
+                row['partition'] = partition
+                manifest.writerow(row)
+                self._reportprogress(blocks.tell())
+                if callback:
+                    callback(splitfile, splitsize)
+        self._progress = None
+        self._endprocess()
+
+    def extract(self, start: int, end: Optional[int] = None, lines: bool = False,
+                parts: int = 1, newline: bool = False, includeheader: bool = False,
+                callback: Callable = None, workers: int = 1, useindex: bool = False,
+                compression: Optional[str] = None, checksum: Optional[str] = None,
+                quotechar: Optional[str] = None, virtual: bool = False) -> None:
+        """Extracts a byte range or a range of lines of the input into the given
+        number of splits. Only the range is read. Line numbers are looked up
+        from the saved line index if any, else the newlines are counted in large
+        blocks from the start of the file, or from its end for negative line numbers.
+
+        Args:
+            start (int): Start offset or number of the first line starting from 0.
+                A negative value counts back from the end of the file.
+            end (Optional[int], optional): End offset or number of the line after the
+                last one. A negative value counts back from the end of the file.
+                Defaults to None (end of the file).
+            lines (bool, optional): Set to true if start and end are line numbers.
+                Implies newline. Defaults to False.
+            parts (int, optional): Number of splits of about equal size to divide the
+                range into. Less splits are made if the boundaries snap to the same
+                line end. Defaults to 1.
+            newline (bool, optional): Set to true to avoid any incomplete lines
+                in each split but the first and last ones. Defaults to False.
+            includeheader (bool, optional): Set to true to include header with each split.
+                The header is left out of the range. Defaults to False.
+            callback (Callable, optional): Callback function to invoke after each split that passes
+                split file path, size [str, int] as args. Defaults to None.
+            workers (int, optional): Number of workers to write the splits in parallel.
+                Defaults to 1.
+            useindex (bool, optional): Set to true to build the line index of the input
+                file if it is not saved yet. Defaults to False.
+            compression (Optional[str], optional): Codec to compress each split with.
+                "gzip", "bz2", "lzma" or "zstd". Defaults to None.
+            checksum (Optional[str], optional): Algorithm to checksum each split and
+                the extracted data with such as "crc32", "blake2b" or "xxh64". Defaults to None.
+            quotechar (Optional[str], optional): Quote char of a CSV file such as '"'.
+                Records are counted instead of lines using the record index. Defaults to None.
+            virtual (bool, optional): Set to true to only record the input byte range
+                of each split in the manifest without writing the splits. Defaults to False.
+
+        Raises:
+            ValueError: Number of parts is not positive or the input is a stream
+            NotImplementedError: Platform does not support reading file ranges
+        """
+        if parts < 1:
+            raise ValueError('Number of parts must be greater than zero.')
+        if self._stream is not None:
+            raise ValueError('Extraction seeks to the range in the input file, streams are not supported.')
+        if not hasattr(os, 'pread'):
+            raise NotImplementedError('Extraction is not supported on this platform.')
+        self._setoptions(compression, checksum, quotechar, virtual)
+        if lines or includeheader or self._quotechar is not None:
+            newline = True
+        if useindex or self._quotechar is not None:
+            index = self._getlineindex(workers)
+        else:
+            index = LineIndex.load(self.indexfile, self.inputfile)
+        fieldnames = self._getfieldnames()
+        with open(self._getmanifestpath(), mode='w+', encoding='utf8', newline='') as writer:
+            manifest = ManifestWriter(writer, fieldnames, self.manifestformat)
+            manifest.writeheader()
+            fd = os.open(self.inputfile, os.O_RDONLY)
+            try:
+                probe = index if index is not None else LineProbe(fd, os.fstat(fd).st_size)
+                lo, hi = self._getextractrange(probe, start, end, lines)
+                header = b''
+                if includeheader:
+                    self._checkheadersize(probe.lineend(0))
+                    header = os.pread(fd, probe.lineend(0), 0)
+                    lo = max(lo, len(header))
+                    hi = max(hi, lo)
+                log.info(f'Extracting input range {lo}-{hi}')
+                line = 0
+                if self._manifestformat == 'jsonl':
+                    if index is not None and self._quotechar is None:
+                        line = index.countlines(0, lo)
+                    else:
+                        line = countnewlines(fd, 0, lo)
+                if self._metrics is not None:
+                    self._progress = Progress(self._metrics, hi, lo)
+                ranges = self._getpartranges(probe, parts, newline, lo, workers, end=hi)
+                self._recordranges(fd, header, ranges, includeheader, callback,
+                                   workers, manifest, index, 1, line)
+            finally:
+                os.close(fd)
+        self._progress = None
+        if self._filehasher is not None and not self.terminate:
+            writechecksumfile(self._getmanifestpath() + constant.CHECKSUM_FILE_SUFFIX,
+                              self._checksum.format(self._filehasher),
+                              ntpath.basename(self.inputfile))
+        self._filehasher = None
+        self._endprocess()
+
+    def sample(self, rate: float = 0, count: int = 0, parts: int = 1,
+               includeheader: bool = False, callback: Callable = None,
+               seed: Optional[int] = None, compression: Optional[str] = None,
+               checksum: Optional[str] = None, quotechar: Optional[str] = None) -> None:
+        """Samples the lines of the input into the given number of splits in one pass
+        over large blocks. Given a rate, every nth line is sampled starting from a random
+        line among the first n, where n is the inverse of the rate. Given a count, a
+        uniform random sample of that many lines is kept in memory. Sampled lines
+        keep their input order.
+
+        Args:
+            rate (float, optional): Fraction of the lines to sample such as 0.01.
+                Defaults to 0.
+            count (int, optional): Number of lines to sample. Defaults to 0.
+            parts (int, optional): Number of splits. Lines sampled at a rate are divided
+                by their input offset and a count of lines is divided evenly. Defaults to 1.
+            includeheader (bool, optional): Set to true to include header with each split.
+                The header is never sampled. Defaults to False.
+            callback (Callable, optional): Callback function to invoke after each split that passes
+                split file path, size [str, int] as args. Defaults to None.
+            seed (Optional[int], optional): Seed to make the sample repeatable. Defaults to None.
+            compression (Optional[str], optional): Codec to compress each split with.
+                "gzip", "bz2", "lzma" or "zstd". Defaults to None.
+            checksum (Optional[str], optional): Algorithm to checksum each split with
+                such as "crc32", "blake2b" or "xxh64". Defaults to None.
+            quotechar (Optional[str], optional): Quote char of a CSV file such as '"'.
+                Records are sampled instead of lines. Defaults to None.
+
+        Raises:
+            ValueError: Neither or both of rate and count are given, the rate is greater
+                than one, the number of parts is not positive or a stream is sampled
+                at a rate into several parts
         """
-        with open(self.inputfile, mode='rb') as reader:
-            with open(self._getmanifestpath(), mode='w+', encoding='utf8', newline='') as writer:
-                fieldnames = ['filename', 'filesize', 'header']
-                manifest = csv.DictWriter(
-                    writer, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
-                manifest.writeheader()
-                self._process(reader, linecount, 'linecount', True,
-                              includeheader, callback, manifest=manifest)
+        if (rate > 0) == (count > 0):
+            raise ValueError('Either a sample rate or a sample count must be given.')
+        if rate > 1:
+            raise ValueError('Sample rate must not be greater than one.')
+        if parts < 1:
+            raise ValueError('Number of parts must be greater than zero.')
+        if rate and parts > 1 and self._stream is not None:
+            raise ValueError('Sampling at a rate into parts requires the input size, '
+                             'streams are not supported.')
+        self._setoptions(compression, checksum, quotechar)
+        # Sample is not the input, so there is no whole file checksum
+        self._filehasher = None
+        rng = random.Random(seed)
+        fieldnames = self._getfieldnames(positions=False)
+        with open(self._getmanifestpath(), mode='w+', encoding='utf8', newline='') as writer:
+            manifest = ManifestWriter(writer, fieldnames, self.manifestformat)
+            manifest.writeheader()
+            with self._openinput() as reader:
+                filesize = self._getinputstate().get('filesize')
+                if self._metrics is not None:
+                    reader = MeteredReader(reader, self._metrics)
+                    self._progress = Progress(self._metrics, filesize)
+                if self._quotechar is not None:
+                    blocks = RecordReader(reader, constant.DEFAULT_BLOCK_SIZE, self._quotechar)
+                else:
+                    blocks = BlockReader(reader, constant.DEFAULT_BLOCK_SIZE)
+                header = self._readheader(blocks) if includeheader else b''
+                if rate:
+                    samples = self._samplestride(blocks, max(round(1 / rate), 1), rng,
+                                                 parts, filesize, len(header))
+                else:
+                    samples = self._samplereservoir(blocks, count, rng, parts)
+                self._writesample(samples, parts, header, includeheader,
+                                  manifest, callback, blocks)
+        self._progress = None
         self._endprocess()
 
+    async def abysize(self, size: int, newline: bool = False,
+                      includeheader: bool = False, callback: Callable = None,
+                      executor: Optional[Executor] = None, **kwargs) -> None:
+        """Splits by size without blocking the event loop.
+        Accepts the same args as bysize.
+
+        Args:
+            size (int): Max size in bytes allowed in each split
+            newline (bool, optional): Set to true to avoid any incomplete lines
+                in each split. Defaults to False.
+            includeheader (bool, optional): Set to true to include header with each split.
+                Defaults to False.
+            callback (Callable, optional): Callback function to invoke after each split that passes
+                split file path, size [str, int] as args. Defaults to None.
+            executor (Optional[Executor], optional): Executor to run the split in.
+                Defaults to an executor shared by all the async splits and merges.
+        """
+        # Imported here to keep asyncio out of the synchronous API's import time
+        from .common import aio
+        await aio.run(self.bysize, executor, size=size, newline=newline,
+                      includeheader=includeheader, callback=callback, **kwargs)
+
+    async def abylinecount(self, linecount: int, includeheader: bool = False,
+                           callback: Callable = None,
+                           executor: Optional[Executor] = None, **kwargs) -> None:
+        """Splits by line count without blocking the event loop.
+        Accepts the same args as bylinecount.
+
+        Args:
+            linecount (int): Max number of allowed lines in each split
+            includeheader (bool, optional): Set to true to include header with each split.
+                Defaults to False.
+            callback (Callable, optional): Callback function to invoke after each split that passes
+                split file path, size [str, int] as args. Defaults to None.
+            executor (Optional[Executor], optional): Executor to run the split in.
+                Defaults to an executor shared by all the async splits and merges.
+        """
+        from .common import aio
+        await aio.run(self.bylinecount, executor, linecount=linecount,
+                      includeheader=includeheader, callback=callback, **kwargs)
+
+    def aiter_bysize(self, size: int, newline: bool = False, includeheader: bool = False,
+                     executor: Optional[Executor] = None, **kwargs) -> AsyncIterator['SplitInfo']:
+        """Splits by size and yields each split as soon as it is closed.
+        Accepts the same args as bysize except callback. Leaving the
+        iteration early terminates the split.
+
+        Args:
+            size (int): Max size in bytes allowed in each split
+            newline (bool, optional): Set to true to avoid any incomplete lines
+                in each split. Defaults to False.
+            includeheader (bool, optional): Set to true to include header with each split.
+                Defaults to False.
+            executor (Optional[Executor], optional): Executor to run the split in.
+                Defaults to an executor shared by all the async splits and merges.
+
+        Returns:
+            AsyncIterator[SplitInfo]: Split file path, size and split number
+        """
+        from .common import aio
+        return aio.iterate(self, self.bysize, executor, size=size, newline=newline,
+                           includeheader=includeheader, **kwargs)
+
+    def aiter_bylinecount(self, linecount: int, includeheader: bool = False,
+                          executor: Optional[Executor] = None,
+                          **kwargs) -> AsyncIterator['SplitInfo']:
+        """Splits by line count and yields each split as soon as it is closed.
+        Accepts the same args as bylinecount except callback. Leaving the
+        iteration early terminates the split.
+
+        Args:
+            linecount (int): Max number of allowed lines in each split
+            includeheader (bool, optional): Set to true to include header with each split.
+                Defaults to False.
+            executor (Optional[Executor], optional): Executor to run the split in.
+                Defaults to an executor shared by all the async splits and merges.
+
+        Returns:
+            AsyncIterator[SplitInfo]: Split file path, size and split number
+        """
+        from .common import aio
+        return aio.iterate(self, self.bylinecount, executor, linecount=linecount,
+                           includeheader=includeheader, **kwargs)
+
 
 # if __name__ == '__main__':
 
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+import importlib.util
+import os
+import sys
+
+SRCDIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+if importlib.util.find_spec('filesplit') is None:
+    # setup.py maps the package to src, so the source tree
+    # is loaded as the package when it is not installed
+    spec = importlib.util.spec_from_file_location(
+        'filesplit', os.path.join(SRCDIR, '__init__.py'), submodule_search_locations=[SRCDIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['filesplit'] = module
+    spec.loader.exec_module(module)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import Dict
+import os
+import random
+
+from filesplit.common import constant
+from filesplit.common.metrics import MetricsHook
+
+
+def writeinput(path: str, lines: int = 2000, newline: bool = True, seed: int = 7) -> bytes:
+    """Writes a CSV file with a header and lines of varying length
+
+    Args:
+        path (str): Input file path
+        lines (int, optional): Number of lines after the header. Defaults to 2000.
+        newline (bool, optional): Set to False to leave the last line without
+            a newline. Defaults to True.
+        seed (int, optional): Seed of the generated values. Defaults to 7.
+
+    Returns:
+        bytes: File content
+    """
+    rnd = random.Random(seed)
+    data = b'id,name,value\n' + b''.join(
+        b'%d,%s,%d\n' % (i, b'x' * rnd.randrange(1, 80), rnd.randrange(10 ** 6))
+        for i in range(lines))
+    if not newline:
+        data = data[:-1]
+    with open(path, mode='wb') as writer:
+        writer.write(data)
+    return data
+
+
+def readdir(path: str) -> Dict[str, bytes]:
+    """Returns the content of the files of a dir and its sub dirs except line indexes
+
+    Args:
+        path (str): Dir path
+
+    Returns:
+        Dict[str, bytes]: Content of each file by its path relative to the dir
+    """
+    files = {}
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.endswith(constant.INDEX_FILE_SUFFIX):
+                continue
+            filepath = os.path.join(root, filename)
+            with open(filepath, mode='rb') as reader:
+                files[os.path.relpath(filepath, path)] = reader.read()
+    return files
+
+
+class TerminateAfter(MetricsHook):
+    """Sets the terminate flag of a split or merge once a number of splits
+    is done, like a user interrupting the process
+    """
+
+    def __init__(self, process, splits: int) -> None:
+        """Constructor.
+
+        Args:
+            process: Split or Merge to terminate
+            splits (int): Number of splits to let through
+        """
+        self._process = process
+        self._splits = splits
+
+    def progress(self, done: int, total, rate: float, eta) -> None:
+        self._splits -= 1
+        if self._splits <= 0:
+            self._process.terminate = True
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+import os
+
+import pytest
+
+from filesplit.merge import Merge
+from filesplit.split import Split
+
+from helpers import TerminateAfter, writeinput
+
+MODES = [
+    ('bysize', {'size': 5000, 'newline': True}),
+    ('bysize', {'size': 5000, 'newline': False}),
+    ('bysize', {'size': 5000, 'quotechar': '"'}),
+    ('bylinecount', {'linecount': 150}),
+    ('bylinecount', {'linecount': 150, 'workers': 3}),
+]
+
+OPTIONS = [
+    {},
+    {'compression': 'gzip'},
+    {'checksum': 'crc32'},
+    {'virtual': True},
+    {'manifestformat': 'jsonl'},
+]
+
+
+def _split(inputfile: str, outputdir: str, method: str, kwargs: dict) -> None:
+    """Splits a file into a new dir
+
+    Args:
+        inputfile (str): Input file path
+        outputdir (str): Dir of the splits
+        method (str): Split method name
+        kwargs (dict): Args of the split method and manifestformat property
+    """
+    kwargs = dict(kwargs)
+    os.makedirs(outputdir)
+    split = Split(inputfile, outputdir)
+    if 'manifestformat' in kwargs:
+        split.manifestformat = kwargs.pop('manifestformat')
+    getattr(split, method)(**kwargs)
+
+
+def _read(path: str) -> bytes:
+    """Returns the content of a file
+
+    Args:
+        path (str): File path
+
+    Returns:
+        bytes: Content
+    """
+    with open(path, mode='rb') as reader:
+        return reader.read()
+
+
+@pytest.mark.parametrize('method, kwargs', MODES)
+@pytest.mark.parametrize('options', OPTIONS)
+@pytest.mark.parametrize('includeheader', [False, True])
+@pytest.mark.parametrize('workers', [1, 3])
+def test_round_trip(tmp_path, method, kwargs, options, includeheader, workers):
+    inputfile = str(tmp_path / 'input.csv')
+    data = writeinput(inputfile, newline=False)
+    splitdir = str(tmp_path / 'splits')
+    _split(inputfile, splitdir, method, dict(kwargs, includeheader=includeheader, **options))
+    Merge(splitdir, str(tmp_path), 'merged.csv').merge(
+        workers=workers, verify=bool(options.get('checksum')))
+    assert _read(str(tmp_path / 'merged.csv')) == data
+
+
+def test_round_trip_quoted_header(tmp_path):
+    inputfile = str(tmp_path / 'input.csv')
+    lines = [b'id,"multi\nline"\n'] + [
+        b'%d,"a\nb"\n' % i if i % 5 == 0 else b'%d,c\n' % i for i in range(1000)]
+    with open(inputfile, mode='wb') as writer:
+        writer.writelines(lines)
+    splitdir = str(tmp_path / 'splits')
+    _split(inputfile, splitdir, 'bylinecount',
+           {'linecount': 90, 'includeheader': True, 'quotechar': '"'})
+    Merge(splitdir, str(tmp_path), 'merged.csv').merge()
+    assert _read(str(tmp_path / 'merged.csv')) == b''.join(lines)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('splits', [1, 5])
+def test_resumed_merge_matches_input(tmp_path, workers, splits):
+    inputfile = str(tmp_path / 'input.csv')
+    data = writeinput(inputfile)
+    splitdir = str(tmp_path / 'splits')
+    _split(inputfile, splitdir, 'bysize', {'size': 5000, 'includeheader': True})
+    merge = Merge(splitdir, str(tmp_path), 'merged.csv')
+    merge.resumable = True
+    merge.metrics = TerminateAfter(merge, splits)
+    merge.merge(workers=workers)
+    assert os.path.exists(str(tmp_path / 'merged.csv.ckpt'))
+    Merge(splitdir, str(tmp_path), 'merged.csv').merge(workers=workers, resume=True)
+    assert _read(str(tmp_path / 'merged.csv')) == data
+    assert not os.path.exists(str(tmp_path / 'merged.csv.ckpt'))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+from typing import List
+import os
+
+import pytest
+
+from filesplit.common import constant
+from filesplit.merge import Merge
+from filesplit.split import Split
+
+
+def _writesortedsplits(inputfile: str, outputdir: str, linecount: int,
+                       reverse: bool = False) -> None:
+    """Splits a file by line count and sorts each split in place
+
+    Args:
+        inputfile (str): Input file path
+        outputdir (str): Dir of the splits
+        linecount (int): Number of lines of each split
+        reverse (bool, optional): Set to True to sort in descending order.
+            Defaults to False.
+    """
+    Split(inputfile, outputdir).bylinecount(linecount)
+    for filename in os.listdir(outputdir):
+        if filename == 'manifest':
+            continue
+        path = os.path.join(outputdir, filename)
+        with open(path, mode='rb') as reader:
+            lines = sorted(reader.readlines(), reverse=reverse)
+        with open(path, mode='wb') as writer:
+            writer.writelines(lines)
+
+
+def _writemanifest(outputdir: str, splits: List[bytes], header: bool) -> None:
+    """Writes splits and their manifest
+
+    Args:
+        outputdir (str): Dir of the splits
+        splits (List[bytes]): Content of each split
+        header (bool): True if the splits include the header
+    """
+    rows = ['filename,filesize,header']
+    for num, data in enumerate(splits, start=1):
+        filename = f'split_{num}'
+        with open(os.path.join(outputdir, filename), mode='wb') as writer:
+            writer.write(data)
+        rows.append(f'{filename},{len(data)},{header}')
+    with open(os.path.join(outputdir, 'manifest'), mode='w', encoding='utf8') as writer:
+        writer.write('\n'.join(rows) + '\n')
+
+
+def test_multipass_relative_outputdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(constant, 'MAX_MERGE_FANIN', 2)
+    lines = [b'%d\n' % (i * 7919 % 1000) for i in range(1000)]
+    with open('input.txt', mode='wb') as writer:
+        writer.writelines(lines)
+    os.makedirs('splits')
+    os.makedirs('merged')
+    _writesortedsplits('input.txt', 'splits', 90)
+    Merge('splits', 'merged', 'sorted.txt').sortedmerge()
+    with open(os.path.join('merged', 'sorted.txt'), mode='rb') as reader:
+        assert reader.read() == b''.join(sorted(lines))
+    # Runs of the intermediate passes are removed
+    assert os.listdir('merged') == ['sorted.txt']
+
+
+@pytest.mark.parametrize('fanin', [2, 3, constant.MAX_MERGE_FANIN])
+@pytest.mark.parametrize('unique', [False, True])
+@pytest.mark.parametrize('reverse', [False, True])
+@pytest.mark.parametrize('workers', [1, 3])
+def test_sortedmerge(tmp_path, monkeypatch, fanin, unique, reverse, workers):
+    monkeypatch.setattr(constant, 'MAX_MERGE_FANIN', fanin)
+    lines = [b'%d\n' % (i * 7919 % 500) for i in range(2000)]
+    inputfile = str(tmp_path / 'input.txt')
+    with open(inputfile, mode='wb') as writer:
+        writer.writelines(lines)
+    splitdir = str(tmp_path / 'splits')
+    os.makedirs(splitdir)
+    _writesortedsplits(inputfile, splitdir, 170, reverse)
+    Merge(splitdir, str(tmp_path), 'sorted.txt').sortedmerge(
+        reverse=reverse, unique=unique, workers=workers)
+    expected = sorted(set(lines) if unique else lines, reverse=reverse)
+    with open(str(tmp_path / 'sorted.txt'), mode='rb') as reader:
+        assert reader.read() == b''.join(expected)
+
+
+@pytest.mark.parametrize('key', [0, 'value'])
+def test_sortedmerge_keytype(tmp_path, key):
+    splitdir = str(tmp_path / 'splits')
+    os.makedirs(splitdir)
+    records = [b'%d,r%d\n' % (i * 37 % 1000, i) for i in range(300)]
+    parts = [sorted(records[part::3], key=lambda record: int(record.split(b',')[0]))
+             for part in range(3)]
+    _writemanifest(splitdir, [b'value,name\n' + b''.join(part) for part in parts], True)
+    Merge(splitdir, str(tmp_path), 'sorted.csv').sortedmerge(key=key, keytype=int)
+    with open(str(tmp_path / 'sorted.csv'), mode='rb') as reader:
+        header, *merged = reader.read().splitlines(True)
+    assert header == b'value,name\n'
+    assert merged == sorted(records, key=lambda record: int(record.split(b',')[0]))
+
+
+@pytest.mark.parametrize('last, mergedlast', [(b'999', True), (b'150', False)])
+def test_sortedmerge_keeps_last_record_as_read(tmp_path, last, mergedlast):
+    splitdir = str(tmp_path / 'splits')
+    os.makedirs(splitdir)
+    low = [b'%d\n' % i for i in range(100, 150)]
+    high = [b'%d\n' % i for i in range(200, 250)]
+    _writemanifest(splitdir, [b''.join(high), b''.join(low) + last], False)
+    Merge(splitdir, str(tmp_path), 'sorted.txt').sortedmerge()
+    expected = b''.join(sorted(low + high + [last + b'\n']))
+    with open(str(tmp_path / 'sorted.txt'), mode='rb') as reader:
+        assert reader.read() == (expected[:-1] if mergedlast else expected)
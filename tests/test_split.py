@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Author: rjayapalan
+Created: October 17, 2026
+"""
+import os
+
+import pytest
+
+from filesplit.common import error
+from filesplit.split import Split
+
+from helpers import TerminateAfter, readdir, writeinput
+
+MODES = [
+    ('bysize', {'size': 5000, 'newline': True}),
+    ('bysize', {'size': 5000, 'newline': False}),
+    ('bylinecount', {'linecount': 150}),
+]
+
+
+def _split(inputfile: str, outputdir: str, method: str, kwargs: dict,
+           pipeline: bool = False) -> dict:
+    """Splits a file into a new dir and returns the files written
+
+    Args:
+        inputfile (str): Input file path
+        outputdir (str): Dir of the splits
+        method (str): Split method name
+        kwargs (dict): Args of the split method
+        pipeline (bool, optional): Pipeline property of the split. Defaults to False.
+
+    Returns:
+        dict: Content of each file written
+    """
+    os.makedirs(outputdir)
+    split = Split(inputfile, outputdir)
+    split.pipeline = pipeline
+    getattr(split, method)(**kwargs)
+    return readdir(outputdir)
+
+
+@pytest.mark.parametrize('method, kwargs', MODES)
+@pytest.mark.parametrize('includeheader', [False, True])
+@pytest.mark.parametrize('newline', [True, False])
+@pytest.mark.parametrize('options', [{'workers': 4}, {'useindex': True}, {'pipeline': True}])
+def test_options_match_sequential(tmp_path, method, kwargs, includeheader, newline, options):
+    inputfile = str(tmp_path / 'input.csv')
+    writeinput(inputfile, newline=newline)
+    kwargs = dict(kwargs, includeheader=includeheader)
+    expected = _split(inputfile, str(tmp_path / 'sequential'), method, kwargs)
+    options = dict(options)
+    pipeline = options.pop('pipeline', False)
+    got = _split(inputfile, str(tmp_path / 'options'), method, dict(kwargs, **options), pipeline)
+    assert got == expected
+
+
+@pytest.mark.parametrize('method, kwargs', MODES)
+@pytest.mark.parametrize('includeheader', [False, True])
+@pytest.mark.parametrize('splits', [1, 3, 7])
+def test_resumed_split_matches_uninterrupted(tmp_path, method, kwargs, includeheader, splits):
+    inputfile = str(tmp_path / 'input.csv')
+    writeinput(inputfile)
+    kwargs = dict(kwargs, includeheader=includeheader)
+    expected = _split(inputfile, str(tmp_path / 'uninterrupted'), method, kwargs)
+    outputdir = str(tmp_path / 'resumed')
+    os.makedirs(outputdir)
+    split = Split(inputfile, outputdir)
+    split.resumable = True
+    split.metrics = TerminateAfter(split, splits)
+    getattr(split, method)(**kwargs)
+    assert os.path.exists(os.path.join(outputdir, 'manifest.ckpt'))
+    getattr(Split(inputfile, outputdir), method)(resume=True, **kwargs)
+    assert readdir(outputdir) == expected
+
+
+def test_checkpoint_is_opt_in(tmp_path):
+    inputfile = str(tmp_path / 'input.csv')
+    writeinput(inputfile)
+    outputdir = str(tmp_path / 'splits')
+    os.makedirs(outputdir)
+    split = Split(inputfile, outputdir)
+    split.metrics = TerminateAfter(split, 2)
+    split.bysize(5000)
+    assert not os.path.exists(os.path.join(outputdir, 'manifest.ckpt'))
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_truncated_input_raises(tmp_path, workers):
+    inputfile = str(tmp_path / 'input.csv')
+    writeinput(inputfile)
+    outputdir = str(tmp_path / 'splits')
+    os.makedirs(outputdir)
+
+    def truncate(splitfile: str, splitsize: int) -> None:
+        os.truncate(inputfile, 12000)
+
+    with pytest.raises(error.SplitSizeMismatch):
+        Split(inputfile, outputdir).bysize(5000, workers=workers, callback=truncate)